@@ -1,12 +1,39 @@
 # orchestrator/app/agents/case_law_scholar/case_law_agent.py
 
+import asyncio
+import logging
 import os
+from typing import Any, Dict, Iterable, List
+
 from pinecone import Pinecone, ServerlessSpec
 
+from app.agents.memory.vector_index import LocalVectorIndex
+from app.llm.embeddings import HashingEmbedder
+
+logger = logging.getLogger(__name__)
+
 class CaseLawScholarAgent:
-    def __init__(self, llm_client):
+    def __init__(self, llm_client, semantic_cache=None, index=None, embed=None, top_k=4):
         # 1) store the LLM client
         self.llm = llm_client
+        # optional SemanticCache: paraphrased repeat queries skip the LLM
+        self.semantic_cache = semantic_cache
+
+        self.index_name = "case-law"
+        self.dimension  = 1536
+        self.metric     = "cosine"
+        # retrieval: query embedding + how many passages ground each answer
+        self.embed = embed or HashingEmbedder(dim=self.dimension)
+        self.top_k = top_k
+        # only vectors from this embedder are comparable with its queries
+        # (see _bind_index)
+        self.embedding = getattr(self.embed, "name", None)
+
+        # A ready-made index (e.g. LocalVectorIndex) replaces the Pinecone setup
+        if index is not None:
+            self.index = index
+            self._bind_index()
+            return
 
         # 2) Load Pinecone credentials
         api_key = os.getenv("PINECONE_API_KEY")
@@ -16,10 +43,6 @@ class CaseLawScholarAgent:
         self.pc = Pinecone(api_key=api_key, environment=env)
 
         # 4) Ensure our index exists
-        self.index_name = "case-law"
-        self.dimension  = 1536
-        self.metric     = "cosine"
-
         resp = self.pc.list_indexes()
         # v2 SDK: resp.names may be a method or an attribute
         if hasattr(resp, "names") and callable(resp.names):
@@ -39,9 +62,133 @@ class CaseLawScholarAgent:
 
         # 5) Bind to the index for queries/upserts
         self.index = self.pc.Index(self.index_name)
+        self._bind_index()
 
-    def run(self, query: str) -> str:
+    def _bind_index(self) -> None:
+        """
+        Keep retrieval to this agent's vector space. A LocalVectorIndex
+        records the embedder it was filled with, so that is checked once
+        here; with Pinecone every query filters on the stamp `ingest()` adds.
+        """
+        self.query_filter = None
+        self.retrieval_enabled = True
+        if not self.embedding:
+            return
+        if not hasattr(self.index, "embedding"):
+            self.query_filter = {"embedding": {"$eq": self.embedding}}
+            return
+        if self.index.embedding is None and not self.index.describe_index_stats()["total_vector_count"]:
+            # empty: it is ours from the first ingest on
+            self.index.embedding = self.embedding
+        if self.index.embedding != self.embedding:
+            logger.warning(
+                "Case-law index holds %s vectors, not %s; answering without retrieval",
+                self.index.embedding or "unknown", self.embedding,
+            )
+            self.retrieval_enabled = False
+
+    @classmethod
+    def from_settings(cls, llm_client, settings, semantic_cache=None) -> "CaseLawScholarAgent":
+        # case-law retrieval runs against a local memory-mapped index unless
+        # CASELAW_INDEX_BACKEND="pinecone"
+        index = None
+        embed = HashingEmbedder(dim=1536)
+        if settings.CASELAW_INDEX_BACKEND.lower() == "local":
+            index = LocalVectorIndex(
+                settings.CASELAW_INDEX_PATH,
+                dimension=1536,
+                nprobe=settings.VECTOR_INDEX_NPROBE,
+                ivf_threshold=settings.VECTOR_INDEX_IVF_THRESHOLD,
+                embedding=embed.name,
+            )
+        return cls(llm_client, semantic_cache, index=index, embed=embed, top_k=settings.CASELAW_TOP_K)
+
+    def ingest(self, passages: Iterable[Dict[str, Any]], batch_size: int = 256) -> int:
+        """
+        Embed and upsert passages given as `{"id", "text"[, "citation" | "title"]}`
+        dicts (blocking). Returns how many were stored. A local index that
+        has grown past its `ivf_threshold` is (re)partitioned afterwards.
+        """
+        if not self.retrieval_enabled:
+            raise ValueError(f"The index holds vectors from another embedder than {self.embedding}")
+        count = 0
+        batch: List[tuple] = []
+
+        def flush() -> None:
+            if batch:
+                self.index.upsert(batch)
+                batch.clear()
+
+        for passage in passages:
+            meta = {k: passage[k] for k in ("text", "citation", "title") if passage.get(k)}
+            if self.query_filter:
+                meta["embedding"] = self.embedding
+            batch.append((str(passage["id"]), self.embed(passage["text"]).tolist(), meta))
+            count += 1
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+
+        build_ivf = getattr(self.index, "build_ivf", None)
+        if build_ivf and count and self.index.describe_index_stats()["total_vector_count"] >= self.index.ivf_threshold:
+            build_ivf()
+        return count
+
+    def retrieve(self, query: str) -> List[str]:
+        """
+        Top-k case-law passages for `query` from the bound index (blocking).
+        """
+        if self.top_k < 1 or not self.retrieval_enabled:
+            return []
+        resp = self.index.query(
+            vector=self.embed(query).tolist(), top_k=self.top_k, include_metadata=True,
+            filter=self.query_filter,
+        )
+        passages = []
+        for match in resp["matches"]:
+            meta = match["metadata"] if isinstance(match, dict) else match.metadata
+            text = (meta or {}).get("text")
+            if text:
+                source = (meta or {}).get("citation") or (meta or {}).get("title")
+                passages.append(f"{source}: {text}" if source else text)
+        return passages
+
+    async def _prompt(self, query: str) -> str:
+        # Retrieve-then-generate: ground the answer in the closest indexed passages
+        try:
+            passages = await asyncio.to_thread(self.retrieve, query)
+        except Exception:
+            logger.exception("Case-law retrieval failed; answering without sources")
+            passages = []
         # Example prompt—customize as needed
         prompt = f"Research and summarize tribal sovereignty law: {query}"
-        # generate() is your LLM interface; adjust call signature as required
-        return self.llm.generate(prompt, max_tokens=5000)
\ No newline at end of file
+        if not passages:
+            return prompt
+        sources = "\n\n".join(f"[{i}] {p}" for i, p in enumerate(passages, 1))
+        return (
+            "Relevant case-law excerpts (cite them by number where they apply):\n\n"
+            f"{sources}\n\n{prompt}"
+        )
+
+    async def run(self, query: str) -> str:
+        cache = self.semantic_cache
+        if cache is not None and (cached := cache.lookup(query)) is not None:
+            return cached
+        # agenerate() is the non-blocking LLM interface; adjust call signature as required
+        answer = await self.llm.agenerate(await self._prompt(query), max_tokens=5000)
+        if cache is not None:
+            cache.store(query, answer)
+        return answer
+
+    async def astream(self, query: str):
+        # same answer as run(), yielded chunk by chunk as the LLM produces it
+        cache = self.semantic_cache
+        if cache is not None and (cached := cache.lookup(query)) is not None:
+            yield cached
+            return
+        parts = []
+        async for chunk in self.llm.astream(await self._prompt(query), max_tokens=5000):
+            parts.append(chunk)
+            yield chunk
+        if cache is not None:
+            cache.store(query, "".join(parts))
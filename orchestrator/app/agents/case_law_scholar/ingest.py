@@ -0,0 +1,57 @@
+# orchestrator/app/agents/case_law_scholar/ingest.py
+"""
+Load case-law passages into the index CaseLawScholarAgent retrieves from.
+
+    cd orchestrator
+    python -m app.agents.case_law_scholar.ingest passages.jsonl
+
+Each line is one passage: {"id": ..., "text": ..., "citation": ...}, with
+"title" accepted in place of "citation". The index is the one the app uses
+(CASELAW_INDEX_BACKEND / CASELAW_INDEX_PATH), and passages are embedded by
+the agent itself, so stored vectors and retrieval queries share one vector
+space. Re-ingesting an id overwrites it. A local index that reaches
+VECTOR_INDEX_IVF_THRESHOLD vectors is partitioned for IVF search.
+"""
+
+import argparse
+import json
+import logging
+from typing import Any, Dict, Iterator
+
+from app.agents.case_law_scholar.case_law_agent import CaseLawScholarAgent
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def read_passages(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            passage = json.loads(line)
+            if not passage.get("id") or not passage.get("text"):
+                raise ValueError(f"{path}:{lineno}: every passage needs an 'id' and a 'text'")
+            yield passage
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="JSON Lines file of passages")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    # retrieval only, so no LLM client is needed
+    agent = CaseLawScholarAgent.from_settings(None, settings)
+    # one sidecar write at the end instead of one per batch
+    if hasattr(agent.index, "autoflush"):
+        agent.index.autoflush = False
+    count = agent.ingest(read_passages(args.path), batch_size=args.batch_size)
+    if hasattr(agent.index, "flush"):
+        agent.index.flush()
+    logger.info("Ingested %d passages (%s) into %s", count, agent.embedding, settings.CASELAW_INDEX_BACKEND)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 # app/agents/file_conversion_agent.py
 
+import asyncio
+import io
 import logging
 import os
 from pathlib import Path
-from typing import Any, Tuple
+from typing import Any, Awaitable, Callable, Optional, Tuple
 
 import pypandoc
 
+from app.agents.file_conversion_agent.jobs import ConversionJob, ConversionJobManager
+
 logger = logging.getLogger(__name__)
 
 # Optional PDF→DOCX via pdf2docx
@@ -16,6 +20,73 @@ try:
 except ImportError:
     PDF2DOCX_AVAILABLE = False
 
+def converter_for(src_ext: str, fmt: str) -> str:
+    """
+    Which converter handles `src_ext` → `fmt`; used to cap concurrent jobs per converter.
+    """
+    if src_ext == "pdf" and fmt == "docx":
+        return "pdf2docx" if PDF2DOCX_AVAILABLE else "pypdf"
+    if {src_ext, fmt} == {"csv", "xlsx"}:
+        return "pandas"
+    return "pandoc"
+
+
+def convert(src: str, fmt: str) -> str:
+    """
+    Convert `src` to format `fmt` next to the source file and return a chat reply.
+    Blocking and CPU heavy; module-level so it can run in a worker process.
+    """
+    src_path = Path(src)
+    base = src_path.with_suffix("")
+    dst_path = base.with_suffix(f".{fmt}")
+
+    src_ext = src_path.suffix.lstrip(".").lower()
+    converter = converter_for(src_ext, fmt)
+
+    # 1) PDF → DOCX via pdf2docx
+    if converter == "pdf2docx":
+        logger.info("Converting PDF→DOCX: %s → %s", src, dst_path)
+        cv = Converter(src)
+        cv.convert(str(dst_path), start=0, end=None)
+        cv.close()
+        return f"✅ Converted '{src}' → '{dst_path}'"
+
+    # 2) PDF → DOCX via PyPDF2 + python-docx
+    if converter == "pypdf":
+        try:
+            from PyPDF2 import PdfReader
+            from docx import Document
+        except ImportError:
+            return ("⚠️ Cannot convert PDF→DOCX: "
+                    "install `pdf2docx` or `PyPDF2`+`python-docx`")
+        logger.info("Converting PDF→DOCX with PyPDF2+docx: %s → %s", src, dst_path)
+        reader = PdfReader(str(src_path))
+        doc = Document()
+        for page in reader.pages:
+            doc.add_paragraph(page.extract_text() or "")
+        doc.save(str(dst_path))
+        return f"✅ Converted '{src}' → '{dst_path}'"
+
+    # 3) CSV ↔ XLSX via pandas
+    if converter == "pandas":
+        import pandas as pd  # type: ignore
+        logger.info("Converting %s→%s with pandas: %s → %s", src_ext, fmt, src, dst_path)
+        if src_ext == "csv":
+            pd.read_csv(src_path).to_excel(dst_path, index=False)
+        else:
+            pd.read_excel(src_path).to_csv(dst_path, index=False)
+        return f"✅ Converted '{src}' → '{dst_path}'"
+
+    # 4) Pandoc-powered conversions for everything else
+    logger.info("Attempting Pandoc conversion: %s → %s (to='%s')", src, dst_path, fmt)
+    try:
+        pypandoc.convert_file(src, to=fmt, outputfile=str(dst_path))
+        return f"✅ Converted '{src}' → '{dst_path}'"
+    except Exception as e:
+        logger.exception("Pandoc conversion failed")
+        return f"⚠️ Conversion failed: {e}"
+
+
 class FileConversionAgent:
     """
     Agent for common file conversions:
@@ -25,8 +96,10 @@ class FileConversionAgent:
       - Audio → Text
     """
 
-    def __init__(self, llm_client: Any):
+    def __init__(self, llm_client: Any, jobs: Optional[ConversionJobManager] = None):
         self.llm = llm_client
+        # optional process pool: conversions run as background jobs via submit()
+        self.jobs = jobs
         # Ensure Pandoc is available
         try:
             pypandoc.get_pandoc_version()
@@ -60,44 +133,58 @@ class FileConversionAgent:
         if not os.path.exists(src):
             return f"⚠️ File not found: {src}"
 
-        src_path = Path(src)
-        base = src_path.with_suffix("")
-        dst_path = base.with_suffix(f".{fmt}")
-
-        src_ext = src_path.suffix.lstrip(".").lower()
-
-        # 1) PDF → DOCX via pdf2docx
-        if src_ext == "pdf" and fmt == "docx" and PDF2DOCX_AVAILABLE:
-            logger.info("Converting PDF→DOCX: %s → %s", src, dst_path)
-            cv = Converter(src)
-            cv.convert(str(dst_path), start=0, end=None)
-            cv.close()
-            return f"✅ Converted '{src}' → '{dst_path}'"
-
-        # 2) PDF → DOCX via PyPDF2 + python-docx
-        if src_ext == "pdf" and fmt == "docx" and not PDF2DOCX_AVAILABLE:
-            try:
-                from PyPDF2 import PdfReader
-                from docx import Document
-            except ImportError:
-                return ("⚠️ Cannot convert PDF→DOCX: "
-                        "install `pdf2docx` or `PyPDF2`+`python-docx`")
-            logger.info("Converting PDF→DOCX with PyPDF2+docx: %s → %s", src, dst_path)
-            reader = PdfReader(str(src_path))
-            doc = Document()
-            for page in reader.pages:
-                doc.add_paragraph(page.extract_text() or "")
-            doc.save(str(dst_path))
-            return f"✅ Converted '{src}' → '{dst_path}'"
-
-        # 3) Pandoc-powered conversions for everything else
-        logger.info("Attempting Pandoc conversion: %s → %s (to='%s')", src, dst_path, fmt)
+        return convert(src, fmt)
+
+    async def aconvert(self, src: str, fmt: str) -> str:
+        """
+        Convert `src` to `fmt` without blocking the event loop: on the job
+        pool when there is one, otherwise on a worker thread.
+        """
+        if self.jobs is None:
+            return await asyncio.to_thread(convert, src, fmt)
+        job = await self.jobs.run(
+            converter_for(Path(src).suffix.lstrip(".").lower(), fmt), convert, src, fmt
+        )
+        return job.describe()
+
+    async def submit(self, query: str, notify: Callable[[str], Awaitable[None]]) -> str:
+        """
+        Queue a conversion on the process pool and reply at once; `notify` is
+        awaited with the outcome when the job finishes. Also understands
+        "status <job id>" and "cancel <job id>".
+        """
+        if self.jobs is None:
+            return await asyncio.to_thread(self.run, query)
+
+        words = query.strip().split()
+        if len(words) == 2 and words[0].lower() in ("status", "cancel"):
+            action, job_id = words[0].lower(), words[1]
+            job = self.jobs.get(job_id)
+            if job is None:
+                return f"⚠️ Unknown conversion job: {job_id}"
+            if action == "cancel":
+                if await self.jobs.cancel(job_id):
+                    return f"🛑 Conversion job {job_id} cancelled"
+                return f"⚠️ Conversion job {job_id} is {job.status} and can no longer be cancelled"
+            return f"ℹ️ Conversion job {job_id}: {job.status}"
+
         try:
-            pypandoc.convert_file(src, to=fmt, outputfile=str(dst_path))
-            return f"✅ Converted '{src}' → '{dst_path}'"
-        except Exception as e:
-            logger.exception("Pandoc conversion failed")
-            return f"⚠️ Conversion failed: {e}"
+            src, fmt = self._parse_command(query)
+        except ValueError as e:
+            return f"⚠️ {e}"
+
+        if not os.path.exists(src):
+            return f"⚠️ File not found: {src}"
+
+        async def on_done(job: ConversionJob) -> None:
+            await notify(job.describe())
+
+        job = self.jobs.submit(
+            converter_for(Path(src).suffix.lstrip(".").lower(), fmt),
+            convert, src, fmt,
+            on_done=on_done,
+        )
+        return f"⏳ Conversion job {job.id} queued: '{src}' → {fmt}"
 
     # Optional helpers if you need programmatic calls:
 
@@ -137,11 +224,14 @@ class FileConversionAgent:
         except ImportError:
             raise RuntimeError("pydub and SpeechRecognition are required for Audio→Text")
         audio_p = Path(audio_path)
-        wav = audio_p.with_suffix(".wav")
+        wav = audio_p
         if audio_p.suffix.lower() != ".wav":
-            AudioSegment.from_file(str(audio_p)).export(str(wav), format="wav")
+            # decode into memory rather than leaving a .wav next to the input
+            wav = io.BytesIO()
+            AudioSegment.from_file(str(audio_p)).export(wav, format="wav")
+            wav.seek(0)
         recognizer = sr.Recognizer()
-        with sr.AudioFile(str(wav)) as src:
+        with sr.AudioFile(wav if isinstance(wav, io.BytesIO) else str(wav)) as src:
             audio = recognizer.record(src)
         transcript = recognizer.recognize_google(audio)
         if output_path:
@@ -0,0 +1,280 @@
+# orchestrator/app/agents/file_conversion_agent/jobs.py
+
+import asyncio
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = ("done", "failed", "timeout", "cancelled")
+
+
+@dataclass
+class ConversionJob:
+    id: str
+    kind: str                        # converter type, e.g. "pdf2docx" or "pandoc"
+    status: str = "queued"           # queued → running → done/failed/timeout/cancelled
+    result: Any = None
+    error: Optional[str] = None
+    timeout: float = 0.0
+    created_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _future: Optional[Future] = field(default=None, repr=False)   # the pool's own future
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+    def describe(self) -> str:
+        """
+        Chat-ready summary of the job's outcome.
+        """
+        if self.status == "done":
+            return str(self.result)
+        if self.status == "failed":
+            return f"⚠️ Conversion job {self.id} failed: {self.error}"
+        if self.status == "timeout":
+            return f"⌛ Conversion job {self.id} timed out after {self.timeout:.0f}s"
+        if self.status == "cancelled":
+            return f"🛑 Conversion job {self.id} was cancelled"
+        return f"ℹ️ Conversion job {self.id}: {self.status}"
+
+
+def _release(*semaphores: asyncio.Semaphore) -> None:
+    for semaphore in semaphores:
+        semaphore.release()
+
+
+def _consume(fut: asyncio.Future) -> None:
+    # an abandoned job's late failure is not worth an "exception never retrieved"
+    if not fut.cancelled():
+        fut.exception()
+
+
+class ConversionJobManager:
+    """
+    Runs blocking, CPU-heavy conversions on a bounded `ProcessPoolExecutor`.
+
+    Every job gets an id, a status and its own timeout, and can be cancelled
+    while it is still waiting. At most `max_per_kind` jobs of one converter
+    type hold a worker at once, so a burst of PDF conversions cannot starve
+    everything else, and a job is only handed to the pool (and marked
+    "running") once one of its `pool_size` workers is free. A conversion
+    already executing in a worker process cannot be interrupted: on timeout
+    (or when its caller goes away) the job is reported as such, but its
+    converter slot and worker are only released once the worker actually
+    finishes.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 2,
+        max_per_kind: int = 1,
+        timeout: float = 300.0,
+        history: int = 200,
+        mp_start_method: str = "spawn",
+    ):
+        if pool_size < 1 or max_per_kind < 1:
+            raise ValueError("pool_size and max_per_kind must be >= 1")
+        self.pool_size = pool_size
+        self.max_per_kind = max_per_kind
+        self.timeout = timeout
+        self.history = history
+        self.mp_start_method = mp_start_method
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._workers: Optional[asyncio.Semaphore] = None
+        # aclose(): no new jobs; shutdown(): no pool either, not even a new one
+        self._closed = False
+        self._shut_down = False
+        self._jobs: Dict[str, ConversionJob] = {}
+        self.counts = dict.fromkeys(TERMINAL_STATES, 0)
+
+    @classmethod
+    def from_settings(cls, settings) -> "ConversionJobManager":
+        return cls(
+            pool_size=settings.CONVERSION_POOL_SIZE,
+            max_per_kind=settings.CONVERSION_MAX_PER_KIND,
+            timeout=settings.CONVERSION_JOB_TIMEOUT,
+        )
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # created on first use; "spawn" keeps the children free of the
+        # parent's event loop and threads
+        if self._shut_down:
+            raise RuntimeError("ConversionJobManager is shut down")
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.pool_size,
+                mp_context=multiprocessing.get_context(self.mp_start_method),
+            )
+        return self._pool
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        on_done: Optional[Callable[[ConversionJob], Awaitable[None]]] = None,
+    ) -> ConversionJob:
+        """
+        Queue `func(*args)` (picklable, module-level) and return the job at once.
+        `on_done(job)` is awaited after it finishes, fails or times out.
+        """
+        if self._closed:
+            raise RuntimeError("ConversionJobManager is shut down")
+        job = ConversionJob(id=uuid.uuid4().hex[:8], kind=kind, timeout=timeout or self.timeout)
+        self._jobs[job.id] = job
+        job._task = asyncio.create_task(self._run(job, func, args, on_done), name=f"job-{job.id}")
+        logger.info("Conversion job %s (%s) queued", job.id, kind)
+        return job
+
+    async def run(
+        self, kind: str, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None
+    ) -> ConversionJob:
+        """
+        Submit a job and wait for it to finish; cancelling the caller
+        cancels the job.
+        """
+        job = self.submit(kind, func, *args, timeout=timeout)
+        await job._task
+        return job
+
+    def get(self, job_id: str) -> Optional[ConversionJob]:
+        return self._jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job that has not started executing yet. Returns True on
+        success; False if it is unknown, finished or already in a worker.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        # once handed to the pool, only the pool can call it off
+        if job._future is not None and not job._future.cancel():
+            return False
+        job._task.cancel()
+        await asyncio.gather(job._task, return_exceptions=True)
+        return True
+
+    async def _run(self, job, func, args, on_done) -> None:
+        slot = self._slots.setdefault(job.kind, asyncio.Semaphore(self.max_per_kind))
+        if self._workers is None:
+            self._workers = asyncio.Semaphore(self.pool_size)
+        workers = self._workers
+        loop = asyncio.get_running_loop()
+        try:
+            # 1) Wait for a converter slot of this kind, then for a free worker
+            await slot.acquire()
+            try:
+                await workers.acquire()
+            except BaseException:
+                slot.release()
+                raise
+            try:
+                cfut = self.pool.submit(func, *args)
+            except BaseException:
+                workers.release()
+                slot.release()
+                raise
+
+            # 2) Hold both until the worker process is really free; the
+            #    pool's callback runs on its own thread
+            def release(_: Future) -> None:
+                try:
+                    loop.call_soon_threadsafe(_release, slot, workers)
+                except RuntimeError:  # loop already closed
+                    pass
+
+            cfut.add_done_callback(release)
+            job._future = cfut
+            job.status = "running"
+            job.started_at = time.monotonic()
+
+            # 3) Wait for the result; a timeout or a cancelled caller does
+            #    not stop the worker, so the pool future is left to finish
+            result = asyncio.wrap_future(cfut)
+            try:
+                job.result = await asyncio.wait_for(asyncio.shield(result), job.timeout)
+                job.status = "done"
+            except asyncio.TimeoutError:
+                cfut.cancel()
+                result.add_done_callback(_consume)
+                job.status = "timeout"
+            except asyncio.CancelledError:
+                cfut.cancel()
+                result.add_done_callback(_consume)
+                raise
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+            logger.exception("Conversion job %s failed", job.id)
+        finally:
+            job.finished_at = time.monotonic()
+            self.counts[job.status] += 1
+            self._trim_history()
+            logger.info(
+                "Conversion job %s (%s) %s in %.3fs",
+                job.id, job.kind, job.status, job.finished_at - job.created_at,
+            )
+
+        if on_done is not None:
+            try:
+                await on_done(job)
+            except Exception:
+                logger.exception("Conversion job %s: on_done callback failed", job.id)
+
+    def _trim_history(self) -> None:
+        finished = [j for j in self._jobs.values() if j.finished]
+        for job in finished[: max(0, len(finished) - self.history)]:
+            del self._jobs[job.id]
+
+    def stats(self) -> Dict[str, Any]:
+        live = [j for j in self._jobs.values() if not j.finished]
+        return {
+            "pool_size": self.pool_size,
+            "max_per_kind": self.max_per_kind,
+            "queued": sum(j.status == "queued" for j in live),
+            "running": sum(j.status == "running" for j in live),
+            **self.counts,
+        }
+
+    async def aclose(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop taking jobs, give the submitted ones up to `timeout` seconds to
+        finish (and notify), then `shutdown()`.
+        """
+        self._closed = True
+        live = [j._task for j in self._jobs.values() if not j.finished and j._task is not None]
+        if live:
+            _, pending = await asyncio.wait(live, timeout=timeout)
+            if pending:
+                logger.warning("%d conversion job(s) unfinished at shutdown", len(pending))
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """
+        Cancel waiting jobs and stop the pool without blocking on running ones.
+        The manager accepts no jobs afterwards.
+        """
+        self._closed = self._shut_down = True
+        for job in self._jobs.values():
+            if job.status == "queued" and job._task is not None:
+                job._task.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
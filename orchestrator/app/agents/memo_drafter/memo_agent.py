@@ -4,9 +4,11 @@ import os
 from pinecone import Pinecone, ServerlessSpec
 
 class MemoDrafterAgent:
-    def __init__(self, llm_client):
+    def __init__(self, llm_client, semantic_cache=None):
         # 1) store your LLM client
         self.llm = llm_client
+        # optional SemanticCache: paraphrased repeat queries skip the LLM
+        self.semantic_cache = semantic_cache
 
         # 2) Load Pinecone credentials
         api_key = os.getenv("PINECONE_API_KEY")
@@ -37,7 +39,28 @@ class MemoDrafterAgent:
         # 5) Bind to the index for use
         self.index = self.pc.Index(self.index_name)
 
-    def run(self, query: str) -> str:
+    def _prompt(self, query: str) -> str:
         # TODO: implement your memo‐draft logic using self.index and self.llm
-        prompt = f"Draft a professional memo based on: {query}"
-        return self.llm.generate(prompt, max_tokens=5000)
\ No newline at end of file
+        return f"Draft a professional memo based on: {query}"
+
+    async def run(self, query: str) -> str:
+        cache = self.semantic_cache
+        if cache is not None and (cached := cache.lookup(query)) is not None:
+            return cached
+        memo = await self.llm.agenerate(self._prompt(query), max_tokens=5000)
+        if cache is not None:
+            cache.store(query, memo)
+        return memo
+
+    async def astream(self, query: str):
+        # same memo as run(), yielded chunk by chunk as the LLM produces it
+        cache = self.semantic_cache
+        if cache is not None and (cached := cache.lookup(query)) is not None:
+            yield cached
+            return
+        parts = []
+        async for chunk in self.llm.astream(self._prompt(query), max_tokens=5000):
+            parts.append(chunk)
+            yield chunk
+        if cache is not None:
+            cache.store(query, "".join(parts))
@@ -1,11 +1,14 @@
 # orchestrator/app/agents/memory/buffer_memory.py
 
+import asyncio
+import json
 import logging
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from redis.asyncio import Redis
 
 from app.core.config import settings
+from app.llm.tokens import count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -13,44 +16,243 @@ class BufferMemory:
     """
     Keeps a rolling window of the last `MEMORY_BUFFER_MAX_LEN`
     user+bot exchanges per chat, stored in Redis.
+
+    Each entry carries its token count, computed once when it is written,
+    so context assembly never has to re-tokenize the history.
+
+    Writes push and trim in a single MULTI/EXEC round trip. With
+    `write_behind=True` they are instead buffered (at most `max_pending`
+    entries) and flushed for all chats in one pipeline every
+    `flush_interval` seconds; reads still see the buffered entries, and
+    `aclose()` flushes whatever is left.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        redis: Optional[Redis] = None,
+        *,
+        write_behind: Optional[bool] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
         # Create a single shared Redis connection
         # `decode_responses=True` so we get back Python strings
-        self.redis: Redis = Redis.from_url(
+        self.redis: Redis = redis or Redis.from_url(
             settings.REDIS_URL, decode_responses=True
         )
         # how many total entries (user+bot) to keep
         self.maxlen = settings.MEMORY_BUFFER_MAX_LEN * 2
         self.key_prefix = settings.MEMORY_BUFFER_KEY_PREFIX
+        self.summary_prefix = settings.MEMORY_SUMMARY_KEY_PREFIX
+        self.token_model = settings.CONTEXT_TOKENIZER_MODEL
+
+        # write-behind buffering
+        self.write_behind = settings.MEMORY_WRITE_BEHIND if write_behind is None else write_behind
+        self.flush_interval = settings.MEMORY_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.max_pending = settings.MEMORY_MAX_PENDING if max_pending is None else max_pending
+        self._pending: Dict[str, List[str]] = {}
+        self._pending_count = 0
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        # False after a Redis call fails, True again after one succeeds
+        self.available = True
+
+        self.round_trips = 0
+        self.flushes = 0
+        self.dropped = 0
 
     def _key(self, chat_id: int) -> str:
         return f"{self.key_prefix}{chat_id}"
 
+    def _encode(self, line: str) -> str:
+        tokens, line = self.make_entries([line])[0]
+        return f"{tokens}\t{line}"
+
+    def _decode(self, raw: str) -> Tuple[int, str]:
+        tokens, sep, line = raw.partition("\t")
+        if sep and tokens.isdigit():
+            return int(tokens), line
+        # entry written before token counts were stored
+        return count_tokens(raw, self.token_model), raw
+
     async def add(self, chat_id: int, speaker: str, text: str) -> None:
         """
-        Push one entry at the tail, then trim list to last `maxlen`.
+        Append one entry and trim the list to the last `maxlen`.
         Speaker should be 'user' or 'bot'.
-        Stored format is e.g. "USER: Hello"
+        Stored format is e.g. "3\tUSER: Hello" (token count, tab, line)
+        """
+        await self.append(chat_id, [f"{speaker.upper()}: {text}"])
+
+    async def add_turn(self, chat_id: int, user: str, bot: str) -> None:
         """
+        Append a user message and the bot's reply together, atomically.
+        """
+        await self.append(chat_id, [f"USER: {user}", f"BOT: {bot}"])
+
+    def make_entries(self, lines: List[str]) -> List[Tuple[int, str]]:
+        return [(count_tokens(line, self.token_model), line) for line in lines]
+
+    async def append(self, chat_id: int, lines: List[str]) -> List[Tuple[int, str]]:
+        """
+        Write `lines` in one go; returns them as `(tokens, line)` pairs.
+        """
+        entries = self.make_entries(lines)
+        await self._write(chat_id, [f"{tokens}\t{line}" for tokens, line in entries])
+        return entries
+
+    async def _write(self, chat_id: int, entries: List[str]) -> None:
+        if self.write_behind:
+            await self._enqueue(str(chat_id), entries)
+            return
         key = self._key(chat_id)
-        entry = f"{speaker.upper()}: {text}"
         try:
-            await self.redis.rpush(key, entry)
-            # keep only the last `maxlen` entries
-            await self.redis.ltrim(key, -self.maxlen, -1)
+            # push + trim in one MULTI/EXEC: one round trip, never interleaved
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.rpush(key, *entries)
+                pipe.ltrim(key, -self.maxlen, -1)
+                self.round_trips += 1
+                await pipe.execute()
+            self.available = True
         except Exception as e:
+            self.available = False
             logger.error("BufferMemory.add failed: %s", e)
 
+    async def _enqueue(self, chat_id: str, entries: List[str]) -> None:
+        # a full buffer flushes inline, which slows writers down instead of
+        # growing without bound
+        if self._pending_count + len(entries) > self.max_pending:
+            await self.flush()
+        self._pending.setdefault(chat_id, []).extend(entries)
+        self._pending_count += len(entries)
+        self._shed()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop(), name="memory-flush")
+
+    async def _flush_loop(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Write every buffered entry, for all chats, in one pipeline.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            count, self._pending_count = self._pending_count, 0
+            try:
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    for chat_id, entries in batch.items():
+                        key = self._key(chat_id)
+                        pipe.rpush(key, *entries)
+                        pipe.ltrim(key, -self.maxlen, -1)
+                    self.round_trips += 1
+                    await pipe.execute()
+                self.flushes += 1
+                self.available = True
+            except Exception as e:
+                self.available = False
+                logger.error("BufferMemory.flush failed for %d entries: %s", count, e)
+                self._requeue(batch)
+
+    def _requeue(self, batch: Dict[str, List[str]]) -> None:
+        # put the failed batch back in front of newer writes
+        for chat_id, entries in batch.items():
+            self._pending[chat_id] = entries + self._pending.get(chat_id, [])
+            self._pending_count += len(entries)
+        self._shed()
+
+    def _shed(self) -> None:
+        # Redis is failing and the buffer is full: drop the oldest entries
+        while self._pending_count > self.max_pending:
+            chat_id = next(iter(self._pending))
+            self._pending[chat_id].pop(0)
+            self._pending_count -= 1
+            self.dropped += 1
+            if not self._pending[chat_id]:
+                del self._pending[chat_id]
+
+    async def aclose(self) -> None:
+        """
+        Stop the background flusher and write out anything still buffered.
+        """
+        if self._flusher is not None:
+            # under the lock, so a flush already in progress is never cut short
+            async with self._flush_lock:
+                self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    async def load_entries(self, chat_id: int) -> List[Tuple[int, str]]:
+        """
+        Like `get_entries`, but Redis errors are raised instead of read as
+        an empty history.
+        """
+        key = self._key(chat_id)
+        try:
+            self.round_trips += 1
+            raw = await self.redis.lrange(key, 0, -1)
+        except Exception:
+            self.available = False
+            raise
+        self.available = True
+        # read-your-writes: include entries still waiting to be flushed
+        pending = self._pending.get(str(chat_id))
+        if pending:
+            raw = (raw + pending)[-self.maxlen:]
+        return [self._decode(r) for r in raw]
+
+    async def get_entries(self, chat_id: int) -> List[Tuple[int, str]]:
+        """
+        Returns `(tokens, line)` pairs, oldest first.
+        """
+        try:
+            return await self.load_entries(chat_id)
+        except Exception as e:
+            logger.error("BufferMemory.get_entries failed: %s", e)
+            return []
+
     async def get_history(self, chat_id: int) -> List[str]:
         """
         Returns the list of stored lines, oldest first:
           ["USER: hello", "BOT: hi there", ...]
         """
-        key = self._key(chat_id)
+        return [line for _, line in await self.get_entries(chat_id)]
+
+    async def get_summary(self, chat_id: int) -> Optional[dict]:
+        """
+        The rolling summary of turns that no longer fit the context budget,
+        as written by `set_summary`, or None.
+        """
         try:
-            return await self.redis.lrange(key, 0, -1)
+            self.round_trips += 1
+            raw = await self.redis.get(f"{self.summary_prefix}{chat_id}")
+            self.available = True
         except Exception as e:
-            logger.error("BufferMemory.get_history failed: %s", e)
-            return []
+            self.available = False
+            logger.error("BufferMemory.get_summary failed: %s", e)
+            return None
+        return json.loads(raw) if raw else None
+
+    async def set_summary(self, chat_id: int, summary: dict) -> None:
+        try:
+            self.round_trips += 1
+            await self.redis.set(f"{self.summary_prefix}{chat_id}", json.dumps(summary))
+            self.available = True
+        except Exception as e:
+            self.available = False
+            logger.error("BufferMemory.set_summary failed: %s", e)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "available": self.available,
+            "write_behind": self.write_behind,
+            "round_trips": self.round_trips,
+            "flushes": self.flushes,
+            "pending": self._pending_count,
+            "dropped": self.dropped,
+        }
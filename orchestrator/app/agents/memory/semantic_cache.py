@@ -0,0 +1,153 @@
+# orchestrator/app/agents/memory/semantic_cache.py
+
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.llm.embeddings import HashingEmbedder, content_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Answer cache keyed by meaning rather than exact text.
+
+    Each stored query is embedded into a fixed-capacity float32 matrix; a
+    lookup returns the answer of the most similar live entry if its cosine
+    similarity reaches `threshold`. Entries expire after `ttl` seconds and,
+    when the cache is full, the least recently used one is replaced.
+
+    Similar is not the same question: "Can the tribe sue the state?" and
+    "Can the state sue the tribe?" embed identically with a bag-of-words
+    embedder, and a negation barely moves any embedding. So a hit also needs
+    the same content words in the same order (see `content_tokens`); the
+    embedding only admits rephrasings that differ in function words.
+    """
+
+    def __init__(
+        self,
+        embed: Optional[Callable[[str], np.ndarray]] = None,
+        *,
+        threshold: float = 0.85,
+        capacity: int = 512,
+        ttl: Optional[float] = 86400.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.embed = embed or HashingEmbedder()
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+
+        self._vectors: Optional[np.ndarray] = None   # (capacity, dim), allocated lazily
+        self._queries: List[Optional[str]] = [None] * capacity
+        self._tokens: List[Optional[Tuple[str, ...]]] = [None] * capacity
+        self._answers: List[Optional[str]] = [None] * capacity
+        self._expires = np.full(capacity, np.inf)
+        self._last_used = np.full(capacity, -np.inf)
+        self._live = np.zeros(capacity, dtype=bool)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_settings(
+        cls, settings, embed: Optional[Callable[[str], np.ndarray]] = None
+    ) -> Optional["SemanticCache"]:
+        """
+        Build a cache from SEMANTIC_CACHE_* settings, or None if disabled.
+        `embed` should be a model embedding; the hashing fallback is lexical.
+        """
+        if not getattr(settings, "SEMANTIC_CACHE_ENABLED", False):
+            return None
+        if embed is None:
+            logger.warning("SemanticCache enabled with the hashing embedder: only reworded questions will match")
+            embed = HashingEmbedder(dim=getattr(settings, "SEMANTIC_CACHE_DIM", 512))
+        return cls(
+            embed,
+            threshold=getattr(settings, "SEMANTIC_CACHE_THRESHOLD", 0.85),
+            capacity=getattr(settings, "SEMANTIC_CACHE_CAPACITY", 512),
+            ttl=getattr(settings, "SEMANTIC_CACHE_TTL", 86400.0),
+        )
+
+    def __len__(self) -> int:
+        return int(self._live.sum())
+
+    def _embed(self, text: str) -> np.ndarray:
+        vec = np.asarray(self.embed(text), dtype=np.float32)
+        if self._vectors is None:
+            self._vectors = np.zeros((self.capacity, vec.shape[0]), dtype=np.float32)
+        return vec
+
+    def _expire(self) -> None:
+        expired = self._live & (self._expires <= self.clock())
+        count = int(expired.sum())
+        if count:
+            self._live[expired] = False
+            self.expirations += count
+
+    def lookup(self, query: str) -> Optional[str]:
+        """
+        Return the cached answer for a sufficiently similar earlier query, or None.
+        """
+        self._expire()
+        if not self._live.any():
+            self.misses += 1
+            return None
+
+        vec = self._embed(query)
+        sims = np.where(self._live, self._vectors @ vec, -np.inf)
+        # most similar first, among the entries that ask the same question
+        tokens = content_tokens(query)
+        close = np.flatnonzero(sims >= self.threshold)
+        same = [int(i) for i in close[np.argsort(-sims[close])] if self._tokens[i] == tokens]
+        if not same:
+            self.misses += 1
+            return None
+        best = same[0]
+
+        self.hits += 1
+        self._last_used[best] = self.clock()
+        logger.info(
+            "SemanticCache hit (similarity %.3f): %r ~ %r",
+            sims[best], query, self._queries[best],
+        )
+        return self._answers[best]
+
+    def store(self, query: str, answer: str) -> None:
+        vec = self._embed(query)
+        self._expire()
+
+        free = np.flatnonzero(~self._live)
+        if free.size:
+            slot = int(free[0])
+        else:
+            slot = int(np.argmin(self._last_used))
+            self.evictions += 1
+
+        now = self.clock()
+        self._vectors[slot] = vec
+        self._queries[slot] = query
+        self._tokens[slot] = content_tokens(query)
+        self._answers[slot] = answer
+        self._expires[slot] = now + self.ttl if self.ttl else np.inf
+        self._last_used[slot] = now
+        self._live[slot] = True
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": len(self),
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
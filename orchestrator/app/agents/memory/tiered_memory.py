@@ -0,0 +1,195 @@
+# orchestrator/app/agents/memory/tiered_memory.py
+
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.agents.memory.buffer_memory import BufferMemory
+from app.core.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+Entry = Tuple[int, str]   # (tokens, "USER: ...")
+
+
+class TieredMemory:
+    """
+    Conversation memory with an in-process hot tier in front of Redis.
+
+    Recently active chats keep their history in a bounded deque (at most
+    `capacity` chats, each dropped after `idle_ttl` seconds without use).
+    Reads are served locally and fall through to Redis on a miss; writes go
+    to both. When Redis is unreachable the service degrades to the local
+    tier: cached chats keep working (new turns are kept only locally), and
+    Redis is only retried every `retry_after` seconds instead of on every
+    message.
+
+    One instance is meant to be shared by the whole process; the interface
+    matches `BufferMemory`.
+    """
+
+    def __init__(
+        self,
+        remote: Optional[BufferMemory] = None,
+        *,
+        capacity: int = 1000,
+        idle_ttl: Optional[float] = 900.0,
+        retry_after: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.remote = remote or BufferMemory()
+        self.maxlen = self.remote.maxlen
+        self.capacity = capacity
+        self.idle_ttl = idle_ttl
+        self.retry_after = retry_after
+        self.clock = clock
+
+        # chat_id → (history, last used); least recently used first
+        self._chats: "OrderedDict[str, Tuple[Deque[Entry], float]]" = OrderedDict()
+        # chats being read through, with the writes seen meanwhile
+        self._loading: Dict[str, int] = {}
+        self._degraded_until = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.idle_evictions = 0
+        self.degraded_reads = 0
+
+    @classmethod
+    def from_settings(cls, settings) -> "TieredMemory":
+        return cls(
+            BufferMemory(),
+            capacity=settings.MEMORY_LOCAL_CHATS,
+            idle_ttl=settings.MEMORY_LOCAL_IDLE_TTL,
+            retry_after=settings.MEMORY_DEGRADED_RETRY,
+        )
+
+    @property
+    def degraded(self) -> bool:
+        return self.clock() < self._degraded_until
+
+    def _check_remote(self) -> None:
+        if not self.remote.available and not self.degraded:
+            logger.warning("Redis unavailable: serving memory from the local tier for %ss", self.retry_after)
+            self._degraded_until = self.clock() + self.retry_after
+
+    def _evict_idle(self, now: float) -> None:
+        if self.idle_ttl is None:
+            return
+        while self._chats:
+            chat_id, (_, last_used) = next(iter(self._chats.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self._chats[chat_id]
+            self.idle_evictions += 1
+
+    def _cache(self, chat_id: str, entries: List[Entry]) -> None:
+        self._chats[chat_id] = (deque(entries, maxlen=self.maxlen), self.clock())
+        self._chats.move_to_end(chat_id)
+        while len(self._chats) > self.capacity:
+            self._chats.popitem(last=False)
+            self.evictions += 1
+
+    @traced("memory.read")
+    async def get_entries(self, chat_id: int) -> List[Entry]:
+        """
+        Returns `(tokens, line)` pairs, oldest first.
+        """
+        key = str(chat_id)
+        now = self.clock()
+        self._evict_idle(now)
+
+        # 1) Hot chat: served locally
+        cached = self._chats.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._chats[key] = (cached[0], now)
+            self._chats.move_to_end(key)
+            return list(cached[0])
+
+        # 2) Miss while degraded: nothing to serve, don't wait on Redis
+        self.misses += 1
+        if self.degraded:
+            self.degraded_reads += 1
+            return []
+
+        # 3) Read through; a write that lands mid-read makes the result
+        #    stale, so it is returned but not cached
+        self._loading[key] = 0
+        try:
+            entries = await self.remote.load_entries(chat_id)
+        except Exception as e:
+            logger.error("TieredMemory read-through failed: %s", e)
+            self._check_remote()
+            return []
+        finally:
+            writes = self._loading.pop(key, 0)
+        if not writes:
+            self._cache(key, entries)
+        return entries
+
+    async def get_history(self, chat_id: int) -> List[str]:
+        return [line for _, line in await self.get_entries(chat_id)]
+
+    async def add(self, chat_id: int, speaker: str, text: str) -> None:
+        await self._append(chat_id, [f"{speaker.upper()}: {text}"])
+
+    async def add_turn(self, chat_id: int, user: str, bot: str) -> None:
+        await self._append(chat_id, [f"USER: {user}", f"BOT: {bot}"])
+
+    @traced("memory.write")
+    async def _append(self, chat_id: int, lines: List[str]) -> None:
+        key = str(chat_id)
+        if key in self._loading:
+            self._loading[key] += 1
+        if self.degraded:
+            # keep the conversation going locally until Redis is back
+            entries = self.remote.make_entries(lines)
+            if key not in self._chats:
+                self._cache(key, [])
+        else:
+            # write-through: Redis first, then the local copy (if this chat is hot)
+            entries = await self.remote.append(chat_id, lines)
+            self._check_remote()
+        cached = self._chats.get(key)
+        if cached is not None:
+            cached[0].extend(entries)
+            self._chats[key] = (cached[0], self.clock())
+            self._chats.move_to_end(key)
+
+    @traced("memory.read")
+    async def get_summary(self, chat_id: int) -> Optional[dict]:
+        if self.degraded:
+            return None
+        summary = await self.remote.get_summary(chat_id)
+        self._check_remote()
+        return summary
+
+    @traced("memory.write")
+    async def set_summary(self, chat_id: int, summary: dict) -> None:
+        if self.degraded:
+            return
+        await self.remote.set_summary(chat_id, summary)
+        self._check_remote()
+
+    async def aclose(self) -> None:
+        await self.remote.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "chats": len(self._chats),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "idle_evictions": self.idle_evictions,
+            "degraded": self.degraded,
+            "degraded_reads": self.degraded_reads,
+            "redis": self.remote.stats(),
+        }
@@ -0,0 +1,414 @@
+# orchestrator/app/agents/memory/vector_index.py
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Match:
+    id: str
+    score: float
+    metadata: Optional[Dict[str, Any]] = None
+    values: Optional[List[float]] = None
+
+
+@dataclass
+class QueryResponse:
+    matches: List[Match] = field(default_factory=list)
+
+    def __getitem__(self, key):
+        # allow resp["matches"] like the Pinecone client
+        return getattr(self, key)
+
+
+VectorLike = Union[Tuple, Dict[str, Any]]
+
+
+class LocalVectorIndex:
+    """
+    On-disk vector index with the same upsert/query surface as a Pinecone Index.
+
+    Vectors live as float32 rows in a memory-mapped file (`vectors.f32`), with
+    ids and metadata in a small JSON sidecar (`index.json`). Queries are exact
+    NumPy top-k scans done in row blocks; once `build_ivf()` has partitioned
+    the rows into k-means cells, large indexes answer from the `nprobe`
+    closest cells only (IVF), trading a little recall for much less work.
+    Queries can be restricted to rows whose metadata matches a Pinecone-style
+    equality `filter`; such queries scan the matching rows exactly. The name
+    of the `embedding` the vectors come from is kept in the sidecar, so an
+    index is never reopened (or queried) under a different embedder.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    SIDECAR_FILE = "index.json"
+    IVF_FILE = "ivf.npz"
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        dimension: int,
+        metric: str = "cosine",
+        *,
+        nprobe: int = 8,
+        ivf_threshold: int = 50_000,
+        block_rows: int = 65_536,
+        autoflush: bool = True,
+        embedding: Optional[str] = None,
+    ):
+        if metric not in ("cosine", "dotproduct"):
+            raise ValueError(f"Unsupported metric {metric!r}; use 'cosine' or 'dotproduct'")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dimension = dimension
+        self.metric = metric
+        self.nprobe = nprobe
+        self.ivf_threshold = ivf_threshold
+        self.block_rows = block_rows
+        # bulk loaders can turn this off and call flush() once at the end
+        self.autoflush = autoflush
+        # embedder name (e.g. HashingEmbedder.name); None = unknown
+        self.embedding = embedding
+
+        self._ids: List[str] = []
+        self._metadata: List[Optional[Dict[str, Any]]] = []
+        self._pos: Dict[str, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._capacity = 0
+
+        # IVF state: centroids, per-row cell assignment, and cached inverted lists
+        self._centroids: Optional[np.ndarray] = None
+        self._assign: Optional[np.ndarray] = None
+        self._lists: Optional[List[np.ndarray]] = None
+
+        self._load()
+
+    # — persistence —
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.path / self.VECTORS_FILE
+
+    def _load(self) -> None:
+        sidecar = self.path / self.SIDECAR_FILE
+        if not sidecar.exists():
+            return
+        meta = json.loads(sidecar.read_text(encoding="utf-8"))
+        if meta["dimension"] != self.dimension or meta["metric"] != self.metric:
+            raise ValueError(
+                f"Index at {self.path} is {meta['dimension']}-dim {meta['metric']}, "
+                f"not {self.dimension}-dim {self.metric}"
+            )
+        recorded = meta.get("embedding")
+        if recorded and self.embedding and recorded != self.embedding:
+            raise ValueError(f"Index at {self.path} holds {recorded} vectors, not {self.embedding}")
+        # vectors stored before the embedder was recorded are of unknown origin
+        self.embedding = recorded or (None if meta["ids"] else self.embedding)
+        self._ids = meta["ids"]
+        self._metadata = meta["metadata"]
+        self._pos = {id_: i for i, id_ in enumerate(self._ids)}
+        rows = os.path.getsize(self._vectors_path) // (4 * self.dimension)
+        if rows:
+            self._map(rows)
+
+        ivf = self.path / self.IVF_FILE
+        if ivf.exists():
+            with np.load(ivf) as data:
+                self._centroids = data["centroids"]
+                self._assign = data["assign"]
+        logger.info("LocalVectorIndex loaded %d vectors from %s", len(self._ids), self.path)
+
+    def _map(self, rows: int) -> None:
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(rows * 4 * self.dimension)
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dimension)
+        )
+        self._capacity = rows
+
+    def _ensure_capacity(self, rows: int) -> None:
+        if rows > self._capacity:
+            self._map(max(rows, 2 * self._capacity, 1024))
+
+    def flush(self) -> None:
+        """
+        Persist vectors, the id/metadata sidecar and any IVF partitioning.
+        """
+        if self._vectors is not None:
+            self._vectors.flush()
+        sidecar = {
+            "dimension": self.dimension,
+            "metric": self.metric,
+            "embedding": self.embedding,
+            "count": len(self._ids),
+            "ids": self._ids,
+            "metadata": self._metadata,
+        }
+        tmp = self.path / (self.SIDECAR_FILE + ".tmp")
+        tmp.write_text(json.dumps(sidecar, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path / self.SIDECAR_FILE)
+        if self._centroids is not None:
+            np.savez(self.path / self.IVF_FILE, centroids=self._centroids, assign=self._assign)
+
+    # — writes —
+
+    def _prepare(self, values: Any) -> np.ndarray:
+        arr = np.asarray(values, dtype=np.float32)
+        if arr.ndim == 1:
+            arr = arr[None, :]
+        if arr.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-dim vectors, got {arr.shape[1]}")
+        if self.metric == "cosine":
+            norms = np.linalg.norm(arr, axis=1, keepdims=True)
+            arr = arr / np.where(norms == 0, 1, norms)
+        return arr
+
+    @staticmethod
+    def _unpack(item: VectorLike) -> Tuple[str, Sequence[float], Optional[Dict[str, Any]]]:
+        if isinstance(item, dict):
+            return str(item["id"]), item["values"], item.get("metadata")
+        if len(item) == 3:
+            return str(item[0]), item[1], item[2]
+        return str(item[0]), item[1], None
+
+    def upsert(self, vectors: Iterable[VectorLike], namespace: str = "") -> Dict[str, int]:
+        """
+        Insert or overwrite vectors given as `(id, values[, metadata])` tuples
+        or `{"id", "values", "metadata"}` dicts.
+        """
+        if namespace:
+            raise ValueError("LocalVectorIndex does not support namespaces")
+        items = [self._unpack(v) for v in vectors]
+        if not items:
+            return {"upserted_count": 0}
+        arr = self._prepare([values for _, values, _ in items])
+
+        rows = []
+        for id_, _, metadata in items:
+            row = self._pos.get(id_)
+            if row is None:
+                row = len(self._ids)
+                self._pos[id_] = row
+                self._ids.append(id_)
+                self._metadata.append(metadata)
+            else:
+                self._metadata[row] = metadata
+            rows.append(row)
+
+        self._ensure_capacity(len(self._ids))
+        rows_arr = np.asarray(rows)
+        self._vectors[rows_arr] = arr
+
+        if self._centroids is not None:
+            # keep the IVF cells current without a full rebuild
+            grown = len(self._ids) - len(self._assign)
+            if grown:
+                self._assign = np.concatenate([self._assign, np.zeros(grown, dtype=np.int32)])
+            self._assign[rows_arr] = np.argmax(arr @ self._centroids.T, axis=1)
+            self._lists = None
+
+        if self.autoflush:
+            self.flush()
+        return {"upserted_count": len(items)}
+
+    # — IVF partitioning —
+
+    def build_ivf(
+        self,
+        nlist: Optional[int] = None,
+        iterations: int = 10,
+        sample_size: int = 100_000,
+        seed: int = 0,
+    ) -> None:
+        """
+        Partition the stored vectors into `nlist` k-means cells (default ≈ 4·√n).
+        """
+        n = len(self._ids)
+        if n == 0:
+            raise ValueError("Cannot build IVF on an empty index")
+        nlist = min(n, nlist or max(1, int(4 * np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+
+        data = self._vectors[:n]
+        sample = data[np.sort(rng.choice(n, size=min(n, sample_size), replace=False))]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids /= np.where(norms == 0, 1, norms)
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, self.block_rows):
+            block = data[start:start + self.block_rows]
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        self._centroids = centroids.astype(np.float32)
+        self._assign = assign
+        self._lists = None
+        self.flush()
+        logger.info("LocalVectorIndex built IVF with %d cells over %d vectors", nlist, n)
+
+    def _inverted_lists(self) -> List[np.ndarray]:
+        if self._lists is None:
+            order = np.argsort(self._assign, kind="stable")
+            bounds = np.searchsorted(self._assign[order], np.arange(len(self._centroids) + 1))
+            self._lists = [order[bounds[c]:bounds[c + 1]] for c in range(len(self._centroids))]
+        return self._lists
+
+    # — reads —
+
+    def _exact_topk(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(self._ids)
+        best_idx = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, n, self.block_rows):
+            block = self._vectors[start:min(n, start + self.block_rows)]
+            scores = queries @ block.T
+            kk = min(k, scores.shape[1])
+            part = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, part, 1)], axis=1)
+            best_idx = np.concatenate([best_idx, part + start], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, 1)
+                best_idx = np.take_along_axis(best_idx, keep, 1)
+        order = np.argsort(-best_scores, axis=1)
+        return np.take_along_axis(best_idx, order, 1), np.take_along_axis(best_scores, order, 1)
+
+    def _ivf_topk(self, query: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        lists = self._inverted_lists()
+        cells = np.argsort(-(self._centroids @ query))[:nprobe]
+        rows = np.sort(np.concatenate([lists[c] for c in cells]))
+        if rows.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = self._vectors[rows] @ query
+        kk = min(k, rows.size)
+        top = np.argpartition(-scores, kk - 1)[:kk]
+        top = top[np.argsort(-scores[top])]
+        return rows[top], scores[top]
+
+    def _filter_rows(self, filter: Dict[str, Any]) -> np.ndarray:
+        """
+        Rows whose metadata matches `filter`: `{"field": value}`,
+        `{"field": {"$eq": value}}` or `{"field": {"$in": [values]}}`.
+        """
+        tests = []
+        for key, cond in filter.items():
+            if not isinstance(cond, dict):
+                cond = {"$eq": cond}
+            for op, value in cond.items():
+                if op == "$eq":
+                    tests.append(lambda meta, k=key, v=value: meta.get(k) == v)
+                elif op == "$in":
+                    tests.append(lambda meta, k=key, v=tuple(value): meta.get(k) in v)
+                else:
+                    raise ValueError(f"Unsupported filter operator {op!r}; use '$eq' or '$in'")
+        return np.asarray(
+            [i for i, meta in enumerate(self._metadata) if all(t(meta or {}) for t in tests)],
+            dtype=np.int64,
+        )
+
+    def _subset_topk(self, queries: np.ndarray, rows: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        if rows.size == 0:
+            return [(rows, np.empty(0, dtype=np.float32)) for _ in queries]
+        scores = queries @ self._vectors[rows].T
+        kk = min(k, rows.size)
+        results = []
+        for row_scores in scores:
+            top = np.argpartition(-row_scores, kk - 1)[:kk]
+            top = top[np.argsort(-row_scores[top])]
+            results.append((rows[top], row_scores[top]))
+        return results
+
+    def _use_ivf(self, mode: str) -> bool:
+        if mode == "exact":
+            return False
+        if mode == "ivf":
+            if self._centroids is None:
+                raise ValueError("IVF mode requested but build_ivf() has not been run")
+            return True
+        return self._centroids is not None and len(self._ids) >= self.ivf_threshold
+
+    def query_batch(
+        self,
+        vectors: Any,
+        top_k: int = 10,
+        include_metadata: bool = False,
+        include_values: bool = False,
+        mode: str = "auto",
+        nprobe: Optional[int] = None,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[QueryResponse]:
+        """
+        Top-k search for several query vectors at once.
+        `mode` is "exact", "ivf" or "auto" (IVF once built and the index is large);
+        with a metadata `filter` the matching rows are always scanned exactly.
+        """
+        queries = self._prepare(vectors)
+        if not self._ids or top_k < 1:
+            return [QueryResponse() for _ in range(len(queries))]
+
+        if filter:
+            results = self._subset_topk(queries, self._filter_rows(filter), top_k)
+        elif self._use_ivf(mode):
+            probe = min(nprobe or self.nprobe, len(self._centroids))
+            results = [self._ivf_topk(q, top_k, probe) for q in queries]
+        else:
+            idx, scores = self._exact_topk(queries, top_k)
+            results = list(zip(idx, scores))
+
+        return [
+            QueryResponse([
+                Match(
+                    id=self._ids[row],
+                    score=float(score),
+                    metadata=self._metadata[row] if include_metadata else None,
+                    values=self._vectors[row].tolist() if include_values else None,
+                )
+                for row, score in zip(rows, scores)
+            ])
+            for rows, scores in results
+        ]
+
+    def query(
+        self,
+        vector: Sequence[float],
+        top_k: int = 10,
+        include_metadata: bool = False,
+        include_values: bool = False,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "auto",
+        nprobe: Optional[int] = None,
+    ) -> QueryResponse:
+        # Pinecone's other options (sparse vectors, ids, ...) are not
+        # supported and fail as unexpected keyword arguments
+        if namespace:
+            raise ValueError("LocalVectorIndex does not support namespaces")
+        return self.query_batch(
+            [vector], top_k, include_metadata=include_metadata,
+            include_values=include_values, mode=mode, nprobe=nprobe, filter=filter,
+        )[0]
+
+    def describe_index_stats(self) -> Dict[str, Any]:
+        return {
+            "dimension": self.dimension,
+            "metric": self.metric,
+            "embedding": self.embedding,
+            "total_vector_count": len(self._ids),
+            "ivf_cells": 0 if self._centroids is None else len(self._centroids),
+        }
@@ -0,0 +1,49 @@
+# orchestrator/app/agents/voice/ffmpeg.py
+
+import asyncio
+import logging
+from typing import AsyncIterable, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+AudioSource = Union[bytes, AsyncIterable[bytes]]
+
+
+async def pipe(binary: str, args: Sequence[str], source: AudioSource) -> bytes:
+    """
+    Run `binary -i pipe:0 <args> pipe:1` with `source` on stdin and return
+    stdout. Input is fed while output is read, so neither side blocks on a
+    full pipe and nothing is written to disk.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        binary, "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0", *args, "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    async def feed():
+        try:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                proc.stdin.write(source)
+                await proc.stdin.drain()
+            else:
+                async for chunk in source:
+                    proc.stdin.write(chunk)
+                    await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg gave up early; its exit code tells us why
+        finally:
+            proc.stdin.close()
+
+    try:
+        _, out, err = await asyncio.gather(feed(), proc.stdout.read(), proc.stderr.read())
+        await proc.wait()
+    except asyncio.CancelledError:
+        if proc.returncode is None:
+            proc.kill()
+        raise
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed ({proc.returncode}): {err.decode(errors='replace').strip()}")
+    return out
@@ -0,0 +1,155 @@
+# orchestrator/app/agents/voice/transcription.py
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, Optional, Protocol
+
+from app.agents.voice import ffmpeg
+from app.agents.voice.ffmpeg import AudioSource
+from app.core.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# PCM produced by the decoder: signed 16-bit little-endian mono
+SAMPLE_WIDTH = 2
+
+
+class Recognizer(Protocol):
+    """
+    Blocking speech-to-text over raw PCM; runs on the pipeline's worker pool.
+    """
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        ...
+
+
+class GoogleRecognizer:
+    """
+    SpeechRecognition's free Google Web Speech endpoint.
+    """
+
+    def __init__(self, language: str = "en-US"):
+        import speech_recognition as sr  # type: ignore
+        self._sr = sr
+        self.language = language
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        audio = self._sr.AudioData(pcm, sample_rate, SAMPLE_WIDTH)
+        return self._sr.Recognizer().recognize_google(audio, language=self.language)
+
+
+class OfflineRecognizer:
+    """
+    Network-free stand-in for tests and load runs: returns a fixed transcript,
+    or a description of the audio it was given.
+    """
+
+    def __init__(self, text: Optional[str] = None):
+        self.text = text
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        if self.text is not None:
+            return self.text
+        seconds = len(pcm) / (SAMPLE_WIDTH * sample_rate)
+        return f"[{seconds:.1f}s of audio]"
+
+
+class FfmpegDecoder:
+    """
+    Decodes any ffmpeg-readable input (Telegram voice notes are OGG/Opus) to
+    mono 16-bit PCM through stdin/stdout pipes, so nothing touches the disk.
+    """
+
+    def __init__(self, sample_rate: int = 16000, binary: str = "ffmpeg"):
+        self.sample_rate = sample_rate
+        self.binary = binary
+
+    async def __call__(self, source: AudioSource) -> bytes:
+        return await ffmpeg.pipe(
+            self.binary,
+            ["-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(self.sample_rate)],
+            source,
+        )
+
+
+class TranscriptionPipeline:
+    """
+    Voice note → text without temp files or blocking the event loop.
+
+    Audio is decoded in memory (`decoder`, ffmpeg by default) and handed to
+    the pluggable `recognizer` on a dedicated thread pool. At most
+    `max_concurrency` transcriptions run at once; the rest wait their turn.
+    """
+
+    def __init__(
+        self,
+        recognizer: Recognizer,
+        *,
+        decoder: Optional[Callable[[AudioSource], Awaitable[bytes]]] = None,
+        sample_rate: int = 16000,
+        max_concurrency: int = 4,
+    ):
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.decoder = decoder or FfmpegDecoder(sample_rate)
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="voice-stt"
+        )
+
+        self.completed = 0
+        self.failed = 0
+        self.decode_seconds = 0.0
+        self.recognize_seconds = 0.0
+
+    @classmethod
+    def from_settings(cls, settings) -> "TranscriptionPipeline":
+        backend = settings.VOICE_RECOGNIZER.lower()
+        if backend == "google":
+            recognizer = GoogleRecognizer(settings.VOICE_LANGUAGE)
+        elif backend == "offline":
+            recognizer = OfflineRecognizer()
+        else:
+            raise ValueError(f"Unknown VOICE_RECOGNIZER: {settings.VOICE_RECOGNIZER!r}")
+        return cls(
+            recognizer,
+            decoder=FfmpegDecoder(settings.VOICE_SAMPLE_RATE, settings.FFMPEG_BINARY),
+            sample_rate=settings.VOICE_SAMPLE_RATE,
+            max_concurrency=settings.VOICE_MAX_CONCURRENCY,
+        )
+
+    @traced("stt.transcribe")
+    async def transcribe(self, source: AudioSource) -> str:
+        async with self._slots:
+            try:
+                start = perf_counter()
+                pcm = await self.decoder(source)
+                decoded = perf_counter()
+                text = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self.recognizer.transcribe, pcm, self.sample_rate
+                )
+            except Exception:
+                self.failed += 1
+                raise
+            done = perf_counter()
+        self.completed += 1
+        self.decode_seconds += decoded - start
+        self.recognize_seconds += done - decoded
+        logger.info(
+            "Transcribed %.1fs of audio (decode %.3fs, recognize %.3fs)",
+            len(pcm) / (SAMPLE_WIDTH * self.sample_rate), decoded - start, done - decoded,
+        )
+        return text
+
+    def stats(self) -> Dict[str, float]:
+        n = self.completed or 1
+        return {
+            "max_concurrency": self.max_concurrency,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_decode_s": round(self.decode_seconds / n, 6),
+            "avg_recognize_s": round(self.recognize_seconds / n, 6),
+        }
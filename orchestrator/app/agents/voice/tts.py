@@ -0,0 +1,196 @@
+# orchestrator/app/agents/voice/tts.py
+
+import asyncio
+import hashlib
+import io
+import logging
+import math
+import struct
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, Optional, Protocol
+
+from app.agents.voice import ffmpeg
+from app.core.tracing import traced
+from app.llm.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class TTSEngine(Protocol):
+    """
+    Blocking text-to-speech; returns encoded audio in any ffmpeg-readable
+    format. Runs on the synthesizer's worker pool.
+    """
+
+    name: str
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        ...
+
+
+class GTTSEngine:
+    """
+    Google Translate TTS. `voice` is a language code, optionally with an
+    accent domain: "en", "en:co.uk", "fr:ca".
+    """
+
+    name = "gtts"
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        from gtts import gTTS  # type: ignore
+        lang, _, tld = voice.partition(":")
+        buf = io.BytesIO()
+        gTTS(text, lang=lang or "en", tld=tld or "com").write_to_fp(buf)
+        return buf.getvalue()
+
+
+class ToneEngine:
+    """
+    Network-free stand-in for tests and load runs: a WAV tone whose length
+    follows the text, so downstream encoding and caching behave realistically.
+    """
+
+    name = "tone"
+
+    def __init__(self, sample_rate: int = 16000, seconds_per_char: float = 0.05, max_seconds: float = 10.0):
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+        self.max_seconds = max_seconds
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        frames = int(self.sample_rate * min(self.max_seconds, len(text) * self.seconds_per_char))
+        pitch = 220 + (sum(map(ord, voice)) % 220)
+        samples = (
+            int(8000 * math.sin(2 * math.pi * pitch * i / self.sample_rate)) for i in range(frames)
+        )
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(b"".join(struct.pack("<h", s) for s in samples))
+        return buf.getvalue()
+
+
+class FfmpegOpusEncoder:
+    """
+    Transcodes engine output to OGG/Opus (what Telegram plays as a voice note)
+    through ffmpeg's stdin/stdout, entirely in memory.
+    """
+
+    def __init__(self, bitrate: str = "32k", binary: str = "ffmpeg"):
+        self.bitrate = bitrate
+        self.binary = binary
+
+    async def __call__(self, audio: bytes) -> bytes:
+        return await ffmpeg.pipe(
+            self.binary,
+            ["-vn", "-ac", "1", "-c:a", "libopus", "-b:a", self.bitrate,
+             "-application", "voip", "-f", "ogg"],
+            audio,
+        )
+
+
+def audio_key(engine: str, voice: str, text: str) -> str:
+    """
+    Content address of a synthesized clip: the same text in the same voice
+    always maps to the same audio.
+    """
+    return hashlib.sha256(f"{engine}\x00{voice}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class SpeechSynthesizer:
+    """
+    Text → OGG/Opus voice-note bytes, ready to upload.
+
+    The engine runs on a dedicated thread pool (at most `max_concurrency`
+    clips at once) and its output is transcoded in memory by `encoder`.
+    Finished clips are kept in an LRU keyed by engine, voice and text, so a
+    repeated one-liner is served without synthesizing it again.
+    """
+
+    def __init__(
+        self,
+        engine: TTSEngine,
+        *,
+        encoder: Optional[Callable[[bytes], Awaitable[bytes]]] = None,
+        voice: str = "en",
+        max_concurrency: int = 2,
+        cache_entries: int = 256,
+        cache_ttl: Optional[float] = None,
+    ):
+        self.engine = engine
+        self.encoder = encoder or FfmpegOpusEncoder()
+        self.voice = voice
+        self.max_concurrency = max_concurrency
+        self.cache = LRUCache(max_entries=cache_entries, ttl=cache_ttl)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="voice-tts"
+        )
+
+        self.synthesized = 0
+        self.failed = 0
+        self.synth_seconds = 0.0
+
+    @classmethod
+    def from_settings(cls, settings) -> "SpeechSynthesizer":
+        name = settings.TTS_ENGINE.lower()
+        if name == "gtts":
+            engine = GTTSEngine()
+        elif name in ("tone", "offline"):
+            engine = ToneEngine()
+        else:
+            raise ValueError(f"Unknown TTS_ENGINE: {settings.TTS_ENGINE!r}")
+        return cls(
+            engine,
+            encoder=FfmpegOpusEncoder(settings.TTS_OPUS_BITRATE, settings.FFMPEG_BINARY),
+            voice=settings.TTS_VOICE,
+            max_concurrency=settings.TTS_MAX_CONCURRENCY,
+            cache_entries=settings.TTS_CACHE_ENTRIES,
+            cache_ttl=settings.TTS_CACHE_TTL,
+        )
+
+    @traced("tts.synthesize")
+    async def synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        voice = voice or self.voice
+        key = audio_key(self.engine.name, voice, text)
+
+        # 1) Served from cache
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info("TTS cache hit (%d bytes)", len(cached))
+            return cached
+
+        # 2) Synthesize off the loop, then transcode in memory
+        async with self._slots:
+            start = perf_counter()
+            try:
+                raw = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self.engine.synthesize, text, voice
+                )
+                audio = await self.encoder(raw)
+            except Exception:
+                self.failed += 1
+                raise
+            elapsed = perf_counter() - start
+
+        self.synthesized += 1
+        self.synth_seconds += elapsed
+        logger.info("TTS synthesized %d chars → %d bytes in %.3fs", len(text), len(audio), elapsed)
+
+        # 3) Remember the clip
+        self.cache.set(key, audio)
+        return audio
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "engine": self.engine.name,
+            "max_concurrency": self.max_concurrency,
+            "synthesized": self.synthesized,
+            "failed": self.failed,
+            "avg_synth_s": round(self.synth_seconds / (self.synthesized or 1), 6),
+            "cache": self.cache.stats(),
+        }
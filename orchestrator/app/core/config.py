@@ -15,9 +15,123 @@ class Settings(BaseSettings):
     WEBHOOK_SECRET: str
 
     # — LLM backend
-    LLM_BACKEND: str = "openai"           # "openai" or "llama"
+    LLM_BACKEND: str = "openai"           # openai, transformers ("llama"), llama_cpp or fake
     OPENAI_API_KEY: Optional[str] = None
     LLAMA_MODEL_PATH: Optional[str] = None
+    # Threads dedicated to the (blocking) transformers pipeline in LLMClient.agenerate
+    LLM_EXECUTOR_WORKERS: int = 1
+    # Run the llama model in a dedicated process that batches concurrent prompts
+    LLAMA_BATCHING: bool = False
+    LLAMA_MAX_BATCH: int = 8              # prompts per batched generate call
+    LLAMA_MAX_WAIT_MS: float = 10.0       # how long a batch waits to fill up
+    LLAMA_WORKER_THREADS: int = 0         # torch threads in the worker; 0 = library default
+
+    # — Fake backend (LLM_BACKEND=fake): offline, deterministic answers for load tests
+    FAKE_LATENCY_MS: float = 200.0        # mean time to first token
+    FAKE_LATENCY_DIST: str = "lognormal"  # fixed, uniform, exponential or lognormal
+    FAKE_LATENCY_SPREAD: float = 0.5      # uniform: ±fraction of the mean; lognormal: sigma
+    FAKE_TOKENS_PER_S: float = 50.0       # after the first token
+    FAKE_REPLY_TOKENS: int = 40           # words per answer (capped by max_tokens)
+    FAKE_FAILURE_RATE: float = 0.0        # fraction of calls that raise
+    FAKE_SEED: Optional[int] = None       # repeatable latency/failure draws
+
+    # — OpenAI HTTP transport (one pooled httpx client per process, see transport.py)
+    OPENAI_BASE_URL: Optional[str] = None # e.g. a proxy, or a local mock server in tests
+    OPENAI_MAX_CONNECTIONS: int = 20
+    OPENAI_MAX_KEEPALIVE: int = 10        # idle connections kept open for reuse
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0 # seconds an idle connection is kept
+    OPENAI_HTTP2: bool = True             # only if the h2 package is installed
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_READ_TIMEOUT: float = 60.0     # between bytes, so long streams are fine
+    OPENAI_WRITE_TIMEOUT: float = 10.0
+    OPENAI_POOL_TIMEOUT: float = 5.0      # waiting for a free connection
+    OPENAI_MAX_RETRIES: int = 3           # on connect errors, 408/409/429/5xx
+    OPENAI_RETRY_BASE: float = 0.5        # seconds; full-jitter exponential backoff
+    OPENAI_RETRY_MAX_DELAY: float = 20.0  # longer Retry-After waits are not honoured
+
+    # — LLM response cache (exact match on backend/model/prompt/kwargs)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024     # in-process LRU size
+    LLM_CACHE_TTL: float = 3600.0         # seconds; applies to both tiers
+    LLM_CACHE_REDIS: bool = False         # also share cached answers via REDIS_URL
+    LLM_CACHE_KEY_PREFIX: str = "llmcache:"
+    LLM_SINGLE_FLIGHT: bool = True        # identical concurrent calls share one backend call
+
+    # — LLM admission control (global cap, per-chat token buckets, priorities)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENT: int = 8     # backend calls in flight at once
+    ADMISSION_CHAT_RATE: float = 0.5      # sustained LLM calls per second per chat
+    ADMISSION_CHAT_BURST: float = 5.0     # calls a chat may make back to back
+    ADMISSION_MAX_QUEUED_EXTRAS: int = 32 # queued low-priority calls before shedding
+    ADMISSION_SHED_AFTER: float = 5.0     # seconds a low-priority call may wait for a slot
+
+    # — Semantic answer cache for case-law / memo queries (paraphrase matching).
+    #   Off by default: the built-in hashing embedder ignores word order, so
+    #   enable it only with a model embedding (SemanticCache(embed=...))
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.85  # min cosine similarity for a hit
+    SEMANTIC_CACHE_CAPACITY: int = 512      # entries per agent
+    SEMANTIC_CACHE_TTL: float = 86400.0     # seconds
+    SEMANTIC_CACHE_DIM: int = 512           # hashing-embedding dimensions
+
+    # — Startup: agents and the LLM client are built lazily, primed in the background
+    WARMUP_ON_STARTUP: bool = True
+    WARMUP_TIMEOUT: float = 120.0         # seconds before warmup stops waiting
+
+    # — File conversion jobs (process pool)
+    CONVERSION_POOL_SIZE: int = 2         # worker processes
+    CONVERSION_MAX_PER_KIND: int = 1      # concurrent jobs per converter (pdf2docx, pandoc, ...)
+    CONVERSION_JOB_TIMEOUT: float = 300.0 # seconds per job
+
+    # — Voice notes → text (in-memory ffmpeg decode, recognizer on a worker pool)
+    VOICE_RECOGNIZER: str = "google"      # "google" or "offline" (stand-in, no network)
+    VOICE_LANGUAGE: str = "en-US"
+    VOICE_SAMPLE_RATE: int = 16000
+    VOICE_MAX_CONCURRENCY: int = 4        # transcriptions running at once
+    FFMPEG_BINARY: str = "ffmpeg"
+
+    # — Text → voice-note synthesis (OGG/Opus, cached by engine/voice/text)
+    TTS_ENGINE: str = "gtts"              # "gtts" or "tone" (offline stand-in)
+    TTS_VOICE: str = "en"                 # language, optionally "lang:tld" e.g. "en:co.uk"
+    TTS_MAX_CONCURRENCY: int = 2
+    TTS_OPUS_BITRATE: str = "32k"
+    TTS_CACHE_ENTRIES: int = 256
+    TTS_CACHE_TTL: Optional[float] = None # seconds; None keeps clips until evicted
+
+    # — Multi-agent plans (/brief: research → draft → convert)
+    PLAN_CONCURRENCY: int = 3             # steps running at once within a plan
+    PLAN_STEP_TIMEOUT: float = 90.0       # seconds per step
+    PLAN_OUTPUT_DIR: str = "data/plans"   # scratch space for rendered memos, removed once sent
+
+    # — Webhook worker pool (ack-and-enqueue)
+    WEBHOOK_WORKERS: int = 8              # chats processed in parallel
+    WEBHOOK_QUEUE_MAX_DEPTH: int = 1000   # updates queued before answering 429
+    WEBHOOK_DRAIN_TIMEOUT: float = 10.0   # seconds to drain the queue on shutdown
+
+    # — Webhook idempotency (Telegram redelivers updates it thinks we missed)
+    WEBHOOK_DEDUP_CAPACITY: int = 10000   # recent update_ids remembered in-process
+    WEBHOOK_DEDUP_REDIS: bool = True      # also claim ids in Redis (SET NX), shared across workers
+    WEBHOOK_DEDUP_TTL: float = 86400.0    # seconds; Telegram gives up redelivering well before this
+    WEBHOOK_DEDUP_KEY_PREFIX: str = "tg:update:"
+
+    # — Follow-up extras sent after the main reply
+    POSTPROCESS_SUMMARY_TIMEOUT: float = 20.0   # witty case-law summary
+    POSTPROCESS_TTS_TIMEOUT: float = 30.0       # witty TTS voice-note
+    POSTPROCESS_CANCEL_STALE: bool = True       # drop a chat's pending extras on its next message
+
+    # — Streaming replies via progressive Telegram message edits
+    STREAM_REPLIES: bool = True
+    STREAM_EDIT_INTERVAL: float = 1.0     # min seconds between edits of one message
+
+    # — Logging: records are queued and written by a background thread
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10000           # records waiting for the writer before new ones are dropped
+    LLM_LOG_MAX_CHARS: int = 200          # prompt/response characters per LLM log line; 0 = fingerprint only
+    LLM_LOG_SAMPLE_RATE: float = 1.0      # fraction of LLM calls whose text is logged at all
+    LLM_LOG_REDACT: str = "email,phone"   # redactors applied to logged text (see prompt_log.REDACTORS)
+
+    # — Telemetry: per-stage timing histograms, served on /metrics (trace ids are always logged)
+    METRICS_ENABLED: bool = True
 
     # — RabbitMQ (if you still use it)
     RABBITMQ_URL: str
@@ -32,6 +146,13 @@ class Settings(BaseSettings):
     CASELAW_PINECONE_ENVIRONMENT: str
     CASELAW_PINECONE_INDEX: str
 
+    # — Case-law retrieval index: "local" (memory-mapped, see vector_index.py) or "pinecone"
+    CASELAW_INDEX_BACKEND: str = "local"
+    CASELAW_INDEX_PATH: str = "data/case_law_index"
+    CASELAW_TOP_K: int = 4                       # passages retrieved per question
+    VECTOR_INDEX_NPROBE: int = 8                 # IVF cells scanned per query
+    VECTOR_INDEX_IVF_THRESHOLD: int = 50_000     # vectors before "auto" switches to IVF
+
     # — Pinecone: memo
     MEMO_PINECONE_API_KEY: str
     MEMO_PINECONE_ENVIRONMENT: str
@@ -47,6 +168,22 @@ class Settings(BaseSettings):
     MEMORY_BUFFER_MAX_LEN: int = 20
     # Prefix for Redis list keys
     MEMORY_BUFFER_KEY_PREFIX: str = "history:"
+    # Prefix for the rolling summaries of turns beyond the context budget
+    MEMORY_SUMMARY_KEY_PREFIX: str = "summary:"
+    # Write-behind: buffer history writes and flush all chats in one pipeline
+    MEMORY_WRITE_BEHIND: bool = False
+    MEMORY_FLUSH_INTERVAL: float = 0.05   # seconds between flushes
+    MEMORY_MAX_PENDING: int = 1000        # buffered entries before writers flush inline
+    # In-process hot tier in front of Redis
+    MEMORY_LOCAL_CHATS: int = 1000        # chats whose history is kept in memory
+    MEMORY_LOCAL_IDLE_TTL: float = 900.0  # seconds before an idle chat is dropped locally
+    MEMORY_DEGRADED_RETRY: float = 5.0    # seconds between Redis retries when it is down
+
+    # — Context assembly for generic chats (token budget + rolling summary)
+    CONTEXT_TOKEN_BUDGET: int = 3000      # prompt tokens, capped by the model's context window
+    CONTEXT_REPLY_TOKENS: int = 1000      # max_tokens for the reply
+    CONTEXT_SUMMARY_TOKENS: int = 200     # max_tokens for a rolling-summary update
+    CONTEXT_TOKENIZER_MODEL: str = "gpt-3.5-turbo"  # tiktoken encoding used for counts
 
     model_config = SettingsConfigDict(
         extra="ignore"  # drop any undeclared vars
@@ -101,13 +238,13 @@ class Settings(BaseSettings):
     def check_llm_credentials(cls, values):
         """
         After loading all fields, ensure that if you choose openai you provided OPENAI_API_KEY,
-        or if llama you provided LLAMA_MODEL_PATH.
+        or if a local model backend you provided LLAMA_MODEL_PATH.
         """
-        backend = values.LLM_BACKEND.lower()
+        backend = values.LLM_BACKEND.split("#", 1)[0].strip().lower()
         if backend == "openai" and not values.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is required when LLM_BACKEND='openai'")
-        if backend == "llama" and not values.LLAMA_MODEL_PATH:
-            raise ValueError("LLAMA_MODEL_PATH is required when LLM_BACKEND='llama'")
+        if backend in ("llama", "transformers", "llama_cpp") and not values.LLAMA_MODEL_PATH:
+            raise ValueError(f"LLAMA_MODEL_PATH is required when LLM_BACKEND={backend!r}")
         return values
 
 # Instantiating this will now fail fast if any required field
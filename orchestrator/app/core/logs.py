@@ -0,0 +1,114 @@
+# orchestrator/app/core/logs.py
+
+import atexit
+import copy
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO
+
+from app.core.tracing import LOG_FORMAT, TraceIdFilter
+
+_TRACEBACKS = logging.Formatter()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Hands records to the background writer. When the queue is full the
+    record is dropped and counted; logging never blocks the caller.
+    """
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the stock prepare() formats the whole line here, on the caller;
+        # only resolve what cannot cross threads (args, traceback objects)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _TRACEBACKS.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # the queue may be full at shutdown: wait for room rather than fail
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """
+    Process-wide logging through a bounded queue and one writer thread.
+
+    Request paths only build the record (and its message) and enqueue it;
+    formatting the final line and the I/O happen on the writer thread.
+    The trace id is captured on the caller's side, where its context
+    variable is set. `start()` replaces the root logger's handlers, since
+    some libraries install their own at import time.
+    """
+
+    def __init__(
+        self,
+        level: str = "INFO",
+        fmt: str = LOG_FORMAT,
+        queue_size: int = 10000,
+        stream: Optional[TextIO] = None,
+    ):
+        self.level = level.upper()
+        self.queue_size = queue_size
+        self.writer = logging.StreamHandler(stream)
+        self.writer.setFormatter(logging.Formatter(fmt))
+        self.handler = BoundedQueueHandler(queue.Queue(queue_size))
+        self.handler.addFilter(TraceIdFilter())
+        self.listener = _Listener(self.handler.queue, self.writer, respect_handler_level=True)
+        self._lock = threading.Lock()
+        self._running = False
+
+    @classmethod
+    def from_settings(cls, settings) -> "LogPipeline":
+        return cls(
+            level=getattr(settings, "LOG_LEVEL", "INFO"),
+            queue_size=getattr(settings, "LOG_QUEUE_SIZE", 10000),
+        )
+
+    def start(self) -> "LogPipeline":
+        root = logging.getLogger()
+        for existing in root.handlers[:]:
+            root.removeHandler(existing)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        with self._lock:
+            if not self._running:
+                self.listener.start()
+                self._running = True
+                # write out whatever is still queued when the process exits
+                atexit.register(self.stop)
+        return self
+
+    def stop(self) -> None:
+        """Flush the queue and stop the writer thread; records logged afterwards are only queued."""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        self.listener.stop()
+        self.writer.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "queued": self.handler.queue.qsize(),
+            "capacity": self.queue_size,
+            "dropped": self.handler.dropped,
+        }
@@ -0,0 +1,204 @@
+# orchestrator/app/core/metrics.py
+
+import bisect
+import logging
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# seconds; wide enough for a Redis round trip and a slow LLM answer alike
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[str, ...]
+# (metric name, type, help, [(suffix, labels, value), ...]) produced at scrape time
+Sample = Tuple[str, Dict[str, str], float]
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Labels:
+        # unknown or missing labels are a programming error, caught on first use
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonic count per label combination; by convention named `..._total`."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [("", dict(zip(self.labelnames, key)), v) for key, v in items]
+
+
+class Histogram(Metric):
+    """
+    Cumulative histogram per label combination (Prometheus `le` buckets),
+    like `TokenHistogram` but labelled and safe to observe from threads.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), count, sum]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][idx] += 1
+            series[1] += 1
+            series[2] += value
+
+    def snapshot(self, **labels) -> Dict[str, Any]:
+        series = self._series.get(self._key(labels))
+        if series is None:
+            return {"count": 0, "sum": 0.0, "buckets": {}}
+        cumulative, running = {}, 0
+        for bound, n in zip((*self.buckets, "+Inf"), series[0]):
+            running += n
+            cumulative[str(bound)] = running
+        return {"count": series[1], "sum": series[2], "buckets": cumulative}
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(key, list(s[0]), s[1], s[2]) for key, s in self._series.items()]
+        out: List[Sample] = []
+        for key, counts, count, total in items:
+            labels = dict(zip(self.labelnames, key))
+            running = 0
+            for bound, n in zip((*self.buckets, math.inf), counts):
+                running += n
+                out.append(("_bucket", {**labels, "le": _format_value(bound)}, running))
+            out.append(("_count", labels, count))
+            out.append(("_sum", labels, total))
+        return out
+
+
+class Registry:
+    """
+    The metrics of one process, rendered in the Prometheus text format.
+
+    Besides its own counters and histograms it calls `collectors` at
+    scrape time, so components that already keep counters (see their
+    `stats()`) are exported without any work on the request path.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name!r} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def family(name: str, type_: str, help: str, samples: List[Sample]) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type_}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+        for metric in self._metrics.values():
+            family(metric.name, metric.type, metric.help, metric.samples())
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception:
+                # one broken collector must not take /metrics down
+                logger.exception("Metrics collector %r failed", collector)
+                continue
+            for name, type_, help, samples in families:
+                family(name, type_, help, samples)
+        return "\n".join(lines) + "\n"
+
+
+def gauges(
+    prefix: str, stats: Dict[str, Any], help: str, **labels: str,
+) -> Iterable[Tuple[str, str, str, List[Sample]]]:
+    """
+    Numeric and boolean top-level fields of a `stats()` dict as gauges
+    named `<prefix>_<field>`; nested dicts, strings and None are skipped.
+    """
+    for field, value in stats.items():
+        if not isinstance(value, (int, float)):
+            continue
+        yield f"{prefix}_{field}", "gauge", f"{help}: {field}", [("", labels, float(value))]
+
+
+# the process-wide registry served on /metrics
+REGISTRY = Registry()
@@ -0,0 +1,142 @@
+# orchestrator/app/core/tracing.py
+
+import asyncio
+import functools
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# the update being handled; every log line carries it (see TraceIdFilter)
+trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+# the agent answering it, set once routing has decided
+current_agent: ContextVar[str] = ContextVar("current_agent", default="none")
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "orchestrator_stage_seconds", "Time spent in each stage of handling an update",
+    ("stage", "agent", "backend"),
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "orchestrator_stage_errors_total", "Stage executions that raised",
+    ("stage", "agent", "backend"),
+)
+
+_enabled = True
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(trace_id)s] %(name)s: %(message)s"
+
+
+def configure(enabled: bool = True) -> None:
+    """Turn span recording on or off (trace ids in logs are unaffected)."""
+    global _enabled
+    _enabled = enabled
+
+
+def new_trace_id() -> str:
+    return os.urandom(8).hex()
+
+
+@contextmanager
+def trace(tid: Optional[str] = None) -> Iterator[str]:
+    """
+    Scope of one update: a trace id (new unless given) and no agent yet.
+    Tasks created inside inherit both.
+    """
+    id_token = trace_id.set(tid or new_trace_id())
+    agent_token = current_agent.set("none")
+    try:
+        yield trace_id.get()
+    finally:
+        current_agent.reset(agent_token)
+        trace_id.reset(id_token)
+
+
+def set_agent(agent_key: str) -> None:
+    """Label the rest of the current trace's spans with `agent_key`."""
+    current_agent.set(agent_key)
+
+
+def record(stage: str, seconds: float, *, agent: Optional[str] = None, backend: str = "none") -> None:
+    """Record a duration measured elsewhere (e.g. time spent queued)."""
+    if _enabled:
+        STAGE_SECONDS.observe(seconds, stage=stage, agent=agent or current_agent.get(), backend=backend)
+
+
+class span:
+    """
+    Times the enclosed block as `stage`, labelled with the current agent
+    and `backend`; a block that raises also counts as a stage error.
+    Cancellation and generator shutdown are not errors.
+
+        with span("memory.read"):
+            entries = await memory.get_entries(chat_id)
+    """
+
+    __slots__ = ("stage", "backend", "agent", "start")
+
+    def __init__(self, stage: str, *, backend: str = "none", agent: Optional[str] = None):
+        self.stage = stage
+        self.backend = backend
+        self.agent = agent
+
+    def __enter__(self) -> "span":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if _enabled:
+            agent = self.agent or current_agent.get()
+            STAGE_SECONDS.observe(
+                perf_counter() - self.start, stage=self.stage, agent=agent, backend=self.backend
+            )
+            if exc_type is not None and issubclass(exc_type, Exception):
+                STAGE_ERRORS.inc(stage=self.stage, agent=agent, backend=self.backend)
+        return False
+
+
+def traced(stage: str, *, backend: str = "none") -> Callable:
+    """Decorator form of `span` for plain and async functions."""
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage, backend=backend):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage, backend=backend):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class Instrumented:
+    """
+    Proxy that times the named async methods of `target` as
+    `<prefix>.<method>` spans and passes everything else through, e.g.
+    `Instrumented(Bot(token), "telegram", ["send_message"])`.
+    """
+
+    def __init__(self, target: Any, prefix: str, methods: Iterable[str]):
+        self._target = target
+        for name in methods:
+            setattr(self, name, traced(f"{prefix}.{name}")(getattr(target, name)))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target, name)
+
+
+class TraceIdFilter(logging.Filter):
+    """Adds `trace_id` ("-" outside a trace) to every record for the formatter."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id.get() or "-"
+        return True
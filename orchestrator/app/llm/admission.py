@@ -0,0 +1,240 @@
+# orchestrator/app/llm/admission.py
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Lower values are admitted first."""
+    PRIMARY = 0      # the answer the user is waiting for
+    BACKGROUND = 1   # housekeeping, e.g. rolling conversation summaries
+    EXTRA = 2        # optional follow-ups: witty summaries, TTS one-liners
+
+
+class LoadShed(RuntimeError):
+    """A low-priority LLM call was dropped instead of queued."""
+
+
+# chat the current LLM work is for; set once per update (see `chat_scope`),
+# so agents don't have to pass it down to every LLM call
+current_chat: ContextVar[Optional[Hashable]] = ContextVar("current_chat", default=None)
+
+
+@contextmanager
+def chat_scope(chat_id: Hashable) -> Iterator[None]:
+    token = current_chat.set(chat_id)
+    try:
+        yield
+    finally:
+        current_chat.reset(token)
+
+
+class TokenBucket:
+    """
+    `rate` tokens per second, holding at most `burst`. Taking a token may
+    drive the balance negative; the deficit is how long the caller waits.
+    """
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available, without taking one."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def take(self) -> float:
+        """Take a token; returns how long to wait before using it."""
+        self._refill()
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+
+class AdmissionController:
+    """
+    Decides when an LLM call may hit the backend.
+
+    1) Per chat, a token bucket (`chat_rate` calls/s, bursts of
+       `chat_burst`): one noisy chat slows down only itself.
+    2) Globally, at most `max_concurrent` calls run at once; the rest wait
+       in a priority queue, primary answers ahead of background work and
+       optional extras.
+
+    Only primary calls wait as long as it takes. Lower priorities are shed
+    (`LoadShed`) when their chat is over its rate, when `max_queued`
+    of them are already waiting, or after `shed_after` seconds in the queue.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        *,
+        chat_rate: float = 0.5,
+        chat_burst: float = 5.0,
+        max_queued: int = 32,
+        shed_after: float = 5.0,
+        max_chats: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be >= 1")
+        self.max_concurrent = max_concurrent
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_queued = max_queued
+        self.shed_after = shed_after
+        self.max_chats = max_chats
+        self.clock = clock
+
+        self._active = 0
+        # (priority, arrival, future): granted a slot by `release()`
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._waiting = dict.fromkeys(Priority, 0)
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+
+        self.admitted = dict.fromkeys(Priority, 0)
+        self.shed = {"rate": 0, "queue_full": 0, "timeout": 0}
+        self.rate_limited = 0
+        self._wait_total = dict.fromkeys(Priority, 0.0)
+        self._wait_max = dict.fromkeys(Priority, 0.0)
+
+    @classmethod
+    def from_settings(cls, settings) -> Optional["AdmissionController"]:
+        if not getattr(settings, "ADMISSION_ENABLED", True):
+            return None
+        return cls(
+            getattr(settings, "ADMISSION_MAX_CONCURRENT", 8),
+            chat_rate=getattr(settings, "ADMISSION_CHAT_RATE", 0.5),
+            chat_burst=getattr(settings, "ADMISSION_CHAT_BURST", 5.0),
+            max_queued=getattr(settings, "ADMISSION_MAX_QUEUED_EXTRAS", 32),
+            shed_after=getattr(settings, "ADMISSION_SHED_AFTER", 5.0),
+        )
+
+    def _bucket(self, chat_id: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst, self.clock)
+            while len(self._buckets) > self.max_chats:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(chat_id)
+        return bucket
+
+    def _shed(self, priority: Priority, reason: str, chat_id: Optional[Hashable]) -> LoadShed:
+        self.shed[reason] += 1
+        logger.info("Shedding %s LLM call for chat %s (%s)", priority.name.lower(), chat_id, reason)
+        return LoadShed(f"{priority.name.lower()} LLM call shed: {reason}")
+
+    @asynccontextmanager
+    async def slot(
+        self, priority: Priority = Priority.PRIMARY, chat_id: Optional[Hashable] = None
+    ) -> AsyncIterator[None]:
+        """
+        Hold one of the `max_concurrent` slots for the duration of the block.
+        `chat_id` defaults to the chat of the current `chat_scope`.
+        """
+        await self.acquire(priority, chat_id)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: Priority = Priority.PRIMARY, chat_id: Optional[Hashable] = None) -> None:
+        priority = Priority(priority)
+        if chat_id is None:
+            chat_id = current_chat.get()
+        start = self.clock()
+
+        # 1) Per-chat rate: extras over the limit are dropped, primary waits
+        if chat_id is not None and self.chat_rate > 0:
+            bucket = self._bucket(chat_id)
+            if priority > Priority.PRIMARY and bucket.delay() > 0:
+                raise self._shed(priority, "rate", chat_id)
+            delay = bucket.take()
+            if delay > 0:
+                self.rate_limited += 1
+                await asyncio.sleep(delay)
+
+        # 2) Free slot and nobody queued ahead: go straight in
+        if self._active < self.max_concurrent and not any(self._waiting.values()):
+            self._active += 1
+            self._admit(priority, start)
+            return
+
+        # 3) Queue by priority; extras only up to a bound and for a while
+        if priority > Priority.PRIMARY:
+            extras = sum(n for p, n in self._waiting.items() if p > Priority.PRIMARY)
+            if extras >= self.max_queued:
+                raise self._shed(priority, "queue_full", chat_id)
+        granted = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), granted))
+        self._waiting[priority] += 1
+        try:
+            if priority > Priority.PRIMARY:
+                async with asyncio.timeout(self.shed_after):
+                    await granted
+            else:
+                await granted
+        except TimeoutError:
+            if not (granted.done() and not granted.cancelled()):
+                raise self._shed(priority, "timeout", chat_id) from None
+            # the slot arrived just as the timeout fired: use it
+        except asyncio.CancelledError:
+            if granted.done() and not granted.cancelled():
+                self.release()   # handed a slot we will never use
+            raise
+        finally:
+            self._waiting[priority] -= 1
+        self._admit(priority, start)
+
+    def release(self) -> None:
+        # hand the slot straight to the best waiter, skipping abandoned ones
+        while self._queue:
+            _, _, granted = heapq.heappop(self._queue)
+            if not granted.done():
+                granted.set_result(None)
+                return
+        self._active -= 1
+
+    def _admit(self, priority: Priority, start: float) -> None:
+        waited = self.clock() - start
+        self.admitted[priority] += 1
+        self._wait_total[priority] += waited
+        self._wait_max[priority] = max(self._wait_max[priority], waited)
+
+    def stats(self) -> Dict[str, Any]:
+        wait = {}
+        for p in Priority:
+            n = self.admitted[p]
+            wait[p.name.lower()] = {
+                "admitted": n,
+                "waiting": self._waiting[p],
+                "avg_wait_s": round(self._wait_total[p] / n, 6) if n else 0.0,
+                "max_wait_s": round(self._wait_max[p], 6),
+            }
+        return {
+            "in_flight": self._active,
+            "max_concurrent": self.max_concurrent,
+            "priorities": wait,
+            "rate_limited": self.rate_limited,
+            "shed": dict(self.shed),
+        }
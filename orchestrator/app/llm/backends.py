@@ -0,0 +1,419 @@
+# orchestrator/app/llm/backends.py
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Type
+
+from app.llm.batching import BatchingWorker
+from app.llm.transport import HttpConfig, shared_async_client, shared_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    streaming: bool = False      # astream() yields text as it is produced
+    batching: bool = False       # concurrent calls are batched into one forward pass
+    native_async: bool = False   # agenerate() is truly async, not a thread hop
+
+
+class Backend:
+    """
+    One way of producing completions. LLMClient adds prompt building,
+    caching, coalescing and admission control on top; a backend only turns
+    a full prompt (plus generation kwargs) into text.
+
+    `parallelism` is how many calls the backend can usefully run at once
+    (None: no local limit); admission control sizes its cap to it, so work
+    waits in the priority queue rather than in a FIFO thread pool.
+    """
+
+    name = ""
+    capabilities = Capabilities()
+    parallelism: Optional[int] = None
+
+    def __init__(self, settings):
+        self.default_model = ""
+        self.client: Any = None
+        self.calls = 0
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        return await asyncio.to_thread(self.generate, prompt, **kwargs)
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        yield await self.agenerate(prompt, **kwargs)
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "model": self.default_model,
+            "capabilities": asdict(self.capabilities),
+            "parallelism": self.parallelism,
+            "calls": self.calls,
+        }
+
+
+# — Registry —
+BACKENDS: Dict[str, Type[Backend]] = {}
+# older LLM_BACKEND values that still work
+ALIASES = {"llama": "transformers"}
+
+
+def register(name: str) -> Callable[[Type[Backend]], Type[Backend]]:
+    def decorator(cls: Type[Backend]) -> Type[Backend]:
+        if name in BACKENDS:
+            raise ValueError(f"Backend {name!r} is already registered")
+        cls.name = name
+        BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def backend_name(raw: str) -> str:
+    # strip out any inline comments or stray whitespace
+    name = raw.split("#", 1)[0].strip().lower()
+    return ALIASES.get(name, name)
+
+
+def create_backend(settings) -> Backend:
+    name = backend_name(settings.LLM_BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown LLM_BACKEND: {settings.LLM_BACKEND!r} (choose from {', '.join(sorted(BACKENDS))})"
+        )
+    return BACKENDS[name](settings)
+
+
+async def _iterate_in_thread(executor: ThreadPoolExecutor, make_iter: Callable[[], Iterator[str]]) -> AsyncIterator[str]:
+    """
+    Drive a blocking iterator on `executor`, handing each item back to the
+    event loop as it is produced.
+    """
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Any]" = asyncio.Queue()
+    done = object()
+
+    def run():
+        try:
+            for item in make_iter():
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    job = loop.run_in_executor(executor, run)
+    while (item := await queue.get()) is not done:
+        yield item
+    # surface any exception raised in the worker thread
+    await job
+
+
+@register("openai")
+class OpenAIBackend(Backend):
+    capabilities = Capabilities(streaming=True, native_async=True)
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        from openai import OpenAI
+        # one pooled transport per process (limits, keep-alive, HTTP/2,
+        # timeouts, retries honouring Retry-After); the SDK's own retries
+        # are switched off so they don't multiply ours
+        self._openai_kwargs = {
+            "api_key": settings.OPENAI_API_KEY,
+            "timeout": HttpConfig.from_settings(settings).timeout(),
+            "max_retries": 0,
+        }
+        base_url = getattr(settings, "OPENAI_BASE_URL", None)
+        if base_url:
+            self._openai_kwargs["base_url"] = base_url
+        self._settings = settings
+        self.client = OpenAI(http_client=shared_client(settings), **self._openai_kwargs)
+        self.default_model = "gpt-3.5-turbo"
+        # AsyncOpenAI is built lazily on the first async call
+        self._async_client = None
+
+    @property
+    def async_client(self):
+        """
+        Lazily-constructed `AsyncOpenAI` client sharing our API key and the
+        process-wide connection pool.
+        """
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            self._async_client = AsyncOpenAI(
+                http_client=shared_async_client(self._settings), **self._openai_kwargs
+            )
+        return self._async_client
+
+    def _messages(self, prompt: str) -> List[Dict[str, str]]:
+        return [{"role": "user", "content": prompt}]
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        model = kwargs.pop("model", self.default_model)
+        resp = self.client.chat.completions.create(
+            model=model, messages=self._messages(prompt), **kwargs
+        )
+        return resp.choices[0].message.content
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        model = kwargs.pop("model", self.default_model)
+        resp = await self.async_client.chat.completions.create(
+            model=model, messages=self._messages(prompt), **kwargs
+        )
+        return resp.choices[0].message.content
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        self.calls += 1
+        model = kwargs.pop("model", self.default_model)
+        stream = await self.async_client.chat.completions.create(
+            model=model, messages=self._messages(prompt), stream=True, **kwargs
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+@register("transformers")
+class TransformersBackend(Backend):
+    """
+    A local `transformers` text-generation pipeline. In-process on a small
+    thread pool by default; with LLAMA_BATCHING in a dedicated process that
+    batches concurrent prompts (see app.llm.batching).
+    """
+
+    capabilities = Capabilities(streaming=True)
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.default_model = settings.LLAMA_MODEL_PATH
+        self.worker: Optional[BatchingWorker] = None
+        if getattr(settings, "LLAMA_BATCHING", False):
+            # the model loads in the worker, in the background, while
+            # requests queue up
+            self.worker = BatchingWorker.from_settings(settings)
+            self.worker.start()
+            # batches only fill up if enough calls are let through at once
+            self.parallelism = 2 * self.worker.max_batch
+            self.capabilities = Capabilities(batching=True)
+            return
+
+        from transformers import pipeline
+        self.client = pipeline(
+            "text-generation",
+            model=settings.LLAMA_MODEL_PATH,
+            device="cpu"  # switch to "cuda" if you have a GPU
+        )
+        # the pipeline is synchronous and CPU bound, so async calls hand it
+        # to a small dedicated pool instead of blocking the event loop
+        workers = getattr(settings, "LLM_EXECUTOR_WORKERS", 1)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-llama")
+        self.parallelism = workers
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        if self.worker:
+            return self.worker.generate(prompt, **kwargs)
+        out = self.client(prompt, **kwargs)
+        return out[0].get("generated_text", "")
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        if self.worker:
+            self.calls += 1
+            return await self.worker.agenerate(prompt, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self.generate, prompt, **kwargs))
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        if self.worker:
+            # batched generation returns whole answers: one chunk
+            yield await self.agenerate(prompt, **kwargs)
+            return
+
+        from transformers import TextStreamer
+
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+        class _QueueStreamer(TextStreamer):
+            # called from the worker thread with each decoded piece of text
+            def on_finalized_text(self, text: str, stream_end: bool = False):
+                if text:
+                    loop.call_soon_threadsafe(queue.put_nowait, text)
+
+        streamer = _QueueStreamer(self.client.tokenizer, skip_prompt=True)
+
+        def run_pipeline():
+            try:
+                self.client(prompt, streamer=streamer, **kwargs)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        job = loop.run_in_executor(self._executor, run_pipeline)
+        while (text := await queue.get()) is not None:
+            yield text
+        # surface any exception raised inside the pipeline
+        await job
+
+    def close(self) -> None:
+        if self.worker:
+            self.worker.close()
+        else:
+            self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        out = super().stats()
+        if self.worker:
+            out["batching"] = self.worker.stats()
+        return out
+
+
+@register("llama_cpp")
+class LlamaCppBackend(Backend):
+    """
+    A GGUF model through llama-cpp-python. One model instance is not safe
+    to call concurrently, so calls run one at a time on a dedicated thread.
+    """
+
+    capabilities = Capabilities(streaming=True)
+    parallelism = 1
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        from llama_cpp import Llama
+        threads = getattr(settings, "LLAMA_WORKER_THREADS", 0)
+        self.client = Llama(
+            model_path=settings.LLAMA_MODEL_PATH, n_threads=threads or None, verbose=False
+        )
+        self.default_model = settings.LLAMA_MODEL_PATH
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-llama-cpp")
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        kwargs.pop("model", None)
+        out = self.client.create_completion(prompt=prompt, **kwargs)
+        return out["choices"][0]["text"]
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self.generate, prompt, **kwargs))
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        self.calls += 1
+        kwargs.pop("model", None)
+
+        def pieces():
+            for chunk in self.client.create_completion(prompt=prompt, stream=True, **kwargs):
+                text = chunk["choices"][0]["text"]
+                if text:
+                    yield text
+
+        async for text in _iterate_in_thread(self._executor, pieces):
+            yield text
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class FakeBackendError(RuntimeError):
+    """A failure injected by the fake backend."""
+
+
+FAKE_WORDS = (
+    "tribal", "sovereignty", "court", "treaty", "jurisdiction", "the", "of", "and",
+    "federal", "state", "nation", "law", "held", "that", "a", "in", "under", "act",
+)
+
+
+@register("fake")
+class FakeBackend(Backend):
+    """
+    Offline stand-in for load tests: no network, no model.
+
+    Answers are deterministic (the same prompt always gets the same words)
+    and cost simulated time: a first-token latency drawn from
+    FAKE_LATENCY_DIST around FAKE_LATENCY_MS, then FAKE_TOKENS_PER_S for
+    the rest. FAKE_FAILURE_RATE of calls raise `FakeBackendError`;
+    FAKE_SEED makes the latency and failure draws repeatable.
+    """
+
+    capabilities = Capabilities(streaming=True, native_async=True)
+    DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.default_model = "fake"
+        self.latency = getattr(settings, "FAKE_LATENCY_MS", 200.0) / 1000
+        self.distribution = getattr(settings, "FAKE_LATENCY_DIST", "lognormal")
+        self.spread = getattr(settings, "FAKE_LATENCY_SPREAD", 0.5)
+        self.tokens_per_s = getattr(settings, "FAKE_TOKENS_PER_S", 50.0)
+        self.reply_tokens = getattr(settings, "FAKE_REPLY_TOKENS", 40)
+        self.failure_rate = getattr(settings, "FAKE_FAILURE_RATE", 0.0)
+        if self.distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"FAKE_LATENCY_DIST must be one of {self.DISTRIBUTIONS}")
+        self.rng = random.Random(getattr(settings, "FAKE_SEED", None))
+        self.failures = 0
+
+    def first_token_delay(self) -> float:
+        mean, spread = self.latency, self.spread
+        if self.distribution == "fixed" or mean <= 0:
+            return mean
+        if self.distribution == "uniform":
+            return self.rng.uniform(mean * (1 - spread), mean * (1 + spread))
+        if self.distribution == "exponential":
+            return self.rng.expovariate(1 / mean)
+        # lognormal with the same mean; `spread` is sigma
+        return mean * self.rng.lognormvariate(-spread ** 2 / 2, spread)
+
+    def reply(self, prompt: str, max_tokens: Optional[int] = None) -> List[str]:
+        n = min(self.reply_tokens, max_tokens or self.reply_tokens)
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        while len(digest) < n:
+            digest += hashlib.sha256(digest).digest()
+        return [FAKE_WORDS[b % len(FAKE_WORDS)] for b in digest[:n]]
+
+    def _start(self, prompt: str, kwargs: Dict[str, Any]) -> List[str]:
+        self.calls += 1
+        if self.failure_rate and self.rng.random() < self.failure_rate:
+            self.failures += 1
+            raise FakeBackendError("simulated backend failure")
+        return self.reply(prompt, kwargs.get("max_tokens"))
+
+    def _token_delay(self) -> float:
+        return 1 / self.tokens_per_s if self.tokens_per_s > 0 else 0.0
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        words = self._start(prompt, kwargs)
+        time.sleep(self.first_token_delay() + len(words) * self._token_delay())
+        return " ".join(words)
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        words = self._start(prompt, kwargs)
+        await asyncio.sleep(self.first_token_delay() + len(words) * self._token_delay())
+        return " ".join(words)
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        words = self._start(prompt, kwargs)
+        await asyncio.sleep(self.first_token_delay())
+        for i, word in enumerate(words):
+            await asyncio.sleep(self._token_delay())
+            yield word if i == 0 else f" {word}"
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "failures": self.failures}
@@ -0,0 +1,315 @@
+# orchestrator/app/llm/batching.py
+
+import asyncio
+import importlib
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+from concurrent.futures import Future, InvalidStateError
+from itertools import count
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# parent → worker: (request id, prompt, generation kwargs); None stops the worker
+Request = Tuple[int, str, Dict[str, Any]]
+# worker → parent: (request id, ok, generated text or error message)
+Result = Tuple[int, bool, str]
+
+Factory = Union[str, Callable[..., Any]]
+
+
+def load_pipeline(model_path: str, device: str = "cpu") -> Any:
+    """
+    The default model factory: a text-generation pipeline set up for
+    batching (decoder-only models need a pad token and left padding).
+    """
+    from transformers import pipeline
+
+    pipe = pipeline("text-generation", model=model_path, device=device)
+    tokenizer = pipe.tokenizer
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+    return pipe
+
+
+def _resolve(factory: Factory) -> Callable[..., Any]:
+    if callable(factory):
+        return factory
+    module, _, attr = factory.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def collect_batch(requests: Any, max_batch: int, max_wait: float) -> Tuple[List[Request], bool]:
+    """
+    Block for one request, then keep collecting for up to `max_wait`
+    seconds or until `max_batch` requests are in hand. Returns the batch
+    and whether the stop sentinel was seen.
+    """
+    first = requests.get()
+    if first is None:
+        return [], True
+    batch = [first]
+    deadline = monotonic() + max_wait
+    while len(batch) < max_batch:
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            break
+        try:
+            item = requests.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if item is None:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+def run_batch(pipe: Any, batch: List[Request]) -> Tuple[int, List[Result]]:
+    """
+    Generate for every request in `batch`; returns (forward passes, results).
+    Requests with different generation kwargs can't share a pass, so the
+    batch is split by kwargs first.
+    """
+    groups: Dict[str, List[Request]] = {}
+    for request in batch:
+        groups.setdefault(json.dumps(request[2], sort_keys=True, default=str), []).append(request)
+
+    results: List[Result] = []
+    for group in groups.values():
+        prompts = [prompt for _, prompt, _ in group]
+        try:
+            outputs = pipe(prompts, batch_size=len(prompts), **group[0][2])
+            for (req_id, _, _), out in zip(group, outputs):
+                results.append((req_id, True, out[0].get("generated_text", "")))
+        except Exception as e:
+            logger.exception("Batched generation failed for %d prompts", len(prompts))
+            results.extend((req_id, False, f"{type(e).__name__}: {e}") for req_id, _, _ in group)
+    return len(groups), results
+
+
+def serve(pipe: Any, requests: Any, results: Any, max_batch: int, max_wait: float) -> None:
+    """
+    The worker loop: collect a batch, run it, send the results back as one
+    message, until the stop sentinel arrives.
+    """
+    while True:
+        batch, stop = collect_batch(requests, max_batch, max_wait)
+        if batch:
+            results.put(run_batch(pipe, batch))
+        if stop:
+            return
+
+
+def _worker_main(
+    factory: Factory, factory_args: tuple, threads: int,
+    requests: Any, results: Any, max_batch: int, max_wait: float,
+) -> None:
+    # pin the math libraries before torch is imported by the factory
+    if threads:
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ[var] = str(threads)
+        try:
+            import torch
+            torch.set_num_threads(threads)
+            torch.set_num_interop_threads(1)
+        except ImportError:
+            pass
+    pipe = _resolve(factory)(*factory_args)
+    results.put("ready")
+    serve(pipe, requests, results, max_batch, max_wait)
+    results.put(None)
+
+
+class BatchingWorker:
+    """
+    A dedicated process that owns the local model.
+
+    The model is loaded once, in the worker, with pinned thread counts.
+    Concurrent prompts are collected into dynamic batches (at most
+    `max_batch`, waiting at most `max_wait_ms` for the batch to fill) and
+    each batch is generated in one pipeline call; every result goes back
+    to its caller's future. Callers may submit before the model has
+    loaded: requests wait in the queue.
+
+    `factory` builds the pipeline inside the worker, as a "module:function"
+    path (or, with the fork start method, a plain callable).
+    """
+
+    def __init__(
+        self,
+        factory: Factory = "app.llm.batching:load_pipeline",
+        factory_args: tuple = (),
+        *,
+        max_batch: int = 8,
+        max_wait_ms: float = 10.0,
+        threads: int = 0,
+        start_method: str = "spawn",
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.factory = factory
+        self.factory_args = factory_args
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.threads = threads
+        self.start_method = start_method
+
+        self._ids = count()
+        self._pending: Dict[int, Tuple[Future, float]] = {}
+        self._lock = threading.Lock()
+        self._process: Optional[mp.process.BaseProcess] = None
+        self._reader: Optional[threading.Thread] = None
+        self.ready = threading.Event()
+
+        self.requests = 0
+        self.completed = 0
+        self.failed = 0
+        self.batches = 0
+        self.passes = 0
+        self.largest_batch = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    @classmethod
+    def from_settings(cls, settings) -> "BatchingWorker":
+        return cls(
+            factory_args=(settings.LLAMA_MODEL_PATH,),
+            max_batch=getattr(settings, "LLAMA_MAX_BATCH", 8),
+            max_wait_ms=getattr(settings, "LLAMA_MAX_WAIT_MS", 10.0),
+            threads=getattr(settings, "LLAMA_WORKER_THREADS", 0),
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> None:
+        ctx = mp.get_context(self.start_method)
+        self._requests = ctx.Queue()
+        self._results = ctx.Queue()
+        self.ready.clear()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(self.factory, self.factory_args, self.threads,
+                  self._requests, self._results, self.max_batch, self.max_wait),
+            name="llm-batcher",
+            daemon=True,
+        )
+        self._process.start()
+        self._reader = threading.Thread(target=self._read_results, name="llm-batcher-results", daemon=True)
+        self._reader.start()
+        logger.info("Started batching worker pid=%s (max_batch=%d, max_wait=%.0fms)",
+                    self._process.pid, self.max_batch, self.max_wait * 1000)
+
+    def submit(self, prompt: str, kwargs: Optional[Dict[str, Any]] = None) -> Future:
+        if not self.alive:
+            logger.warning("Batching worker is not running; starting it")
+            self.start()
+        future: Future = Future()
+        req_id = next(self._ids)
+        with self._lock:
+            self._pending[req_id] = (future, perf_counter())
+            self.requests += 1
+        self._requests.put((req_id, prompt, kwargs or {}))
+        return future
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        return self.submit(prompt, kwargs).result()
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        return await asyncio.wrap_future(self.submit(prompt, kwargs))
+
+    def _read_results(self) -> None:
+        process, results = self._process, self._results
+        while True:
+            try:
+                msg = results.get(timeout=0.5)
+            except queue.Empty:
+                if not process.is_alive():
+                    self._fail_pending(RuntimeError(
+                        f"batching worker exited with code {process.exitcode}"
+                    ))
+                    return
+                continue
+            if msg is None:
+                return
+            if msg == "ready":
+                self.ready.set()
+                continue
+            passes, batch = msg
+            self._deliver(passes, batch)
+
+    def _deliver(self, passes: int, batch: List[Result]) -> None:
+        now = perf_counter()
+        with self._lock:
+            self.batches += 1
+            self.passes += passes
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for req_id, ok, payload in batch:
+                future, submitted = self._pending.pop(req_id, (None, now))
+                if future is None:
+                    continue
+                latency = now - submitted
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                try:
+                    if ok:
+                        future.set_result(payload)
+                    else:
+                        future.set_exception(RuntimeError(payload))
+                except InvalidStateError:
+                    pass  # the caller cancelled; the answer is dropped
+
+    def _fail_pending(self, error: Exception) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self.failed += len(pending)
+        for future, _ in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Let the worker finish what it has queued, then stop it.
+        """
+        if self._process is None:
+            return
+        self._requests.put(None)
+        self._process.join(timeout)
+        if self._process.is_alive():
+            logger.warning("Batching worker did not stop in %.0fs; terminating", timeout)
+            self._process.terminate()
+            self._process.join()
+        if self._reader is not None:
+            self._reader.join(timeout)
+        self._fail_pending(RuntimeError("batching worker stopped"))
+        self._process = None
+
+    def stats(self) -> Dict[str, Any]:
+        done = self.completed + self.failed
+        return {
+            "alive": self.alive,
+            "ready": self.ready.is_set(),
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "pending": len(self._pending),
+            "requests": self.requests,
+            "completed": self.completed,
+            "failed": self.failed,
+            "batches": self.batches,
+            "forward_passes": self.passes,
+            "avg_batch": round(done / self.batches, 3) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "avg_latency_s": round(self._latency_total / done, 6) if done else 0.0,
+            "max_latency_s": round(self._latency_max, 6),
+        }
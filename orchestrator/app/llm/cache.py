@@ -0,0 +1,187 @@
+# orchestrator/app/llm/cache.py
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(backend: str, model: str, prompt: str, params: Dict[str, Any]) -> str:
+    """
+    Stable hash of everything that determines an LLM response: backend, model,
+    the full prompt (context included) and the sampling kwargs.
+    """
+    payload = json.dumps(
+        {"backend": backend, "model": model, "prompt": prompt, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    In-process LRU with a size limit and an optional per-entry TTL (seconds).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._data: "OrderedDict[str, Tuple[Optional[float], str]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at is not None and self.clock() >= expires_at:
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = self.clock() + self.ttl if self.ttl else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisCacheTier:
+    """
+    Shared second tier in Redis, so cached answers survive restarts and are
+    shared between workers. Redis failures are logged and count as misses.
+    """
+
+    def __init__(self, redis: Any, ttl: Optional[float] = None, key_prefix: str = "llmcache:"):
+        self.redis = redis
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCacheTier":
+        from redis.asyncio import Redis
+        return cls(Redis.from_url(url, decode_responses=True), **kwargs)
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.redis.get(self.key_prefix + key)
+        except Exception as e:
+            self.errors += 1
+            logger.error("RedisCacheTier.get failed: %s", e)
+            return None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        try:
+            ex = int(self.ttl) if self.ttl else None
+            await self.redis.set(self.key_prefix + key, value, ex=ex)
+        except Exception as e:
+            self.errors += 1
+            logger.error("RedisCacheTier.set failed: %s", e)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+class ResponseCache:
+    """
+    Two-tier LLM response cache: the in-process LRU is always consulted; the
+    optional Redis tier only on the async paths (a hit there is promoted into
+    the LRU).
+    """
+
+    def __init__(self, local: LRUCache, remote: Optional[RedisCacheTier] = None):
+        self.local = local
+        self.remote = remote
+
+    @classmethod
+    def from_settings(cls, settings) -> Optional["ResponseCache"]:
+        """
+        Build the cache described by `settings`, or None if caching is disabled.
+        """
+        if not getattr(settings, "LLM_CACHE_ENABLED", True):
+            return None
+        ttl = getattr(settings, "LLM_CACHE_TTL", 3600.0)
+        local = LRUCache(getattr(settings, "LLM_CACHE_MAX_ENTRIES", 1024), ttl=ttl)
+        remote = None
+        if getattr(settings, "LLM_CACHE_REDIS", False):
+            remote = RedisCacheTier.from_url(
+                settings.REDIS_URL,
+                ttl=ttl,
+                key_prefix=getattr(settings, "LLM_CACHE_KEY_PREFIX", "llmcache:"),
+            )
+        return cls(local, remote)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.local.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self.local.set(key, value)
+
+    async def aget(self, key: str) -> Optional[str]:
+        value = self.local.get(key)
+        if value is None and self.remote is not None:
+            value = await self.remote.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    async def aset(self, key: str, value: str) -> None:
+        self.local.set(key, value)
+        if self.remote is not None:
+            await self.remote.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"local": self.local.stats()}
+        if self.remote is not None:
+            out["redis"] = self.remote.stats()
+        return out
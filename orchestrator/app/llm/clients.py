@@ -1,41 +1,136 @@
 # orchestrator/app/llm/clients.py
 
-import os
 import logging
+from contextlib import nullcontext
+from dataclasses import asdict
+from functools import partial
 from time import perf_counter
-from typing import Optional, Union, Sequence
+from typing import Any, AsyncIterator, Dict, Optional, Union, Sequence
+
+from app.core.tracing import span
+from app.llm.admission import AdmissionController, Priority
+from app.llm.backends import Backend, create_backend
+from app.llm.batching import BatchingWorker
+from app.llm.cache import ResponseCache, make_cache_key
+from app.llm.prompt_log import PromptLogPolicy
+from app.llm.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 class LLMClient:
+    """
+    Entry point for every LLM call in the app, whatever the backend.
+
+    The backend (openai, transformers, llama_cpp or fake; see
+    app.llm.backends) only turns a prompt into text. On top of it this
+    class builds prompts, caches answers, coalesces identical in-flight
+    calls and applies admission control.
+    """
+
     def __init__(self, settings):
-        # strip out any inline comments or stray whitespace
-        raw = settings.LLM_BACKEND.split("#", 1)[0].strip()
-        backend = raw.lower()
-        if backend == "openai":
-            from openai import OpenAI
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            self.backend = "openai"
-
-        elif backend == "llama":
-            from transformers import pipeline
-            self.client = pipeline(
-                "text-generation",
-                model=settings.LLAMA_MODEL_PATH,
-                device="cpu"  # switch to "cuda" if you have a GPU
-            )
-            self.backend = "llama"
+        self.impl: Backend = create_backend(settings)
+        self.backend = self.impl.name
+        self.capabilities = self.impl.capabilities
 
-        else:
-            raise ValueError(f"Unknown LLM_BACKEND: {settings.LLM_BACKEND!r}")
+        # response cache (in-process LRU, optionally backed by Redis)
+        self.cache: Optional[ResponseCache] = ResponseCache.from_settings(settings)
+        # identical calls in flight at the same time share one backend call
+        self.flight: Optional[SingleFlight] = (
+            SingleFlight() if getattr(settings, "LLM_SINGLE_FLIGHT", True) else None
+        )
+        # global concurrency cap, per-chat rate limits and priorities for
+        # async calls that actually reach the backend
+        self.admission: Optional[AdmissionController] = AdmissionController.from_settings(settings)
+        if self.admission and self.impl.parallelism:
+            # queue in priority order here, not FIFO in the backend's pool;
+            # the configured cap still applies when it is the smaller one
+            self.admission.max_concurrent = min(self.admission.max_concurrent, self.impl.parallelism)
+        # what of each prompt/response reaches the logs: the system prompt as
+        # a fingerprint, the rest truncated, sampled and redacted
+        self.log_policy = PromptLogPolicy.from_settings(settings)
+
+        logger.info(
+            "Initialized LLMClient with backend %r (%s)", self.backend,
+            ", ".join(k for k, v in asdict(self.capabilities).items() if v) or "no extras",
+        )
+
+    # the backend's own client objects, for callers that need them
+    @property
+    def client(self) -> Any:
+        return self.impl.client
+
+    @client.setter
+    def client(self, value: Any) -> None:
+        self.impl.client = value
+
+    @property
+    def async_client(self):
+        return self.impl.async_client
 
-        logger.info("Initialized LLMClient with backend %r", self.backend)
+    @property
+    def default_model(self) -> str:
+        return self.impl.default_model
+
+    @property
+    def worker(self) -> Optional[BatchingWorker]:
+        return getattr(self.impl, "worker", None)
+
+    def close(self) -> None:
+        self.impl.close()
+
+    @staticmethod
+    def _build_prompt(
+        prompt: str,
+        context: Optional[Union[str, Sequence[str]]] = None,
+    ) -> str:
+        if context:
+            if isinstance(context, str):
+                context_block = context.strip()
+            else:
+                # list of lines → join with double newlines
+                context_block = "\n\n".join(line.strip() for line in context)
+            return f"{context_block}\n\n{prompt}"
+        return prompt
+
+    def _cache_key(self, full_prompt: str, kwargs: Dict[str, Any]) -> str:
+        params = {k: v for k, v in kwargs.items() if k != "model"}
+        model = kwargs.get("model", self.default_model)
+        return make_cache_key(self.backend, str(model), full_prompt, params)
+
+    @staticmethod
+    def _log_cache_hit(key: str, method: str) -> None:
+        logger.info("LLMClient.%s cache hit: key=%s", method, key[:16])
+
+    def _log_start(self, method: str, full_prompt: str, kwargs: Dict[str, Any]) -> bool:
+        """
+        Logs the call (see `log_policy`); returns whether this call's text is
+        sampled, so the completion is logged the same way.
+        """
+        if not logger.isEnabledFor(logging.INFO):
+            return False
+        sampled = self.log_policy.sampled()
+        logger.info(
+            "LLMClient.%s start: backend=%r prompt=%s kwargs=%s",
+            method, self.backend, self.log_policy.render(full_prompt, sampled), kwargs
+        )
+        return sampled
+
+    def _log_completed(self, start: float, result: str, method: str = "generate", sampled: bool = True) -> None:
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        logger.info(
+            "LLMClient.%s completed in %.3fs, response=%s",
+            method,
+            perf_counter() - start,
+            self.log_policy.render(result, sampled)
+        )
 
     def generate(
         self,
         prompt: str,
         *,
         context: Optional[Union[str, Sequence[str]]] = None,
+        cache: bool = True,
         **kwargs
     ) -> str:
         """
@@ -44,49 +139,164 @@ class LLMClient:
         If `context` is provided as a string or list of strings, it is prepended to the prompt
         (joined with two newlines) to give the model conversational memory.
 
-        Logs backend, duration, full prompt, kwargs, and a truncated response.
+        Identical calls are answered from the response cache, and identical
+        calls made while one is already running wait for its answer instead
+        of calling the backend again; pass `cache=False` for calls that
+        should vary (e.g. high-temperature one-liners).
+
+        Logs backend, duration and kwargs, with the prompt and response cut
+        down by `log_policy` (see PromptLogPolicy).
         """
         # 1) Build the full prompt
-        if context:
-            if isinstance(context, str):
-                context_block = context.strip()
-            else:
-                # list of lines → join with double newlines
-                context_block = "\n\n".join(line.strip() for line in context)
-            full_prompt = f"{context_block}\n\n{prompt}"
-        else:
-            full_prompt = prompt
+        full_prompt = self._build_prompt(prompt, context)
 
-        logger.info(
-            "LLMClient.generate start: backend=%r prompt=%r kwargs=%s",
-            self.backend, full_prompt, kwargs
-        )
-        start = perf_counter()
+        key = self._cache_key(full_prompt, kwargs) if cache and self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._log_cache_hit(key, "generate")
+                return cached
 
-        # 2) Call out to the correct backend
-        if self.backend == "openai":
-            model = kwargs.pop("model", "gpt-3.5-turbo")
-            resp = self.client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": full_prompt}],
-                **kwargs
-            )
-            result = resp.choices[0].message.content
+        if cache and self.flight:
+            flight_key = key or self._cache_key(full_prompt, kwargs)
+            return self.flight.do_sync(flight_key, partial(self._generate, full_prompt, kwargs, key))
+        return self._generate(full_prompt, kwargs, key)
 
-        elif self.backend == "llama":
-            out = self.client(full_prompt, **kwargs)
-            result = out[0].get("generated_text", "")
+    def _generate(self, full_prompt: str, kwargs: Dict[str, Any], key: Optional[str]) -> str:
+        kwargs = dict(kwargs)
+        sampled = self._log_start("generate", full_prompt, kwargs)
+        start = perf_counter()
 
-        else:
-            # Should never happen
-            raise RuntimeError(f"Unsupported backend {self.backend!r}")
+        # 2) Call out to the backend
+        with span("llm.call", backend=self.backend):
+            result = self.impl.generate(full_prompt, **kwargs)
 
         # 3) Log elapsed time and a truncated preview of the output
-        duration = perf_counter() - start
-        display = result if len(result) < 200 else result[:200] + "...(truncated)"
-        logger.info(
-            "LLMClient.generate completed in %.3fs, response=%r",
-            duration,
-            display
-        )
+        self._log_completed(start, result, sampled=sampled)
+        if key:
+            self.cache.set(key, result)
+        return result
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        context: Optional[Union[str, Sequence[str]]] = None,
+        cache: bool = True,
+        priority: Priority = Priority.PRIMARY,
+        **kwargs
+    ) -> str:
+        """
+        Async counterpart of `generate()` that never blocks the event loop.
+
+        Backends without native async support run on their own bounded
+        thread pool. The cache lookup includes the Redis tier.
+        Concurrent identical calls are coalesced into one backend call (see
+        `SingleFlight`); a caller that is cancelled does not cancel the call
+        for the others.
+
+        Backend calls go through admission control (see `AdmissionController`);
+        optional work should pass a lower `priority`, and may then raise
+        `LoadShed` under load instead of waiting.
+        """
+        full_prompt = self._build_prompt(prompt, context)
+
+        key = self._cache_key(full_prompt, kwargs) if cache and self.cache else None
+        if key:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                self._log_cache_hit(key, "agenerate")
+                return cached
+
+        if cache and self.flight:
+            flight_key = key or self._cache_key(full_prompt, kwargs)
+            return await self.flight.do(flight_key, partial(self._agenerate, full_prompt, kwargs, key, priority))
+        return await self._agenerate(full_prompt, kwargs, key, priority)
+
+    def _admitted(self, priority: Priority):
+        return self.admission.slot(priority) if self.admission else nullcontext()
+
+    async def _agenerate(
+        self, full_prompt: str, kwargs: Dict[str, Any], key: Optional[str], priority: Priority
+    ) -> str:
+        kwargs = dict(kwargs)
+        sampled = self._log_start("agenerate", full_prompt, kwargs)
+        start = perf_counter()
+
+        async with self._admitted(priority):
+            with span("llm.call", backend=self.backend):
+                result = await self.impl.agenerate(full_prompt, **kwargs)
+
+        self._log_completed(start, result, "agenerate", sampled)
+        if key:
+            await self.cache.aset(key, result)
         return result
+
+    async def astream(
+        self,
+        prompt: str,
+        *,
+        context: Optional[Union[str, Sequence[str]]] = None,
+        cache: bool = True,
+        priority: Priority = Priority.PRIMARY,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Yield the completion as it is produced, one text chunk at a time.
+
+        Backends without streaming support yield their answer as one chunk
+        (see `capabilities`). A cached answer is yielded as a single chunk, and a
+        fully streamed answer is cached under the same key as `agenerate()`.
+        Concurrent identical streams share one backend stream, each caller
+        receiving every chunk.
+        """
+        full_prompt = self._build_prompt(prompt, context)
+
+        key = self._cache_key(full_prompt, kwargs) if cache and self.cache else None
+        if key:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                self._log_cache_hit(key, "astream")
+                yield cached
+                return
+
+        if cache and self.flight:
+            flight_key = key or self._cache_key(full_prompt, kwargs)
+            chunks = self.flight.stream(flight_key, partial(self._astream, full_prompt, kwargs, key, priority))
+        else:
+            chunks = self._astream(full_prompt, kwargs, key, priority)
+        try:
+            async for text in chunks:
+                yield text
+        finally:
+            # a caller that stops early releases its share of the call now
+            await chunks.aclose()
+
+    async def _astream(
+        self, full_prompt: str, kwargs: Dict[str, Any], key: Optional[str], priority: Priority
+    ) -> AsyncIterator[str]:
+        async with self._admitted(priority):
+            chunks = self._astream_backend(full_prompt, kwargs, key)
+            try:
+                async for text in chunks:
+                    yield text
+            finally:
+                await chunks.aclose()
+
+    async def _astream_backend(
+        self, full_prompt: str, kwargs: Dict[str, Any], key: Optional[str]
+    ) -> AsyncIterator[str]:
+        kwargs = dict(kwargs)
+        sampled = self._log_start("astream", full_prompt, kwargs)
+        start = perf_counter()
+        parts = []
+
+        with span("llm.call", backend=self.backend):
+            async for text in self.impl.astream(full_prompt, **kwargs):
+                parts.append(text)
+                yield text
+
+        result = "".join(parts)
+        self._log_completed(start, result, "astream", sampled)
+        if key:
+            await self.cache.aset(key, result)
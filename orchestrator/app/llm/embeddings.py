@@ -0,0 +1,71 @@
+# orchestrator/app/llm/embeddings.py
+
+import hashlib
+import re
+from typing import Iterable, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Function words carry little meaning for "is this the same question?"
+STOPWORDS = frozenset("""
+a an and are as at be by can could do does for from how i in is it me of on or
+please tell that the this to was what whats when where which who why will with
+you your explain describe give about
+""".split())
+
+
+def content_tokens(text: str) -> Tuple[str, ...]:
+    """
+    The content words of `text` in order: lower-cased, stop words dropped.
+    Unlike an embedding this keeps word order and negations ("not", "no").
+    """
+    return tuple(w for w in _TOKEN_RE.findall(text.lower()) if w not in STOPWORDS)
+
+
+class HashingEmbedder:
+    """
+    Deterministic, dependency-free text embedding via the hashing trick.
+
+    Content words and their character n-grams are hashed (blake2b, so results
+    are stable across processes) into a fixed number of signed buckets and the
+    vector is L2-normalised, so a dot product is the cosine similarity. Good
+    enough to match paraphrased questions offline; swap in a model embedding
+    by passing any `str -> np.ndarray` callable instead.
+    """
+
+    def __init__(self, dim: int = 512, ngram: int = 3, ngram_weight: float = 0.5):
+        if dim < 1:
+            raise ValueError("dim must be >= 1")
+        self.dim = dim
+        self.ngram = ngram
+        self.ngram_weight = ngram_weight
+        # identifies the vector space: vectors stored under one name are only
+        # comparable with queries embedded under the same name
+        self.name = f"hashing-v1/{dim}/{ngram}/{ngram_weight:g}"
+
+    def _features(self, text: str) -> Iterable[Tuple[str, float]]:
+        for word in _TOKEN_RE.findall(text.lower()):
+            if word in STOPWORDS:
+                continue
+            yield f"w:{word}", 1.0
+            padded = f"<{word}>"
+            for i in range(len(padded) - self.ngram + 1):
+                yield f"c:{padded[i:i + self.ngram]}", self.ngram_weight
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        sign = 1.0 if value >> 63 else -1.0
+        return value % self.dim, sign
+
+    def __call__(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            idx, sign = self._bucket(feature)
+            vec[idx] += sign * weight
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+        return vec
@@ -0,0 +1,119 @@
+# orchestrator/app/llm/prompt_log.py
+
+import hashlib
+import random
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# text -> text with sensitive parts replaced
+Redactor = Callable[[str], str]
+
+# ASCII classes and the lookbehind keep these near 10µs on a 300-char slice
+_EMAIL = re.compile(r"(?<![\w.+-])[\w.+-]+@[\w-]+(?:\.[\w-]+)+", re.ASCII)
+# phone and card numbers: 9+ digits, optionally grouped by spaces, dots, dashes or parentheses
+_NUMBER = re.compile(r"(?<!\w)\+?\d[\d\s().-]{7,}\d(?!\w)", re.ASCII)
+
+
+def redact_emails(text: str) -> str:
+    return _EMAIL.sub("<email>", text) if "@" in text else text
+
+
+def redact_numbers(text: str) -> str:
+    return _NUMBER.sub("<number>", text)
+
+
+# names accepted in LLM_LOG_REDACT
+REDACTORS: Dict[str, Redactor] = {
+    "email": redact_emails,
+    "phone": redact_numbers,
+}
+
+
+def fingerprint(text: str) -> str:
+    """Stable short identity of `text`: hash prefix and length."""
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+    return f"sha1:{digest} len={len(text)}"
+
+
+class PromptLogPolicy:
+    """
+    What of a prompt or response goes into the logs.
+
+    A known static prefix (the master system prompt) is logged as its
+    fingerprint only. Of the rest, at most `max_chars` characters are kept,
+    after the `redactors` have run over them, and only for a `sample_rate`
+    fraction of calls; the others log just the fingerprint of the text.
+    """
+
+    # redaction runs on a little more than is kept, so a match cut by the
+    # truncation is still recognised
+    REDACT_MARGIN = 64
+
+    def __init__(
+        self,
+        *,
+        max_chars: int = 200,
+        sample_rate: float = 1.0,
+        prefixes: Iterable[str] = (),
+        redactors: Iterable[Redactor] = (),
+        rng: Optional[random.Random] = None,
+    ):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.max_chars = max_chars
+        self.sample_rate = sample_rate
+        self.redactors: List[Redactor] = list(redactors)
+        self._prefixes: List[Tuple[str, str]] = []
+        self._rng = rng or random.Random()
+        for prefix in prefixes:
+            self.add_prefix(prefix)
+
+    @classmethod
+    def from_settings(cls, settings) -> "PromptLogPolicy":
+        names = [n.strip() for n in getattr(settings, "LLM_LOG_REDACT", "email,phone").split(",") if n.strip()]
+        unknown = [n for n in names if n not in REDACTORS]
+        if unknown:
+            raise ValueError(f"Unknown LLM_LOG_REDACT entries: {unknown} (choose from {sorted(REDACTORS)})")
+        master = getattr(settings, "MASTER_PROMPT", None)
+        return cls(
+            max_chars=getattr(settings, "LLM_LOG_MAX_CHARS", 200),
+            sample_rate=getattr(settings, "LLM_LOG_SAMPLE_RATE", 1.0),
+            prefixes=[master] if master else [],
+            redactors=[REDACTORS[n] for n in names],
+        )
+
+    def add_prefix(self, text: str) -> None:
+        """Log `text` as a fingerprint wherever a prompt starts with it."""
+        # prompts are assembled from stripped context lines (see LLMClient._build_prompt)
+        text = text.strip()
+        if text:
+            self._prefixes.append((text, fingerprint(text)))
+            self._prefixes.sort(key=lambda p: len(p[0]), reverse=True)
+
+    def add_redactor(self, redactor: Redactor) -> None:
+        self.redactors.append(redactor)
+
+    def sampled(self) -> bool:
+        """Whether this call's text is logged; decide once per call."""
+        return self.sample_rate >= 1.0 or self._rng.random() < self.sample_rate
+
+    def render(self, text: str, sampled: bool = True) -> str:
+        # 1) Static prefix → its fingerprint
+        head = ""
+        for prefix, fp in self._prefixes:
+            if text.startswith(prefix):
+                head = f"[system {fp}] "
+                text = text[len(prefix):].lstrip()
+                break
+
+        # 2) Unsampled (or text logging off): identity of the rest only
+        if not sampled or self.max_chars <= 0:
+            return f"{head}[text {fingerprint(text)}]"
+
+        # 3) Redact, then cut to max_chars
+        shown = text[: self.max_chars + self.REDACT_MARGIN]
+        for redactor in self.redactors:
+            shown = redactor(shown)
+        shown = shown[: self.max_chars]
+        more = len(text) - self.max_chars
+        return f"{head}{shown!r}" + (f" …(+{more} chars)" if more > 0 else "")
@@ -0,0 +1,183 @@
+# orchestrator/app/llm/singleflight.py
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class _Broadcast:
+    """
+    One streamed call fanned out to every subscriber: chunks are kept so a
+    late subscriber replays what it missed, then follows along live.
+    """
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+
+    def notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls that are in flight at the same time.
+
+    The first caller for a key (the leader) starts the real call as a task;
+    callers arriving with the same key before it finishes await that same
+    task instead of making their own. Results and exceptions reach every
+    waiter. The call belongs to the group, not to the leader: if the
+    leader's caller goes away the call keeps running for the others, and
+    it is only cancelled once every waiter has gone.
+
+    Keys are forgotten as soon as the call finishes; caching answers is the
+    response cache's job.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self._sync_calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finished(self._calls, key, call))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            # shield: one waiter being cancelled must not cancel the shared call
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                self._abandon(self._calls, key, call)
+            raise
+        finally:
+            call.waiters -= 1
+
+    async def stream(self, key: str, source: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Like `do()` for a streamed call: every subscriber gets every chunk,
+        in order, including the ones produced before it subscribed.
+        """
+        b = self._streams.get(key)
+        if b is None:
+            b = _Broadcast()
+            b.task = asyncio.ensure_future(self._pump(b, source))
+            self._streams[key] = b
+            b.task.add_done_callback(lambda task: self._finished(self._streams, key, b))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        b.waiters += 1
+        seen = 0
+        try:
+            while True:
+                if seen < len(b.chunks):
+                    seen += 1
+                    yield b.chunks[seen - 1]
+                    continue
+                if b.done:
+                    if b.error is not None:
+                        raise b.error
+                    return
+                await b.changed.wait()
+        finally:
+            b.waiters -= 1
+            if not b.waiters and not b.done:
+                self._abandon(self._streams, key, b)
+
+    @staticmethod
+    async def _pump(b: _Broadcast, source: Callable[[], AsyncIterator[str]]) -> None:
+        try:
+            async for chunk in source():
+                b.chunks.append(chunk)
+                b.notify()
+        except Exception as e:
+            # handed to the subscribers, who raise it
+            b.error = e
+        finally:
+            b.done = True
+            b.notify()
+
+    def do_sync(self, key: str, fn: Callable[[], T]) -> T:
+        """
+        Blocking variant for threads: followers wait on the leader's result.
+        """
+        with self._lock:
+            future = self._sync_calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._sync_calls[key] = Future()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._sync_calls[key]
+
+    def _abandon(self, calls: Dict[str, Any], key: str, call: Any) -> None:
+        # nobody is waiting any more: stop paying for the call, and make sure
+        # a new caller starts a fresh one instead of joining a cancelled task
+        logger.info("SingleFlight: cancelling abandoned call %s", key[:16])
+        self.abandoned += 1
+        call.task.cancel()
+        if calls.get(key) is call:
+            del calls[key]
+
+    @staticmethod
+    def _finished(calls: Dict[str, Any], key: str, call: Any) -> None:
+        if calls.get(key) is call:
+            del calls[key]
+        task = call.task
+        if not task.cancelled():
+            # retrieved here, so a failure nobody awaited is not logged as
+            # "exception was never retrieved"
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls) + len(self._streams) + len(self._sync_calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
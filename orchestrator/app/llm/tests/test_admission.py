@@ -0,0 +1,106 @@
+# app/llm/tests/test_admission.py
+
+import asyncio
+
+import pytest
+
+from app.llm.admission import (
+    AdmissionController, LoadShed, Priority, TokenBucket, chat_scope, current_chat,
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_token_bucket_refills_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.delay() == pytest.approx(0.5)
+    # over the limit: the caller is told how long to wait
+    assert bucket.take() == pytest.approx(0.5)
+    clock.now = 10.0
+    assert bucket.delay() == 0
+    assert bucket.tokens == 2
+
+@pytest.mark.asyncio
+async def test_global_cap_admits_primary_before_extras():
+    admission = AdmissionController(1, chat_rate=0)
+    order = []
+
+    async def call(name, priority):
+        async with admission.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    await admission.acquire()   # hold the only slot
+    waiters = [
+        asyncio.create_task(call("extra", Priority.EXTRA)),
+        asyncio.create_task(call("background", Priority.BACKGROUND)),
+        asyncio.create_task(call("primary", Priority.PRIMARY)),
+    ]
+    await asyncio.sleep(0)
+    assert admission.stats()["priorities"]["extra"]["waiting"] == 1
+    admission.release()
+    await asyncio.gather(*waiters)
+    assert order == ["primary", "background", "extra"]
+    assert admission.stats()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_extras_are_shed_when_queue_is_full_or_wait_too_long():
+    admission = AdmissionController(1, chat_rate=0, max_queued=1, shed_after=0.05)
+    await admission.acquire()
+
+    queued = asyncio.create_task(admission.acquire(Priority.EXTRA))
+    await asyncio.sleep(0)
+    with pytest.raises(LoadShed):
+        await admission.acquire(Priority.EXTRA)
+    with pytest.raises(LoadShed):
+        await queued
+    assert admission.stats()["shed"] == {"rate": 0, "queue_full": 1, "timeout": 1}
+
+    # primary work is never shed; it gets the slot once it is free
+    primary = asyncio.create_task(admission.acquire(Priority.PRIMARY))
+    await asyncio.sleep(0.1)
+    assert not primary.done()
+    admission.release()
+    await primary
+    assert admission.stats()["priorities"]["primary"]["max_wait_s"] >= 0.1
+
+@pytest.mark.asyncio
+async def test_noisy_chat_is_rate_limited_alone():
+    admission = AdmissionController(8, chat_rate=20.0, chat_burst=2)
+    with chat_scope("noisy"):
+        assert current_chat.get() == "noisy"
+        for _ in range(2):
+            async with admission.slot():
+                pass
+        # out of tokens: extras are dropped, primary waits for a refill
+        with pytest.raises(LoadShed):
+            await admission.acquire(Priority.EXTRA)
+        async with admission.slot():
+            pass
+    assert current_chat.get() is None
+    assert admission.rate_limited == 1
+    assert admission.stats()["shed"]["rate"] == 1
+
+    # another chat still has its whole burst
+    async with admission.slot(chat_id="quiet"):
+        pass
+    assert admission.rate_limited == 1
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    admission = AdmissionController(1, chat_rate=0)
+    await admission.acquire()
+    waiter = asyncio.create_task(admission.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    admission.release()
+    assert admission.stats()["in_flight"] == 0
+    await asyncio.wait_for(admission.acquire(), 1)
@@ -0,0 +1,124 @@
+# app/llm/tests/test_backends.py
+
+import statistics
+import sys
+import types
+
+import pytest
+
+from app.llm.backends import (
+    BACKENDS, Backend, Capabilities, FakeBackend, FakeBackendError, backend_name,
+    create_backend, register,
+)
+from app.llm.clients import LLMClient
+
+def fake_settings(**overrides):
+    values = dict(
+        LLM_BACKEND="fake", FAKE_LATENCY_MS=0.0, FAKE_TOKENS_PER_S=0.0, FAKE_SEED=7,
+    )
+    values.update(overrides)
+    return types.SimpleNamespace(**values)
+
+def test_registry_names_and_aliases():
+    assert {"openai", "transformers", "llama_cpp", "fake"} <= set(BACKENDS)
+    assert backend_name("llama  # local model") == "transformers"
+    assert backend_name(" Fake ") == "fake"
+    with pytest.raises(ValueError, match="Unknown LLM_BACKEND"):
+        create_backend(types.SimpleNamespace(LLM_BACKEND="gpt-9"))
+    with pytest.raises(ValueError, match="already registered"):
+        register("fake")(type("Other", (Backend,), {}))
+
+def test_backends_declare_capabilities():
+    assert BACKENDS["openai"].capabilities == Capabilities(streaming=True, native_async=True)
+    assert BACKENDS["llama_cpp"].capabilities.streaming
+    assert not BACKENDS["llama_cpp"].capabilities.native_async
+    assert BACKENDS["llama_cpp"].parallelism == 1
+
+@pytest.mark.asyncio
+async def test_fake_backend_is_deterministic_per_prompt():
+    backend = FakeBackend(fake_settings(FAKE_REPLY_TOKENS=12))
+    first = await backend.agenerate("What is tribal sovereignty?")
+    assert first == await backend.agenerate("What is tribal sovereignty?")
+    assert first != await backend.agenerate("Something else")
+    assert len(first.split()) == 12
+    assert len((await backend.agenerate("q", max_tokens=3)).split()) == 3
+
+    chunks = [c async for c in backend.astream("What is tribal sovereignty?")]
+    assert len(chunks) == 12
+    assert "".join(chunks) == first
+    assert backend.generate("What is tribal sovereignty?") == first
+
+@pytest.mark.asyncio
+async def test_fake_backend_failure_rate_is_repeatable():
+    async def outcomes():
+        backend = FakeBackend(fake_settings(FAKE_FAILURE_RATE=0.3))
+        results = []
+        for _ in range(200):
+            try:
+                await backend.agenerate("q")
+                results.append(True)
+            except FakeBackendError:
+                results.append(False)
+        return results, backend.stats()["failures"]
+
+    (first, failures), (second, _) = await outcomes(), await outcomes()
+    assert first == second
+    assert 40 <= failures <= 80
+
+@pytest.mark.parametrize("dist", FakeBackend.DISTRIBUTIONS)
+def test_fake_latency_distributions_keep_the_mean(dist):
+    backend = FakeBackend(fake_settings(FAKE_LATENCY_MS=100.0, FAKE_LATENCY_DIST=dist))
+    samples = [backend.first_token_delay() for _ in range(4000)]
+    assert statistics.mean(samples) == pytest.approx(0.1, rel=0.1)
+    assert min(samples) >= 0
+    if dist == "fixed":
+        assert set(samples) == {0.1}
+
+def test_fake_backend_rejects_unknown_distribution():
+    with pytest.raises(ValueError):
+        FakeBackend(fake_settings(FAKE_LATENCY_DIST="pareto"))
+
+@pytest.mark.asyncio
+async def test_llm_client_runs_on_the_fake_backend():
+    client = LLMClient(fake_settings(ADMISSION_MAX_CONCURRENT=3))
+    assert client.backend == "fake"
+    assert client.capabilities.streaming
+    answer = await client.agenerate("hello", context=["USER: hi"])
+    assert answer == " ".join(client.impl.reply("USER: hi\n\nhello"))
+    streamed = "".join([c async for c in client.astream("other", cache=False)])
+    assert streamed == " ".join(client.impl.reply("other"))
+    # no local parallelism limit: the configured admission cap stands
+    assert client.admission.max_concurrent == 3
+
+def test_backend_parallelism_only_lowers_the_admission_cap(monkeypatch):
+    monkeypatch.setattr(FakeBackend, "parallelism", 16)
+    assert LLMClient(fake_settings(ADMISSION_MAX_CONCURRENT=2)).admission.max_concurrent == 2
+    assert LLMClient(fake_settings(ADMISSION_MAX_CONCURRENT=32)).admission.max_concurrent == 16
+
+def test_llama_cpp_backend(monkeypatch):
+    class Llama:
+        def __init__(self, model_path, n_threads=None, verbose=True):
+            self.model_path, self.n_threads = model_path, n_threads
+
+        def create_completion(self, prompt, stream=False, **kwargs):
+            if stream:
+                return iter([{"choices": [{"text": t}]} for t in ("gguf ", "", "answer")])
+            return {"choices": [{"text": f"gguf answer to {prompt}"}]}
+
+    mod = types.ModuleType("llama_cpp")
+    mod.Llama = Llama
+    monkeypatch.setitem(sys.modules, "llama_cpp", mod)
+    client = LLMClient(types.SimpleNamespace(
+        LLM_BACKEND="llama_cpp", LLAMA_MODEL_PATH="m.gguf", LLAMA_WORKER_THREADS=2,
+        ADMISSION_MAX_CONCURRENT=8,
+    ))
+    assert client.client.n_threads == 2
+    assert client.generate("q", max_tokens=5, model="ignored") == "gguf answer to q"
+    # calls are serialized by the backend, so admission queues them instead
+    assert client.admission.max_concurrent == 1
+
+    import asyncio
+    async def stream():
+        return [c async for c in client.astream("q2")]
+    assert asyncio.run(stream()) == ["gguf ", "answer"]
+    client.close()
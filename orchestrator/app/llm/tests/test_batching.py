@@ -0,0 +1,108 @@
+# app/llm/tests/test_batching.py
+
+import asyncio
+import os
+import queue
+import threading
+import time
+
+import pytest
+
+from app.llm.batching import BatchingWorker, collect_batch, run_batch, serve
+
+class EchoPipeline:
+    """Stands in for a text-generation pipeline; records each call's batch."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, prompts, batch_size=1, **kwargs):
+        self.calls.append((list(prompts), kwargs))
+        time.sleep(self.delay)
+        if any(p == "boom" for p in prompts):
+            raise ValueError("bad prompt")
+        return [[{"generated_text": f"{p.upper()}{kwargs.get('suffix', '')}"}] for p in prompts]
+
+def make_echo_pipeline(delay=0.0):
+    return EchoPipeline(delay)
+
+def crash_on_load():
+    os._exit(3)
+
+def test_collect_batch_waits_for_more_up_to_max_batch():
+    requests = queue.Queue()
+    for i in range(5):
+        requests.put((i, f"p{i}", {}))
+    batch, stop = collect_batch(requests, max_batch=3, max_wait=1.0)
+    assert [r[0] for r in batch] == [0, 1, 2]
+    assert not stop
+
+    # not enough requests: returns once max_wait has passed
+    start = time.monotonic()
+    batch, _ = collect_batch(requests, max_batch=3, max_wait=0.05)
+    assert [r[0] for r in batch] == [3, 4]
+    assert time.monotonic() - start >= 0.05
+
+    requests.put((5, "p5", {}))
+    requests.put(None)
+    assert collect_batch(requests, 8, 1.0) == ([(5, "p5", {})], True)
+
+def test_run_batch_splits_by_kwargs_and_isolates_failures():
+    pipe = EchoPipeline()
+    passes, results = run_batch(pipe, [
+        (1, "a", {}), (2, "b", {"suffix": "!"}), (3, "c", {}), (4, "boom", {"suffix": "?"}),
+    ])
+    assert passes == 3
+    assert pipe.calls[0] == (["a", "c"], {})
+    assert sorted(results) == [
+        (1, True, "A"), (2, True, "B!"), (3, True, "C"), (4, False, "ValueError: bad prompt"),
+    ]
+
+def test_serve_batches_concurrent_requests():
+    pipe = EchoPipeline(delay=0.02)
+    requests, results = queue.Queue(), queue.Queue()
+    worker = threading.Thread(target=serve, args=(pipe, requests, results, 4, 0.01))
+    worker.start()
+    for i in range(10):
+        requests.put((i, f"p{i}", {}))
+    requests.put(None)
+    worker.join(5)
+
+    answered = {}
+    while not results.empty():
+        _, batch = results.get()
+        answered.update({req_id: text for req_id, _, text in batch})
+    assert answered == {i: f"P{i}" for i in range(10)}
+    sizes = [len(prompts) for prompts, _ in pipe.calls]
+    assert max(sizes) == 4
+    assert len(sizes) < 10
+
+@pytest.mark.asyncio
+async def test_worker_process_answers_every_caller():
+    worker = BatchingWorker(make_echo_pipeline, (0.02,), max_batch=8, max_wait_ms=20, start_method="fork")
+    worker.start()
+    try:
+        prompts = [f"chat {i}" for i in range(12)]
+        answers = await asyncio.gather(*(worker.agenerate(p) for p in prompts))
+        assert answers == [p.upper() for p in prompts]
+        assert worker.generate("sync", suffix="!") == "SYNC!"
+        with pytest.raises(RuntimeError, match="bad prompt"):
+            await worker.agenerate("boom")
+
+        stats = worker.stats()
+        assert stats["ready"]
+        assert stats["completed"] == 13 and stats["failed"] == 1
+        assert stats["largest_batch"] > 1
+        assert stats["batches"] < 14
+    finally:
+        await asyncio.to_thread(worker.close)
+    assert not worker.alive
+
+def test_dead_worker_fails_pending_requests():
+    worker = BatchingWorker(crash_on_load, start_method="fork")
+    worker.start()
+    future = worker.submit("hello")
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        future.result(timeout=5)
+    worker.close()
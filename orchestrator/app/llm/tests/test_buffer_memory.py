@@ -0,0 +1,83 @@
+# app/llm/tests/test_buffer_memory.py
+
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.agents.memory.buffer_memory import BufferMemory
+
+class FlakyRedis(fakeredis.FakeAsyncRedis):
+    # fails every pipeline while `down` is set
+    down = False
+
+    def pipeline(self, *args, **kwargs):
+        pipe = super().pipeline(*args, **kwargs)
+        if self.down:
+            async def execute(*a, **k):
+                raise ConnectionError("redis down")
+            pipe.execute = execute
+        return pipe
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+@pytest.mark.asyncio
+async def test_add_turn_is_one_round_trip_and_trims(redis):
+    memory = BufferMemory(redis, write_behind=False)
+    memory.maxlen = 4
+    for i in range(3):
+        await memory.add_turn(1, f"q{i}", f"a{i}")
+    assert memory.round_trips == 3
+    assert await memory.get_history(1) == ["USER: q1", "BOT: a1", "USER: q2", "BOT: a2"]
+
+@pytest.mark.asyncio
+async def test_write_behind_batches_chats_into_one_flush(redis):
+    memory = BufferMemory(redis, write_behind=True, flush_interval=0.01)
+    for chat in range(5):
+        await memory.add_turn(chat, "hi", "hello")
+    assert memory.round_trips == 0
+    # buffered entries are visible to reads straight away
+    assert await memory.get_history(3) == ["USER: hi", "BOT: hello"]
+
+    await asyncio.sleep(0.05)
+    assert memory.flushes == 1
+    assert memory.stats()["pending"] == 0
+    assert await redis.lrange("history:4", 0, -1) != []
+    await memory.aclose()
+
+@pytest.mark.asyncio
+async def test_full_buffer_flushes_inline(redis):
+    memory = BufferMemory(redis, write_behind=True, flush_interval=60, max_pending=4)
+    await memory.add_turn(1, "a", "b")
+    await memory.add_turn(2, "c", "d")
+    assert memory.flushes == 0
+    await memory.add_turn(3, "e", "f")
+    assert memory.flushes == 1
+    assert memory.stats()["pending"] == 2
+    await memory.aclose()
+
+@pytest.mark.asyncio
+async def test_aclose_flushes_remaining_entries(redis):
+    memory = BufferMemory(redis, write_behind=True, flush_interval=60)
+    await memory.add(7, "user", "bye")
+    await memory.aclose()
+    assert await redis.lrange("history:7", 0, -1) == [memory._encode("USER: bye")]
+
+@pytest.mark.asyncio
+async def test_failed_flush_requeues_within_bound():
+    redis = FlakyRedis(decode_responses=True)
+    memory = BufferMemory(redis, write_behind=True, flush_interval=60, max_pending=4)
+    redis.down = True
+    await memory.add_turn(1, "a", "b")
+    await memory.add_turn(1, "c", "d")
+    await memory.flush()
+    assert memory.stats()["pending"] == 4
+    await memory.add_turn(1, "e", "f")   # inline flush fails; oldest entries dropped
+    assert memory.stats()["pending"] == 4
+    assert memory.dropped == 2
+
+    redis.down = False
+    await memory.aclose()
+    assert await memory.get_history(1) == ["USER: c", "BOT: d", "USER: e", "BOT: f"]
@@ -0,0 +1,113 @@
+# app/llm/tests/test_cache.py
+
+import sys
+import types
+
+import pytest
+
+from app.llm.cache import LRUCache, RedisCacheTier, ResponseCache, make_cache_key
+from app.llm.clients import LLMClient
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+def test_cache_key_depends_on_every_input():
+    base = make_cache_key("openai", "gpt", "p", {"max_tokens": 5, "temperature": 0})
+    assert base == make_cache_key("openai", "gpt", "p", {"temperature": 0, "max_tokens": 5})
+    assert base != make_cache_key("llama", "gpt", "p", {"max_tokens": 5, "temperature": 0})
+    assert base != make_cache_key("openai", "gpt-4", "p", {"max_tokens": 5, "temperature": 0})
+    assert base != make_cache_key("openai", "gpt", "p2", {"max_tokens": 5, "temperature": 0})
+    assert base != make_cache_key("openai", "gpt", "p", {"max_tokens": 6, "temperature": 0})
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"      # a is now most recent
+    cache.set("c", "3")               # evicts b
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+    assert cache.stats() == {
+        "size": 2, "max_entries": 2, "hits": 2, "misses": 1, "evictions": 1, "expirations": 0,
+    }
+
+def test_lru_entries_expire():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=4, ttl=10, clock=clock)
+    cache.set("a", "1")
+    clock.now = 9.9
+    assert cache.get("a") == "1"
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+@pytest.mark.asyncio
+async def test_redis_tier_hit_is_promoted_to_local():
+    redis = FakeRedis()
+    shared = RedisCacheTier(redis, key_prefix="t:")
+    await ResponseCache(LRUCache(), shared).aset("k", "v")
+    assert redis.data == {"t:k": "v"}
+
+    # a fresh process: empty LRU, same Redis
+    cache = ResponseCache(LRUCache(), shared)
+    assert await cache.aget("k") == "v"
+    assert cache.local.get("k") == "v"
+    assert cache.stats()["redis"]["hits"] == 1
+
+def make_counting_client(monkeypatch, **settings):
+    calls = []
+
+    class CountingOpenAI:
+        def __init__(self, api_key, **kwargs):
+            def create(*, model, messages, **kwargs):
+                calls.append(kwargs)
+                return types.SimpleNamespace(
+                    choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=f"answer {len(calls)}"))]
+                )
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=create))
+
+    mod = types.ModuleType("openai")
+    mod.OpenAI = CountingOpenAI
+    monkeypatch.setitem(sys.modules, "openai", mod)
+    cfg = types.SimpleNamespace(LLM_BACKEND="openai", OPENAI_API_KEY="k", **settings)
+    return LLMClient(cfg), calls
+
+def test_generate_serves_repeats_from_cache(monkeypatch):
+    client, calls = make_counting_client(monkeypatch)
+    first = client.generate("What is tribal sovereignty?", context="SYSTEM", max_tokens=5)
+    second = client.generate("What is tribal sovereignty?", context="SYSTEM", max_tokens=5)
+    assert first == second == "answer 1"
+    assert len(calls) == 1
+
+    # different context or kwargs are different keys
+    client.generate("What is tribal sovereignty?", context="OTHER", max_tokens=5)
+    client.generate("What is tribal sovereignty?", context="SYSTEM", max_tokens=6)
+    assert len(calls) == 3
+    assert client.cache.stats()["local"]["hits"] == 1
+
+def test_generate_cache_opt_out_and_disable(monkeypatch):
+    client, calls = make_counting_client(monkeypatch)
+    assert client.generate("witty", temperature=0.8, cache=False) == "answer 1"
+    assert client.generate("witty", temperature=0.8, cache=False) == "answer 2"
+    assert client.cache.stats()["local"]["size"] == 0
+
+    client, calls = make_counting_client(monkeypatch, LLM_CACHE_ENABLED=False)
+    assert client.cache is None
+    client.generate("q")
+    client.generate("q")
+    assert len(calls) == 2
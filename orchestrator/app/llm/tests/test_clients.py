@@ -20,7 +20,7 @@ def test_unknown_backend_raises_value_error():
 # --- Helpers to stub out backends ------------------------------------------
 
 class DummyOpenAI:
-    def __init__(self, api_key):
+    def __init__(self, api_key, **kwargs):
         # simulate openai.OpenAI.chat.completions.create(...)
         self.chat = types.SimpleNamespace(
             completions=types.SimpleNamespace(
@@ -127,3 +127,110 @@ def test_generate_without_context(monkeypatch):
     out = client.generate("No context here", max_tokens=5)
     assert out == "ok"
     assert dummy.last_call["messages"] == [{"role": "user", "content": "No context here"}]
+
+# --- Async agenerate() -----------------------------------------------------
+
+class DummyAsyncOpenAI:
+    def __init__(self, api_key, **kwargs):
+        self.api_key = api_key
+        self.last_call = {}
+
+        async def create(*, model, messages, **kwargs):
+            self.last_call = {"model": model, "messages": messages, "kwargs": kwargs}
+            return types.SimpleNamespace(
+                choices=[types.SimpleNamespace(message=types.SimpleNamespace(content="async-openai-response"))]
+            )
+
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=create))
+
+@pytest.mark.asyncio
+async def test_openai_agenerate_uses_async_client(monkeypatch):
+    mod = make_dummy_openai_module()
+    mod.AsyncOpenAI = DummyAsyncOpenAI
+    monkeypatch.setitem(sys.modules, "openai", mod)
+    settings = types.SimpleNamespace(LLM_BACKEND="openai", OPENAI_API_KEY="key123")
+    client = LLMClient(settings)
+
+    out = await client.agenerate("Next?", context=["USER: A", "BOT: B"], max_tokens=5)
+    assert out == "async-openai-response"
+    assert client.async_client.api_key == "key123"
+    assert client.async_client.last_call["messages"] == [
+        {"role": "user", "content": "USER: A\n\nBOT: B\n\nNext?"}
+    ]
+    assert client.async_client.last_call["kwargs"] == {"max_tokens": 5}
+
+@pytest.mark.asyncio
+async def test_llama_agenerate_runs_off_the_event_loop(monkeypatch):
+    import threading
+    monkeypatch.setitem(sys.modules, "transformers", make_dummy_transformers_module())
+    settings = types.SimpleNamespace(LLM_BACKEND="llama", LLAMA_MODEL_PATH="some/path")
+    client = LLMClient(settings)
+
+    seen = {}
+    inner = client.client
+    def gen(prompt, **kwargs):
+        seen["thread"] = threading.current_thread().name
+        return inner(prompt, **kwargs)
+    client.client = gen
+
+    out = await client.agenerate("foo bar", top_k=5)
+    assert out == "llama-response"
+    assert inner.last == {"prompt": "foo bar", "kwargs": {"top_k": 5}}
+    assert seen["thread"].startswith("llm-llama")
+
+# --- Streaming astream() ---------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_openai_astream_yields_deltas(monkeypatch):
+    async def fake_stream():
+        for piece in ["Tribal ", None, "sovereignty"]:
+            yield types.SimpleNamespace(
+                choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=piece))]
+            )
+
+    class StreamingAsyncOpenAI(DummyAsyncOpenAI):
+        def __init__(self, api_key, **kwargs):
+            super().__init__(api_key)
+
+            async def create(*, model, messages, **kwargs):
+                self.last_call = {"model": model, "messages": messages, "kwargs": kwargs}
+                return fake_stream()
+
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=create))
+
+    mod = make_dummy_openai_module()
+    mod.AsyncOpenAI = StreamingAsyncOpenAI
+    monkeypatch.setitem(sys.modules, "openai", mod)
+    client = LLMClient(types.SimpleNamespace(LLM_BACKEND="openai", OPENAI_API_KEY="key123"))
+
+    chunks = [c async for c in client.astream("q", max_tokens=5)]
+    assert chunks == ["Tribal ", "sovereignty"]
+    assert client.async_client.last_call["kwargs"] == {"stream": True, "max_tokens": 5}
+
+@pytest.mark.asyncio
+async def test_llama_astream_bridges_text_streamer(monkeypatch):
+    mod = make_dummy_transformers_module()
+
+    class TextStreamer:
+        def __init__(self, tokenizer, skip_prompt=False, **decode_kwargs):
+            self.tokenizer = tokenizer
+
+        def on_finalized_text(self, text, stream_end=False):
+            raise NotImplementedError
+
+    def pipeline(task, model, device):
+        def gen(prompt, streamer=None, **kwargs):
+            for piece in ["llama ", "stream"]:
+                streamer.on_finalized_text(piece)
+            streamer.on_finalized_text("", stream_end=True)
+            return [{"generated_text": "llama stream"}]
+        gen.tokenizer = object()
+        return gen
+
+    mod.TextStreamer = TextStreamer
+    mod.pipeline = pipeline
+    monkeypatch.setitem(sys.modules, "transformers", mod)
+    client = LLMClient(types.SimpleNamespace(LLM_BACKEND="llama", LLAMA_MODEL_PATH="p"))
+
+    chunks = [c async for c in client.astream("q")]
+    assert chunks == ["llama ", "stream"]
@@ -1,4 +1,4 @@
-# orchestrator/tests/test_config.py
+# app/llm/tests/test_config.py
 
 import os
 import pytest
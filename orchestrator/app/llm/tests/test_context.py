@@ -0,0 +1,113 @@
+# app/llm/tests/test_context.py
+
+import asyncio
+
+import pytest
+
+from app.llm.tokens import context_window, count_tokens
+from app.orchestration.context import ContextBuilder, TokenHistogram
+
+class FakeMemory:
+    def __init__(self, lines):
+        self.entries = [(count_tokens(l), l) for l in lines]
+        self.summary = None
+
+    async def get_entries(self, chat_id):
+        return list(self.entries)
+
+    async def get_summary(self, chat_id):
+        return self.summary
+
+    async def set_summary(self, chat_id, summary):
+        self.summary = summary
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def agenerate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return f"summary #{len(self.prompts)}"
+
+def turns(n, words=20):
+    return [f"{'USER' if i % 2 == 0 else 'BOT'}: turn {i} " + "word " * words for i in range(n)]
+
+async def settle(builder):
+    while builder._refreshing:
+        await asyncio.sleep(0)
+
+def test_histogram_is_cumulative():
+    h = TokenHistogram(buckets=(10, 100))
+    for v in (5, 50, 500, 10):
+        h.observe(v)
+    snap = h.snapshot()
+    assert snap["buckets"] == {"10": 2, "100": 3, "+Inf": 4}
+    assert snap["count"] == 4 and snap["sum"] == 565
+
+def test_budget_is_capped_by_model_window():
+    builder = ContextBuilder(FakeMemory([]), FakeLLM(), budget=100_000, reply_tokens=1000)
+    assert builder.budget_for("gpt-4") == context_window("gpt-4") - 1000
+    assert builder.budget_for("gpt-4o") == 100_000
+
+@pytest.mark.asyncio
+async def test_short_history_goes_in_whole():
+    memory = FakeMemory(turns(4))
+    builder = ContextBuilder(memory, FakeLLM(), budget=2000)
+    context = await builder.build("1", "SYSTEM", "hello")
+    assert context == ["SYSTEM", *[l for _, l in memory.entries]]
+    assert not builder._refreshing
+
+@pytest.mark.asyncio
+async def test_long_history_keeps_newest_turns_within_budget():
+    memory = FakeMemory(turns(40))
+    llm = FakeLLM()
+    builder = ContextBuilder(memory, llm, budget=300)
+    context = await builder.build("1", "SYSTEM", "hello")
+
+    assert context[0] == "SYSTEM"
+    assert context[-1] == memory.entries[-1][1]
+    assert sum(count_tokens(c) for c in context) + count_tokens("hello") <= 300
+
+    # older turns are folded into a summary in the background
+    await settle(builder)
+    assert memory.summary["text"] == "summary #1"
+    assert "turn 0 " in llm.prompts[0]
+
+@pytest.mark.asyncio
+async def test_summary_is_used_and_updated_incrementally():
+    memory = FakeMemory(turns(40))
+    llm = FakeLLM()
+    builder = ContextBuilder(memory, llm, budget=300)
+    await builder.build("1", "SYSTEM", "hello")
+    await settle(builder)
+
+    context = await builder.build("1", "SYSTEM", "hello")
+    assert context[1] == "Summary of the earlier conversation: summary #1"
+    await settle(builder)
+    # nothing new fell out of the window, so the summary was not regenerated
+    assert len(llm.prompts) == 1
+
+    # two more turns push more lines out; only those are folded in
+    memory.entries += [(count_tokens(l), l) for l in turns(2, words=60)]
+    await builder.build("1", "SYSTEM", "hello")
+    await settle(builder)
+    assert len(llm.prompts) == 2
+    assert "turn 0 " not in llm.prompts[1].split("New lines:")[1]
+    assert "Current summary:\nsummary #1" in llm.prompts[1]
+
+@pytest.mark.asyncio
+async def test_histograms_record_prompt_size_and_savings():
+    builder = ContextBuilder(FakeMemory(turns(40)), FakeLLM(), budget=300)
+    await builder.build("1", "SYSTEM", "hello")
+    await settle(builder)
+    stats = builder.stats()
+    assert stats["prompt_tokens"]["count"] == 1
+    assert stats["prompt_tokens"]["sum"] <= 300
+    assert stats["saved_tokens"]["sum"] > 0
+
+def test_buffer_memory_stores_token_counts_and_reads_legacy_entries():
+    from app.agents.memory.buffer_memory import BufferMemory
+    memory = BufferMemory()
+    raw = memory._encode("USER: hello there")
+    assert memory._decode(raw) == (count_tokens("USER: hello there", memory.token_model), "USER: hello there")
+    assert memory._decode("BOT: old\tentry") == (count_tokens("BOT: old\tentry", memory.token_model), "BOT: old\tentry")
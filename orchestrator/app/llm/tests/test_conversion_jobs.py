@@ -0,0 +1,198 @@
+# app/llm/tests/test_conversion_jobs.py
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.agents.file_conversion_agent.file_conversion_agent import FileConversionAgent, converter_for
+from app.agents.file_conversion_agent.jobs import ConversionJobManager
+
+@pytest.fixture
+def manager():
+    mgr = ConversionJobManager(pool_size=2, max_per_kind=1, timeout=10)
+    yield mgr
+    mgr.shutdown()
+
+async def wait_finished(*jobs, limit=30):
+    deadline = time.monotonic() + limit
+    while not all(j.finished for j in jobs):
+        assert time.monotonic() < deadline, [j.status for j in jobs]
+        await asyncio.sleep(0.02)
+
+@pytest.mark.asyncio
+async def test_job_runs_in_worker_process_and_notifies(manager):
+    done = []
+
+    async def on_done(job):
+        done.append(job.describe())
+
+    job = manager.submit("pandoc", os.path.basename, "/tmp/report.docx", on_done=on_done)
+    assert job.status == "queued" and len(job.id) == 8
+    await wait_finished(job)
+    await asyncio.sleep(0)
+
+    assert job.status == "done"
+    assert job.result == "report.docx"
+    assert done == ["report.docx"]
+    assert manager.stats()["done"] == 1
+
+@pytest.mark.asyncio
+async def test_failures_and_timeouts_are_reported(manager):
+    failing = manager.submit("pandoc", int, "not a number")
+    slow = manager.submit("pdf2docx", time.sleep, 2, timeout=0.2)
+    await wait_finished(failing, slow)
+
+    assert failing.status == "failed"
+    assert "ValueError" in failing.error
+    assert slow.status == "timeout"
+    assert "timed out" in slow.describe()
+
+@pytest.mark.asyncio
+async def test_per_kind_cap_queues_and_queued_jobs_can_be_cancelled(manager):
+    first = manager.submit("pdf2docx", time.sleep, 0.5)
+    second = manager.submit("pdf2docx", time.sleep, 0.5)
+    other = manager.submit("pandoc", os.path.basename, "/x/y.md")
+    await asyncio.sleep(0.1)
+
+    # only one pdf2docx job may hold a worker; the other kind is not blocked
+    assert first.status == "running"
+    assert second.status == "queued"
+    assert await manager.cancel(second.id)
+    assert second.status == "cancelled"
+
+    await wait_finished(first, other)
+    assert other.status == "done"
+    assert not await manager.cancel(first.id)
+
+@pytest.mark.asyncio
+async def test_running_job_keeps_its_slot_until_the_worker_finishes(manager):
+    slow = manager.submit("pdf2docx", time.sleep, 1.5, timeout=0.3)
+    await asyncio.sleep(0.1)
+    assert slow.status == "running"
+    # already in a worker process: cannot be called off
+    assert not await manager.cancel(slow.id)
+    assert slow.status == "running"
+
+    await wait_finished(slow)
+    assert slow.status == "timeout"
+    # the worker is still sleeping, so the next pdf2docx job has to wait
+    assert manager._slots["pdf2docx"].locked()
+    follower = manager.submit("pdf2docx", os.path.basename, "/x/a.pdf")
+    await asyncio.sleep(0.3)
+    assert follower.status == "queued"
+    assert manager.stats()["running"] == 0
+
+    await wait_finished(follower)
+    assert follower.status == "done"
+    assert not manager._slots["pdf2docx"].locked()
+
+@pytest.mark.asyncio
+async def test_jobs_wait_for_a_free_worker(manager):
+    first = manager.submit("pdf2docx", time.sleep, 0.5)
+    second = manager.submit("pandoc", time.sleep, 0.5)
+    third = manager.submit("pandas", os.path.basename, "/x/b.csv")
+    await asyncio.sleep(0.1)
+    # pool_size=2: the third kind is not capped, but no worker is free
+    assert (first.status, second.status, third.status) == ("running", "running", "queued")
+    assert await manager.cancel(third.id)
+    await wait_finished(first, second)
+
+@pytest.mark.asyncio
+async def test_aclose_lets_submitted_jobs_notify_and_never_respawns_the_pool(manager):
+    done = []
+
+    async def on_done(job):
+        done.append(job.status)
+
+    manager.submit("pandoc", os.path.basename, "/x/c.md", on_done=on_done)
+    await manager.aclose(timeout=30)
+    assert done == ["done"]
+    assert manager._pool is None
+    with pytest.raises(RuntimeError, match="shut down"):
+        manager.submit("pandoc", os.path.basename, "/x/d.md")
+    with pytest.raises(RuntimeError, match="shut down"):
+        manager.pool
+
+@pytest.mark.asyncio
+async def test_lifespan_drains_updates_before_closing_the_job_pool(monkeypatch):
+    import logging
+    import types
+
+    root = logging.getLogger()
+    saved, level = root.handlers[:], root.level
+    try:
+        from app import main
+        main.log_pipeline.stop()
+    finally:
+        # importing main hands the root logger to its LogPipeline
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in saved:
+            root.addHandler(handler)
+        root.setLevel(level)
+
+    order = []
+
+    def record(name):
+        async def step(*args, **kwargs):
+            order.append(name)
+        return step
+
+    class Jobs:
+        aclose = staticmethod(record("jobs.aclose"))
+
+        def shutdown(self):
+            order.append("jobs.shutdown")
+
+    monkeypatch.setattr(main.settings, "WARMUP_ON_STARTUP", False)
+    monkeypatch.setattr(main, "audio_agent", types.SimpleNamespace(ready=True, jobs=Jobs()))
+    monkeypatch.setattr(main.workers, "start", record("workers.start"))
+    monkeypatch.setattr(main.workers, "stop", record("workers.stop"))
+    monkeypatch.setattr(main.followups, "aclose", record("followups.aclose"))
+    monkeypatch.setattr(main.master.context, "aclose", record("context.aclose"))
+    monkeypatch.setattr(main.dedup, "aclose", record("dedup.aclose"))
+    monkeypatch.setattr(main.memory, "aclose", record("memory.aclose"))
+    monkeypatch.setattr(main, "aclose_shared", record("transport.aclose"))
+
+    async with main.lifespan(main.app):
+        pass
+    assert order.index("workers.stop") < order.index("jobs.aclose")
+    assert order.index("followups.aclose") < order.index("jobs.aclose")
+    assert "jobs.shutdown" not in order
+
+def test_converter_for_routes_by_format():
+    assert converter_for("csv", "xlsx") == "pandas"
+    assert converter_for("xlsx", "csv") == "pandas"
+    assert converter_for("md", "docx") == "pandoc"
+    assert converter_for("pdf", "docx") in ("pdf2docx", "pypdf")
+
+@pytest.mark.asyncio
+async def test_agent_submit_replies_immediately(tmp_path):
+    src = tmp_path / "notes.md"
+    src.write_text("# hi")
+
+    class FakeJobs:
+        def __init__(self):
+            self.submitted = []
+
+        def submit(self, kind, func, *args, on_done=None):
+            self.submitted.append((kind, args))
+            return type("Job", (), {"id": "abc12345"})()
+
+        def get(self, job_id):
+            return None
+
+    # skip the Pandoc check in __init__
+    agent = FileConversionAgent.__new__(FileConversionAgent)
+    agent.jobs = FakeJobs()
+
+    async def notify(text):
+        pass
+
+    reply = await agent.submit(f"Convert {src} to docx", notify)
+    assert reply == f"⏳ Conversion job abc12345 queued: '{src}' → docx"
+    assert agent.jobs.submitted == [("pandoc", (str(src), "docx"))]
+    assert await agent.submit("Convert missing.pdf to docx", notify) == "⚠️ File not found: missing.pdf"
+    assert await agent.submit("status nope", notify) == "⚠️ Unknown conversion job: nope"
@@ -0,0 +1,97 @@
+# app/llm/tests/test_idempotency.py
+
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.orchestration.idempotency import UpdateDeduplicator
+
+class BrokenRedis:
+    async def set(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+    async def delete(self, *args):
+        raise ConnectionError("redis down")
+
+@pytest.mark.asyncio
+async def test_redelivered_update_is_suppressed():
+    dedup = UpdateDeduplicator(fakeredis.FakeAsyncRedis(decode_responses=True))
+    assert await dedup.claim(1001) is True
+    assert await dedup.claim(1001) is False
+    assert await dedup.claim(1002) is True
+    stats = dedup.stats()
+    assert stats["accepted"] == 2
+    assert stats["duplicates"] == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_deliveries_accept_exactly_one():
+    dedup = UpdateDeduplicator(fakeredis.FakeAsyncRedis(decode_responses=True))
+    results = await asyncio.gather(*(dedup.claim(7) for _ in range(5)))
+    assert results.count(True) == 1
+    assert dedup.duplicates == 4
+
+@pytest.mark.asyncio
+async def test_redis_catches_ids_this_process_never_saw():
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    first = UpdateDeduplicator(redis, key_prefix="u:")
+    assert await first.claim(42)
+    assert await redis.ttl("u:42") > 0
+
+    # another worker (or this one after a restart) with an empty local set
+    second = UpdateDeduplicator(redis, key_prefix="u:")
+    assert await second.claim(42) is False
+    assert second.stats()["redis_duplicates"] == 1
+
+@pytest.mark.asyncio
+async def test_local_set_is_bounded():
+    dedup = UpdateDeduplicator(capacity=2)
+    for update_id in (1, 2, 3):
+        assert await dedup.claim(update_id)
+    assert dedup.stats()["size"] == 2
+    # without Redis, the oldest id has been forgotten
+    assert await dedup.claim(1) is True
+    assert await dedup.claim(3) is False
+
+@pytest.mark.asyncio
+async def test_release_lets_the_redelivery_through():
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    dedup = UpdateDeduplicator(redis)
+    assert await dedup.claim(5)
+    await dedup.release(5)
+    assert await dedup.claim(5) is True
+
+@pytest.mark.asyncio
+async def test_redis_failure_fails_open():
+    dedup = UpdateDeduplicator(BrokenRedis())
+    assert await dedup.claim(9) is True
+    # the local tier still catches the quick redelivery
+    assert await dedup.claim(9) is False
+    await dedup.release(9)
+    assert dedup.stats()["redis_errors"] == 2
+
+@pytest.mark.asyncio
+async def test_from_settings_reuses_a_shared_client_and_closes_only_its_own(monkeypatch):
+    import types
+    from redis.asyncio import Redis
+
+    settings = types.SimpleNamespace(
+        WEBHOOK_DEDUP_REDIS=True, REDIS_URL="redis://localhost:6379/0", WEBHOOK_DEDUP_CAPACITY=10,
+        WEBHOOK_DEDUP_TTL=60.0, WEBHOOK_DEDUP_KEY_PREFIX="u:",
+    )
+    shared = fakeredis.FakeAsyncRedis(decode_responses=True)
+    dedup = UpdateDeduplicator.from_settings(settings, redis=shared)
+    assert dedup.redis is shared
+    await dedup.aclose()
+    assert await shared.ping()  # still usable by its owner
+
+    closed = []
+    own = fakeredis.FakeAsyncRedis(decode_responses=True)
+    async def aclose():
+        closed.append(True)
+    own.aclose = aclose
+    monkeypatch.setattr(Redis, "from_url", classmethod(lambda cls, url, **kwargs: own))
+    dedup = UpdateDeduplicator.from_settings(settings)
+    assert dedup.redis is own
+    await dedup.aclose()
+    assert closed == [True]
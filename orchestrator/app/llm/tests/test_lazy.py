@@ -0,0 +1,94 @@
+# app/llm/tests/test_lazy.py
+
+import threading
+import time
+
+import pytest
+
+from app.orchestration.lazy import Lazy, LazyAgent, resolve, warmup
+
+class Agent:
+    def __init__(self):
+        self.thread = threading.current_thread().name
+
+    def run(self, query):
+        return f"ran {query}"
+
+def test_component_is_built_on_first_use_only():
+    built = []
+    lazy = Lazy("agent", lambda: built.append(1) or Agent())
+    assert not built and not lazy.ready
+
+    assert lazy.get().run("q") == "ran q"
+    assert lazy.get().run("again") == "ran again"
+    assert built == [1]
+    assert lazy.status()["ready"] and lazy.status()["init_seconds"] >= 0
+
+def test_attribute_access_never_builds():
+    built = []
+    lazy = Lazy("agent", lambda: built.append(1) or Agent())
+    with pytest.raises(RuntimeError, match="aget"):
+        lazy.run("q")
+    assert not built and not hasattr(lazy, "__len__")
+
+    lazy.get()
+    assert lazy.run("q") == "ran q"
+
+def test_failed_build_is_recorded_and_retried():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("pinecone down")
+        return Agent()
+
+    lazy = Lazy("agent", factory)
+    with pytest.raises(ConnectionError):
+        lazy.get()
+    assert lazy.status() == {"ready": False, "init_seconds": None, "error": "ConnectionError: pinecone down"}
+
+    assert lazy.get().run("q") == "ran q"
+    assert lazy.error is None
+
+@pytest.mark.asyncio
+async def test_lazy_agent_builds_off_the_event_loop():
+    agent = LazyAgent("agent", Agent)
+    assert await agent.run("q") == "ran q"
+    assert agent.get().thread != threading.current_thread().name
+
+    # agents without astream() stream their whole answer as one chunk
+    assert [c async for c in agent.astream("q")] == ["ran q"]
+
+@pytest.mark.asyncio
+async def test_resolve_builds_off_the_event_loop():
+    lazy = Lazy("agent", Agent)
+    agent = await resolve(lazy)
+    assert agent is lazy.get()
+    assert agent.thread != threading.current_thread().name
+    plain = Agent()
+    assert await resolve(plain) is plain
+
+@pytest.mark.asyncio
+async def test_warmup_builds_in_parallel_and_reports_status():
+    def slow():
+        time.sleep(0.2)
+        return Agent()
+
+    def broken():
+        raise RuntimeError("no pandoc")
+
+    parts = [Lazy("a", slow), Lazy("b", slow), Lazy("c", broken)]
+    start = time.perf_counter()
+    status = await warmup(parts)
+
+    assert time.perf_counter() - start < 0.35
+    assert status["a"]["ready"] and status["b"]["ready"]
+    assert status["c"] == {"ready": False, "init_seconds": None, "error": "RuntimeError: no pandoc"}
+
+@pytest.mark.asyncio
+async def test_warmup_timeout_is_reported():
+    part = Lazy("slow", lambda: time.sleep(0.3) or Agent())
+    status = await warmup([part], timeout=0.05)
+    assert status["slow"]["ready"] is False
+    assert "timed out" in status["slow"]["error"]
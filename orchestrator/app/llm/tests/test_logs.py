@@ -0,0 +1,64 @@
+# app/llm/tests/test_logs.py
+
+import io
+import logging
+import threading
+
+import pytest
+
+from app.core.logs import LogPipeline
+from app.core.tracing import trace
+
+@pytest.fixture
+def root_handlers():
+    # LogPipeline.start() takes over the root logger; put pytest's handlers back
+    root = logging.getLogger()
+    saved, level = root.handlers[:], root.level
+    yield
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in saved:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+def test_records_are_written_by_the_background_thread(root_handlers):
+    stream = io.StringIO()
+    writers = []
+
+    class Recording(io.StringIO):
+        def write(self, text):
+            writers.append(threading.current_thread().name)
+            return stream.write(text)
+
+    pipeline = LogPipeline(level="info", fmt="%(levelname)s [%(trace_id)s] %(message)s", stream=Recording())
+    pipeline.start()
+    log = logging.getLogger("test_logs.bg")
+    log.debug("hidden")
+    with trace("t-1"):
+        log.info("hello %s", "world")
+    try:
+        raise ValueError("bad")
+    except ValueError:
+        log.exception("failed")
+    pipeline.stop()
+    pipeline.stop()  # idempotent
+
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == "INFO [t-1] hello world"
+    assert lines[1] == "ERROR [-] failed"
+    assert "ValueError: bad" in stream.getvalue()
+    assert "hidden" not in stream.getvalue()
+    assert writers and threading.main_thread().name not in writers
+    assert pipeline.stats()["running"] is False
+
+def test_full_queue_drops_instead_of_blocking(root_handlers):
+    pipeline = LogPipeline(queue_size=3, stream=io.StringIO())
+    pipeline.start()
+    pipeline.listener.stop()  # writer paused: nothing drains the queue
+    pipeline._running = False
+    log = logging.getLogger("test_logs.full")
+    for i in range(10):
+        log.warning("line %d", i)
+    stats = pipeline.stats()
+    assert stats["queued"] == 3
+    assert stats["dropped"] == 7
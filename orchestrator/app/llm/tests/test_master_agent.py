@@ -1,4 +1,4 @@
-# app/orchestration/tests/test_master_agent.py
+# app/llm/tests/test_master_agent.py
 
 import pytest
 
@@ -8,6 +8,9 @@ class DummyLLM:
     def generate(self, prompt, **kwargs):
         return "dummy response"
 
+    async def agenerate(self, prompt, **kwargs):
+        return "dummy response"
+
 @pytest.fixture
 def master():
     return MasterAgent(llm_client=DummyLLM())
@@ -47,3 +50,43 @@ async def test_run_routes_and_invokes(monkeypatch, master):
     assert reply == "FAKE_RESULT"
     # ensure the agent got the right query
     assert list(master.registry["fake"].called_with for _ in [None])[0] == "anything"
+
+@pytest.mark.asyncio
+async def test_brief_runs_research_then_draft(monkeypatch, master):
+    class Agent:
+        def __init__(self, reply):
+            self.reply = reply
+        async def run(self, q):
+            return self.reply
+
+    monkeypatch.setitem(master.registry, "case_law_scholar", Agent("research"))
+    monkeypatch.setitem(master.registry, "memo_drafter", Agent("the memo"))
+
+    update = {"message": {"text": "/brief Water rights: allocation; enforcement", "chat": {"id": 1}}}
+    key, reply = await master.handle(update)
+    assert key == "research_memo"
+    assert reply == "the memo"
+    assert master.plans.stats()["steps"]["ok"] == 3
+
+@pytest.mark.asyncio
+async def test_generic_fallback_builds_a_lazy_client_off_the_loop(monkeypatch):
+    import threading
+    from app.orchestration.lazy import Lazy
+
+    class ModelLLM(DummyLLM):
+        default_model = "gpt-test"
+
+    built_on = []
+    llm = Lazy("llm_client", lambda: built_on.append(threading.current_thread()) or ModelLLM())
+    master = MasterAgent(llm_client=llm, record_turns=False)
+    models = []
+
+    async def build(chat_id, system_prompt, query, model=None):
+        models.append(model)
+        return [system_prompt]
+
+    monkeypatch.setattr(master.context, "build", build)
+    update = {"message": {"text": "What's the weather like?", "chat": {"id": 7}}}
+    assert await master.run(update) == "dummy response"
+    assert built_on and built_on[0] is not threading.main_thread()
+    assert models == ["gpt-test"]
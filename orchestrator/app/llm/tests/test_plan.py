@@ -0,0 +1,106 @@
+# app/llm/tests/test_plan.py
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.orchestration.plan import PlanExecutor, Step, parse_brief, research_memo_plan, validate
+
+def step(name, value=None, after=(), delay=0.0, error=None, **kwargs):
+    async def run(upstream):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return value if value is not None else (name, upstream)
+    return Step(name, run, after=tuple(after), **kwargs)
+
+def test_validate_rejects_cycles_and_unknown_deps():
+    with pytest.raises(ValueError, match="cycle"):
+        validate([step("a", after=["b"]), step("b", after=["a"])])
+    with pytest.raises(ValueError, match="unknown"):
+        validate([step("a", after=["missing"])])
+    with pytest.raises(ValueError, match="Duplicate"):
+        validate([step("a"), step("a")])
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently_under_cap():
+    executor = PlanExecutor(concurrency=2)
+    steps = [step(f"r{i}", i, delay=0.05) for i in range(4)]
+    steps.append(step("join", after=[s.name for s in steps]))
+    result = await executor.run(steps)
+
+    # four 50ms steps, two at a time → ~100ms, not 200ms
+    assert result.seconds < 0.18
+    name, upstream = result["join"].value
+    assert upstream == {"r0": 0, "r1": 1, "r2": 2, "r3": 3}
+    assert set(result.timings()) == {"r0", "r1", "r2", "r3", "join"}
+
+@pytest.mark.asyncio
+async def test_timeout_and_failure_handling():
+    executor = PlanExecutor(step_timeout=0.05)
+    result = await executor.run([
+        step("slow", delay=1.0),
+        step("broken", error=RuntimeError("boom"), required=False),
+        step("fine", "ok"),
+        step("needs_slow", after=["slow"]),
+        step("tolerant", after=["broken", "fine"]),
+    ])
+    assert result["slow"].status == "timeout"
+    assert result["broken"].status == "failed" and "boom" in result["broken"].error
+    assert result["needs_slow"].status == "skipped"
+    # optional upstream failures just leave their result out
+    assert result["tolerant"].value == ("tolerant", {"fine": "ok"})
+    assert executor.stats()["steps"] == {"ok": 2, "failed": 1, "timeout": 1, "skipped": 1}
+
+def test_parse_brief():
+    assert parse_brief("Gaming compacts: IGRA remedies; state taxation to DOCX") == (
+        "Gaming compacts", ["IGRA remedies", "state taxation"], "docx")
+    assert parse_brief("The right to vote") == ("The right to vote", ["The right to vote"], None)
+
+class FakeAgent:
+    def __init__(self, reply, fail_on=()):
+        self.reply, self.fail_on, self.queries = reply, fail_on, []
+
+    async def run(self, query):
+        self.queries.append(query)
+        if any(f in query for f in self.fail_on):
+            raise ConnectionError("index down")
+        return self.reply(query)
+
+    async def aconvert(self, src, fmt):
+        if fmt == "pdf":
+            return "⚠️ no converter"
+        Path(src).with_suffix(f".{fmt}").write_text(Path(src).read_text().lower())
+        return f"converted {src} to {fmt}"
+
+@pytest.mark.asyncio
+async def test_research_memo_plan_end_to_end(tmp_path):
+    research = FakeAgent(lambda q: f"findings on {q}", fail_on=("taxation",))
+    memo = FakeAgent(lambda q: "MEMO")
+    registry = {"case_law_scholar": research, "memo_drafter": memo, "file_conversion": FakeAgent(None)}
+
+    sent = []
+
+    async def send_file(path):
+        sent.append((Path(path).name, Path(path).read_text()))
+
+    steps = research_memo_plan(registry, "Compacts: IGRA remedies; state taxation to docx", str(tmp_path), send_file)
+    result = await PlanExecutor().run(steps)
+
+    assert result["research_2"].status == "failed"
+    assert result["draft"].value == "MEMO"
+    assert "findings on IGRA remedies" in memo.queries[0]
+    assert "taxation" not in memo.queries[0]
+    # the document itself reaches the chat, and nothing is left on disk
+    assert sent == [("compacts.docx", "memo")]
+    assert result["convert"].value == "📎 Sent compacts.docx"
+    assert list(tmp_path.iterdir()) == []
+
+    failed = await PlanExecutor().run(research_memo_plan(registry, "Compacts to pdf", str(tmp_path), send_file))
+    assert failed["convert"].status == "failed" and "no converter" in failed["convert"].error
+    assert list(tmp_path.iterdir()) == [] and len(sent) == 1
+
+    # no way to deliver a document: nothing is rendered
+    steps = research_memo_plan(registry, "Compacts to docx", str(tmp_path))
+    assert [s.name for s in steps] == ["research_1", "draft"]
@@ -0,0 +1,83 @@
+# app/llm/tests/test_postprocess.py
+
+import asyncio
+
+import pytest
+
+from app.orchestration.postprocess import FollowUp, PostProcessor
+
+def make_followup(name, delay, sent, payload="x", timeout=1.0):
+    async def produce():
+        await asyncio.sleep(delay)
+        return payload
+
+    async def deliver(value):
+        sent.append((name, value))
+
+    return FollowUp(name, produce, deliver, timeout=timeout)
+
+@pytest.mark.asyncio
+async def test_followups_run_concurrently_in_background():
+    sent = []
+    post = PostProcessor()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    post.schedule(1, [make_followup("a", 0.1, sent), make_followup("b", 0.1, sent)])
+
+    # schedule() returns before anything is delivered
+    assert sent == []
+    assert post.pending(1) == 2
+
+    await post.aclose(timeout=2)
+    assert sorted(sent) == [("a", "x"), ("b", "x")]
+    assert loop.time() - start < 0.19
+    stats = post.stats()
+    assert stats["a"]["delivered"] == 1
+    assert stats["a"]["avg_latency_s"] >= 0.1
+    assert stats["pending"] == 0
+
+@pytest.mark.asyncio
+async def test_timeout_and_skip_are_counted():
+    sent = []
+    post = PostProcessor()
+    post.schedule(1, [
+        make_followup("slow", 1.0, sent, timeout=0.05),
+        make_followup("empty", 0, sent, payload=None),
+    ])
+    await post.aclose(timeout=2)
+
+    assert sent == []
+    stats = post.stats()
+    assert stats["slow"]["timeout"] == 1
+    assert stats["empty"]["skipped"] == 1
+
+@pytest.mark.asyncio
+async def test_cancel_only_touches_one_chat():
+    sent = []
+    post = PostProcessor()
+    post.schedule(1, [make_followup("tts", 0.2, sent)])
+    post.schedule(2, [make_followup("tts", 0.05, sent)])
+    await asyncio.sleep(0)
+
+    assert post.cancel(1) == 1
+    await post.aclose(timeout=2)
+
+    assert sent == [("tts", "x")]
+    assert post.stats()["tts"]["cancelled"] == 1
+
+@pytest.mark.asyncio
+async def test_failures_are_isolated():
+    sent = []
+
+    async def boom():
+        raise RuntimeError("llm down")
+
+    async def deliver(value):
+        sent.append(value)
+
+    post = PostProcessor()
+    post.schedule(1, [FollowUp("bad", boom, deliver), make_followup("good", 0, sent)])
+    await post.aclose(timeout=2)
+
+    assert sent == [("good", "x")]
+    assert post.stats()["bad"]["failed"] == 1
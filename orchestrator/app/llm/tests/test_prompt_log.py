@@ -0,0 +1,79 @@
+# app/llm/tests/test_prompt_log.py
+
+import logging
+import random
+import types
+
+import pytest
+
+from app.llm.clients import LLMClient
+from app.llm.prompt_log import PromptLogPolicy, fingerprint, redact_emails, redact_numbers
+
+SYSTEM = "You are the MasterAgent of the Digital Chambers. " * 40
+
+def test_static_prefix_is_logged_as_its_fingerprint():
+    policy = PromptLogPolicy(prefixes=[SYSTEM])
+    prompt = f"{SYSTEM.strip()}\n\nUSER: hello\n\nWhat is tribal sovereignty?"
+    out = policy.render(prompt)
+    assert out.startswith(f"[system {fingerprint(SYSTEM.strip())}] ")
+    assert "MasterAgent" not in out
+    assert "'USER: hello\\n\\nWhat is tribal sovereignty?'" in out
+    # other prompts are untouched
+    assert policy.render("short") == "'short'"
+
+def test_truncation_and_fingerprint_only_modes():
+    policy = PromptLogPolicy(max_chars=10)
+    assert policy.render("abcdefghijklmnop") == "'abcdefghij' …(+6 chars)"
+    assert policy.render("abcdefghijklmnop", sampled=False) == f"[text {fingerprint('abcdefghijklmnop')}]"
+    assert PromptLogPolicy(max_chars=0).render("secret").startswith("[text sha1:")
+
+def test_redaction_sees_past_the_cut():
+    assert redact_emails("mail jane.doe@example.org now") == "mail <email> now"
+    assert redact_numbers("call +1 (555) 123-4567 or 4111 1111 1111 1111") == "call <number> or <number>"
+    assert redact_numbers("case 12 of 2024") == "case 12 of 2024"
+
+    policy = PromptLogPolicy(max_chars=12, redactors=[redact_emails])
+    # the address straddles the cut: it must not leak half of it
+    assert policy.render("write to jane.doe@example.org please") == "'write to <em' …(+24 chars)"
+
+    policy.add_redactor(lambda text: text.replace("Smith", "<name>"))
+    assert "Smith" not in PromptLogPolicy(redactors=policy.redactors).render("Mr Smith")
+
+def test_sampling_is_per_call_and_seedable():
+    policy = PromptLogPolicy(sample_rate=0.25, rng=random.Random(3))
+    picks = [policy.sampled() for _ in range(2000)]
+    assert 400 < sum(picks) < 600
+    assert all(PromptLogPolicy(sample_rate=1.0).sampled() for _ in range(10))
+    with pytest.raises(ValueError):
+        PromptLogPolicy(sample_rate=1.5)
+
+def test_from_settings():
+    settings = types.SimpleNamespace(
+        LLM_LOG_MAX_CHARS=50, LLM_LOG_SAMPLE_RATE=0.5, LLM_LOG_REDACT="email", MASTER_PROMPT=SYSTEM,
+    )
+    policy = PromptLogPolicy.from_settings(settings)
+    assert (policy.max_chars, policy.sample_rate, policy.redactors) == (50, 0.5, [redact_emails])
+    assert policy.render(SYSTEM).startswith("[system ")
+    with pytest.raises(ValueError, match="LLM_LOG_REDACT"):
+        PromptLogPolicy.from_settings(types.SimpleNamespace(LLM_LOG_REDACT="email,ssn"))
+
+@pytest.mark.asyncio
+async def test_llm_client_logs_only_what_the_policy_allows(caplog):
+    client = LLMClient(types.SimpleNamespace(
+        LLM_BACKEND="fake", FAKE_LATENCY_MS=0.0, FAKE_TOKENS_PER_S=0.0, FAKE_SEED=1,
+        LLM_LOG_MAX_CHARS=40, MASTER_PROMPT=SYSTEM,
+    ))
+    caplog.set_level(logging.INFO, logger="app.llm.clients")
+    history = ["USER: my email is jane@example.org", "BOT: noted"]
+    await client.agenerate("what now?", context=[SYSTEM, *history], cache=False)
+
+    start, done = [r.getMessage() for r in caplog.records if r.name == "app.llm.clients"]
+    assert start.startswith("LLMClient.agenerate start: backend='fake' prompt=[system sha1:")
+    assert "MasterAgent" not in start and "jane@example.org" not in start
+    assert "<email>" in start and len(start) < 250
+    assert done.startswith("LLMClient.agenerate completed in ")
+
+    caplog.clear()
+    caplog.set_level(logging.WARNING, logger="app.llm.clients")
+    await client.agenerate("quiet", cache=False)
+    assert not caplog.records
@@ -0,0 +1,49 @@
+# app/llm/tests/test_router.py
+
+import pytest
+
+from app.orchestration.router import ROUTER, IntentRouter, Route
+from benchmarks.bench_intent_router import evaluate, legacy_classify, load_corpus
+
+@pytest.mark.parametrize("text", [
+    "Our showcase went really well",
+    "I need to mow the lawn",
+    "He is an outlaw",
+    "my laptop case is broken",
+])
+def test_word_boundaries_and_weak_words_fall_back_to_generic(text):
+    assert ROUTER.classify(text) == "generic"
+
+@pytest.mark.parametrize("text,expected", [
+    ("What do the laws on tribal land say?", "case_law_scholar"),
+    ("Find CASE   LAW on treaty rights", "case_law_scholar"),
+    ("Drafted memos for the council", "memo_drafter"),
+    ("convert report.pdf to docx", "file_conversion"),
+    ("reminding you to schedule the hearing", "n8n_scheduler"),
+])
+def test_inflections_and_phrases(text, expected):
+    assert ROUTER.classify(text) == expected
+
+def test_priority_breaks_ties():
+    router = IntentRouter([
+        Route("low", priority=0, keywords={"alpha": 2.0}),
+        Route("high", priority=5, keywords={"beta": 2.0}),
+    ])
+    assert router.classify("alpha beta") == "high"
+
+def test_slash_aliases_resolve_through_the_table():
+    assert ROUTER.resolve_command("precedent") == "case_law_scholar"
+    assert ROUTER.resolve_command("Memo@SelahBot") == "memo_drafter"
+    assert ROUTER.resolve_command("pdf_to_docx") == "file_conversion"
+    assert ROUTER.resolve_command("nope") is None
+
+def test_duplicate_alias_is_rejected():
+    with pytest.raises(ValueError):
+        IntentRouter([Route("a", aliases=["x"]), Route("b", aliases=["x"])])
+
+def test_router_beats_legacy_on_labelled_corpus():
+    corpus = load_corpus()
+    router_accuracy, _ = evaluate(ROUTER.classify, corpus)
+    legacy_accuracy, _ = evaluate(legacy_classify, corpus)
+    assert router_accuracy >= 0.9
+    assert router_accuracy > legacy_accuracy
@@ -0,0 +1,99 @@
+# app/llm/tests/test_semantic_cache.py
+
+import numpy as np
+import pytest
+
+from app.agents.case_law_scholar.case_law_agent import CaseLawScholarAgent
+from app.agents.memory.semantic_cache import SemanticCache
+from app.llm.embeddings import HashingEmbedder
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_embedder_is_deterministic_and_normalised():
+    a, b = HashingEmbedder(dim=64), HashingEmbedder(dim=64)
+    v = a("What is tribal sovereignty?")
+    assert v.dtype == np.float32
+    assert np.array_equal(v, b("What is tribal sovereignty?"))
+    assert np.isclose(np.linalg.norm(v), 1.0)
+    assert not HashingEmbedder()("the of is").any()
+
+def test_paraphrase_hits_and_unrelated_misses():
+    cache = SemanticCache(threshold=0.85)
+    cache.store("What is tribal sovereignty?", "ANSWER")
+
+    assert cache.lookup("explain tribal sovereignty") == "ANSWER"
+    assert cache.lookup("What is tribal law?") is None
+    assert cache.lookup("draft a memo on quarterly earnings") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+def test_swapped_roles_and_negations_miss():
+    cache = SemanticCache(threshold=0.85)
+    cache.store("Can the tribe sue the state?", "YES")
+    cache.store("Does the state have jurisdiction over tribal land?", "NO")
+
+    # identical or near-identical embeddings, opposite questions
+    embed = HashingEmbedder()
+    assert float(embed("Can the tribe sue the state?") @ embed("Can the state sue the tribe?")) > 0.99
+    assert cache.lookup("Can the state sue the tribe?") is None
+    assert cache.lookup("Does the state not have jurisdiction over tribal land?") is None
+    # the same question, reworded, still hits
+    assert cache.lookup("can tribe sue state") == "YES"
+    assert cache.stats()["hits"] == 1
+
+def test_disabled_by_default():
+    import types
+    assert SemanticCache.from_settings(types.SimpleNamespace()) is None
+    assert isinstance(SemanticCache.from_settings(types.SimpleNamespace(SEMANTIC_CACHE_ENABLED=True)), SemanticCache)
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = SemanticCache(ttl=60, clock=clock)
+    cache.store("tribal sovereignty", "A")
+    clock.now = 59
+    assert cache.lookup("tribal sovereignty") == "A"
+    clock.now = 60
+    assert cache.lookup("tribal sovereignty") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+def test_full_cache_evicts_least_recently_used():
+    clock = FakeClock()
+    cache = SemanticCache(capacity=2, clock=clock)
+    cache.store("tribal sovereignty", "A")
+    clock.now = 1
+    cache.store("quarterly earnings memo", "B")
+    clock.now = 2
+    assert cache.lookup("tribal sovereignty") == "A"   # B is now the LRU entry
+    clock.now = 3
+    cache.store("hiring policy", "C")
+
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+    assert cache.lookup("quarterly earnings memo") is None
+    assert cache.lookup("tribal sovereignty") == "A"
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def agenerate(self, prompt, **kwargs):
+        self.calls += 1
+        return f"answer {self.calls}"
+
+@pytest.mark.asyncio
+async def test_case_law_agent_answers_paraphrase_from_cache():
+    # skip the Pinecone setup in __init__
+    agent = CaseLawScholarAgent.__new__(CaseLawScholarAgent)
+    agent.llm = CountingLLM()
+    agent.semantic_cache = SemanticCache()
+
+    assert await agent.run("What is tribal sovereignty?") == "answer 1"
+    assert await agent.run("explain tribal sovereignty") == "answer 1"
+    assert await agent.run("What is tribal law?") == "answer 2"
+    assert agent.llm.calls == 2
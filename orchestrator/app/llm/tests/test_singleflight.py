@@ -0,0 +1,201 @@
+# app/llm/tests/test_singleflight.py
+
+import asyncio
+import sys
+import threading
+import types
+
+import pytest
+
+from app.llm.clients import LLMClient
+from app.llm.singleflight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "answer"
+
+    waiters = [asyncio.create_task(flight.do("k", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == ["answer"] * 5
+    assert calls == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4, "abandoned": 0}
+
+    # finished calls are forgotten: the next one is a new call
+    assert await flight.do("k", fetch) == "answer"
+    assert calls == 2
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fail():
+        await release.wait()
+        raise RuntimeError("rate limited")
+
+    waiters = [asyncio.create_task(flight.do("k", fail)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.stats()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_leader_cancellation_does_not_cancel_followers():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "answer"
+
+    leader = asyncio.create_task(flight.do("k", fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("k", fetch))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await follower == "answer"
+    assert leader.cancelled()
+    assert flight.abandoned == 0
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_once_every_waiter_is_gone():
+    flight = SingleFlight()
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def fetch():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiters = [asyncio.create_task(flight.do("k", fetch)) for _ in range(2)]
+    await started.wait()
+    for w in waiters:
+        w.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flight.stats()["abandoned"] == 1
+
+    # a new caller starts a fresh call rather than joining the cancelled one
+    async def quick():
+        return "fresh"
+    assert await flight.do("k", quick) == "fresh"
+
+@pytest.mark.asyncio
+async def test_stream_fans_out_every_chunk():
+    flight = SingleFlight()
+    calls = 0
+    step = asyncio.Event()
+
+    async def source():
+        nonlocal calls
+        calls += 1
+        for piece in ["a", "b", "c"]:
+            yield piece
+            await step.wait()
+
+    async def collect():
+        return [c async for c in flight.stream("k", source)]
+
+    first = asyncio.create_task(collect())
+    await asyncio.sleep(0.01)
+    # joins after "a" was produced and still sees it
+    second = asyncio.create_task(collect())
+    await asyncio.sleep(0)
+    step.set()
+    assert await first == await second == ["a", "b", "c"]
+    assert calls == 1
+    assert flight.coalesced == 1
+
+def test_do_sync_coalesces_threads():
+    flight = SingleFlight()
+    calls = []
+    entered, release = threading.Event(), threading.Event()
+
+    def fetch():
+        calls.append(1)
+        entered.set()
+        release.wait(1)
+        return "answer"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do_sync("k", fetch)))
+    leader.start()
+    entered.wait(1)
+    follower = threading.Thread(target=lambda: results.append(flight.do_sync("k", fetch)))
+    follower.start()
+    while not flight.coalesced:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+    assert results == ["answer", "answer"]
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_agenerate_coalesces_identical_openai_calls(monkeypatch):
+    calls = []
+
+    class SlowAsyncOpenAI:
+        def __init__(self, api_key, **kwargs):
+            async def create(*, model, messages, **kwargs):
+                calls.append(kwargs)
+                await asyncio.sleep(0.01)
+                return types.SimpleNamespace(
+                    choices=[types.SimpleNamespace(message=types.SimpleNamespace(content="shared"))]
+                )
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=create))
+
+    mod = types.ModuleType("openai")
+    mod.OpenAI = lambda **kwargs: None
+    mod.AsyncOpenAI = SlowAsyncOpenAI
+    monkeypatch.setitem(sys.modules, "openai", mod)
+    client = LLMClient(types.SimpleNamespace(
+        LLM_BACKEND="openai", OPENAI_API_KEY="k", LLM_CACHE_ENABLED=False,
+    ))
+
+    answers = await asyncio.gather(*(client.agenerate("viral?", max_tokens=5) for _ in range(4)))
+    assert answers == ["shared"] * 4
+    assert len(calls) == 1
+    assert client.flight.stats()["coalesced"] == 3
+
+    # calls that should vary are never coalesced
+    await asyncio.gather(*(client.agenerate("witty", cache=False) for _ in range(2)))
+    assert len(calls) == 3
+
+@pytest.mark.asyncio
+async def test_agenerate_coalesces_identical_llama_calls(monkeypatch):
+    import time
+    calls = []
+
+    def pipeline(task, model, device):
+        def gen(prompt, **kwargs):
+            calls.append(prompt)
+            time.sleep(0.02)
+            return [{"generated_text": "llama"}]
+        return gen
+
+    mod = types.ModuleType("transformers")
+    mod.pipeline = pipeline
+    monkeypatch.setitem(sys.modules, "transformers", mod)
+    client = LLMClient(types.SimpleNamespace(
+        LLM_BACKEND="llama", LLAMA_MODEL_PATH="p", LLM_EXECUTOR_WORKERS=4,
+    ))
+
+    answers = await asyncio.gather(*(client.agenerate("same") for _ in range(3)))
+    assert answers == ["llama"] * 3
+    assert calls == ["same"]
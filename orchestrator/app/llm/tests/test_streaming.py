@@ -0,0 +1,95 @@
+# app/llm/tests/test_streaming.py
+
+import types
+
+import pytest
+from telegram.error import RetryAfter
+
+from app.orchestration.streaming import TelegramStreamer
+
+class FakeBot:
+    def __init__(self):
+        self.messages = {}
+        self.calls = []
+        self._next_id = 100
+        self.throttle_next_edit = False
+
+    async def send_message(self, chat_id, text):
+        self._next_id += 1
+        self.messages[self._next_id] = text
+        self.calls.append(("send", self._next_id, text))
+        return types.SimpleNamespace(message_id=self._next_id)
+
+    async def edit_message_text(self, text, chat_id, message_id):
+        if self.throttle_next_edit:
+            self.throttle_next_edit = False
+            raise RetryAfter(0)
+        self.messages[message_id] = text
+        self.calls.append(("edit", message_id, text))
+
+    async def delete_message(self, chat_id, message_id):
+        del self.messages[message_id]
+        self.calls.append(("delete", message_id, None))
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+async def chunks_with_clock(clock, chunks, step):
+    for chunk in chunks:
+        clock.now += step
+        yield chunk
+
+@pytest.mark.asyncio
+async def test_placeholder_then_throttled_edits():
+    bot, clock = FakeBot(), FakeClock()
+    streamer = TelegramStreamer(bot, 1, edit_interval=1.0, clock=clock)
+
+    text = await streamer.consume(chunks_with_clock(clock, ["a", "b", "c", "d", "e"], 0.4))
+
+    assert text == "abcde"
+    assert bot.calls[0] == ("send", 101, "…")
+    # 5 chunks over 2s with a 1s interval: two throttled edits plus the final one
+    assert [c[2] for c in bot.calls[1:]] == ["abc", "abcde"]
+    assert bot.messages == {101: "abcde"}
+
+@pytest.mark.asyncio
+async def test_long_reply_rolls_over_on_word_boundary():
+    bot, clock = FakeBot(), FakeClock()
+    streamer = TelegramStreamer(bot, 1, max_len=24, clock=clock)
+
+    words = ["word%02d " % i for i in range(8)]  # 7 chars each, 56 total
+    text = await streamer.consume(chunks_with_clock(clock, words, 0.0))
+
+    assert text == "".join(words)
+    assert len(streamer.message_ids) == 3
+    shown = [bot.messages[i] for i in streamer.message_ids]
+    assert all(len(part) <= 24 for part in shown)
+    assert "".join(shown) == text
+    assert shown[0] == "word00 word01 word02 "
+
+@pytest.mark.asyncio
+async def test_final_edit_retries_after_throttling():
+    bot, clock = FakeBot(), FakeClock()
+    streamer = TelegramStreamer(bot, 1, clock=clock)
+    bot.throttle_next_edit = True
+
+    await streamer.consume(chunks_with_clock(clock, ["hello"], 0.0))
+    assert bot.messages[streamer.message_ids[0]] == "hello"
+
+@pytest.mark.asyncio
+async def test_empty_stream_deletes_placeholder():
+    bot = FakeBot()
+    streamer = TelegramStreamer(bot, 1)
+
+    async def failing():
+        raise RuntimeError("llm down")
+        yield  # pragma: no cover
+
+    with pytest.raises(RuntimeError):
+        await streamer.consume(failing())
+    assert bot.messages == {}
+    assert not streamer.started
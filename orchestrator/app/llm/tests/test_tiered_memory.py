@@ -0,0 +1,116 @@
+# app/llm/tests/test_tiered_memory.py
+
+import fakeredis
+import pytest
+
+from app.agents.memory.buffer_memory import BufferMemory
+from app.agents.memory.tiered_memory import TieredMemory
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+class SwitchableRedis(fakeredis.FakeAsyncRedis):
+    down = False
+
+    async def lrange(self, *args, **kwargs):
+        if self.down:
+            raise ConnectionError("redis down")
+        return await super().lrange(*args, **kwargs)
+
+    def pipeline(self, *args, **kwargs):
+        pipe = super().pipeline(*args, **kwargs)
+        if self.down:
+            async def execute(*a, **k):
+                raise ConnectionError("redis down")
+            pipe.execute = execute
+        return pipe
+
+@pytest.fixture
+def redis():
+    return SwitchableRedis(decode_responses=True)
+
+def tiered(redis, **kwargs):
+    return TieredMemory(BufferMemory(redis, write_behind=False), **kwargs)
+
+@pytest.mark.asyncio
+async def test_reads_through_once_then_serves_locally(redis):
+    memory = tiered(redis)
+    await BufferMemory(redis, write_behind=False).add_turn(1, "hi", "hello")
+
+    assert await memory.get_history(1) == ["USER: hi", "BOT: hello"]
+    trips = memory.remote.round_trips
+    assert await memory.get_history(1) == ["USER: hi", "BOT: hello"]
+    assert memory.remote.round_trips == trips
+    assert memory.stats()["hit_rate"] == 0.5
+
+@pytest.mark.asyncio
+async def test_writes_go_through_to_both_tiers(redis):
+    memory = tiered(redis)
+    await memory.get_history(1)
+    await memory.add_turn(1, "q", "a")
+    assert await memory.get_history(1) == ["USER: q", "BOT: a"]
+    assert await BufferMemory(redis).get_history(1) == ["USER: q", "BOT: a"]
+
+@pytest.mark.asyncio
+async def test_capacity_and_idle_eviction(redis):
+    clock = Clock()
+    memory = tiered(redis, capacity=2, idle_ttl=10, clock=clock)
+    for chat in (1, 2, 3):
+        await memory.get_history(chat)
+    assert memory.stats()["chats"] == 2
+    assert memory.evictions == 1
+
+    clock.now = 11
+    await memory.get_history(3)          # miss: everything went idle
+    assert memory.idle_evictions == 2
+    assert memory.stats()["chats"] == 1
+
+@pytest.mark.asyncio
+async def test_history_is_bounded_locally(redis):
+    memory = tiered(redis)
+    memory.maxlen = memory.remote.maxlen = 4
+    await memory.get_history(1)
+    for i in range(5):
+        await memory.add_turn(1, f"q{i}", f"a{i}")
+    assert await memory.get_history(1) == ["USER: q3", "BOT: a3", "USER: q4", "BOT: a4"]
+
+@pytest.mark.asyncio
+async def test_degraded_mode_serves_local_tier(redis):
+    clock = Clock()
+    memory = tiered(redis, retry_after=5, clock=clock)
+    await memory.add_turn(1, "q", "a")
+    await memory.get_history(1)
+
+    redis.down = True
+    await memory.add_turn(1, "q2", "a2")          # Redis write fails → degraded
+    assert memory.degraded
+    trips = memory.remote.round_trips
+    await memory.add_turn(1, "q3", "a3")          # kept locally, Redis not retried
+    assert memory.remote.round_trips == trips
+    assert (await memory.get_history(1))[-2:] == ["USER: q3", "BOT: a3"]
+    assert await memory.get_history(2) == []       # unknown chat, no Redis wait
+    assert memory.degraded_reads == 1
+
+    redis.down = False
+    clock.now = 6
+    assert not memory.degraded
+    await memory.add_turn(1, "q4", "a4")
+    assert (await BufferMemory(redis).get_history(1))[-2:] == ["USER: q4", "BOT: a4"]
+
+@pytest.mark.asyncio
+async def test_write_during_read_through_is_not_lost(redis):
+    memory = tiered(redis)
+    original = memory.remote.load_entries
+
+    async def slow_load(chat_id):
+        entries = await original(chat_id)
+        await memory.add_turn(chat_id, "late", "write")   # lands mid-read
+        return entries
+
+    memory.remote.load_entries = slow_load
+    assert await memory.get_history(1) == []
+    memory.remote.load_entries = original
+    assert await memory.get_history(1) == ["USER: late", "BOT: write"]
@@ -0,0 +1,155 @@
+# app/llm/tests/test_tracing.py
+
+import asyncio
+import io
+import logging
+import types
+
+import pytest
+
+from app.core import tracing
+from app.core.metrics import Registry, gauges
+from app.core.tracing import STAGE_ERRORS, STAGE_SECONDS, Instrumented, span, trace, traced
+from app.llm.clients import LLMClient
+from app.orchestration.update_queue import ChatWorkerPool
+
+def count(stage, agent="none", backend="none"):
+    return STAGE_SECONDS.snapshot(stage=stage, agent=agent, backend=backend)["count"]
+
+def errors(stage, agent="none", backend="none"):
+    return STAGE_ERRORS.value(stage=stage, agent=agent, backend=backend)
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    hist = registry.histogram("req_seconds", "Request time", ("path",), buckets=(0.1, 1.0))
+    hits = registry.counter("hits_total", "Cache hits", ("tier",))
+    hist.observe(0.05, path="/a")
+    hist.observe(0.5, path="/a")
+    hist.observe(3.0, path="/a")
+    hits.inc(tier='lo"cal')
+    registry.add_collector(lambda: gauges("pool", {"depth": 3, "alive": True, "name": "x", "nested": {}}, "Pool"))
+
+    text = registry.render()
+    assert "# TYPE req_seconds histogram" in text
+    assert 'req_seconds_bucket{path="/a",le="0.1"} 1' in text
+    assert 'req_seconds_bucket{path="/a",le="1"} 2' in text
+    assert 'req_seconds_bucket{path="/a",le="+Inf"} 3' in text
+    assert 'req_seconds_count{path="/a"} 3' in text
+    assert 'req_seconds_sum{path="/a"} 3.55' in text
+    assert 'hits_total{tier="lo\\"cal"} 1' in text
+    assert "pool_depth 3" in text and "pool_alive 1" in text
+    assert "pool_name" not in text and "pool_nested" not in text
+    with pytest.raises(ValueError):
+        hist.observe(1.0)  # missing label
+
+def test_broken_collector_does_not_break_the_scrape():
+    registry = Registry()
+    registry.counter("ok_total", "Fine").inc()
+    registry.add_collector(lambda: 1 / 0)
+    assert "ok_total 1" in registry.render()
+
+@pytest.mark.asyncio
+async def test_span_records_time_and_errors():
+    before = count("t.work", "scholar", "fake")
+    with trace():
+        tracing.set_agent("scholar")
+        with span("t.work", backend="fake"):
+            await asyncio.sleep(0.01)
+        with pytest.raises(ValueError):
+            with span("t.work", backend="fake"):
+                raise ValueError("boom")
+    assert count("t.work", "scholar", "fake") == before + 2
+    assert errors("t.work", "scholar", "fake") == 1
+    assert STAGE_SECONDS.snapshot(stage="t.work", agent="scholar", backend="fake")["sum"] >= 0.01
+    # the agent label ends with the trace
+    assert tracing.current_agent.get() == "none"
+
+@pytest.mark.asyncio
+async def test_cancellation_is_not_an_error_and_recording_can_be_disabled():
+    async def slow():
+        with span("t.cancel"):
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(slow())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert count("t.cancel") == 1 and errors("t.cancel") == 0
+
+    tracing.configure(enabled=False)
+    try:
+        with span("t.cancel"):
+            pass
+    finally:
+        tracing.configure(enabled=True)
+    assert count("t.cancel") == 1
+
+@pytest.mark.asyncio
+async def test_traced_decorator_and_instrumented_proxy():
+    class Bot:
+        token = "secret"
+
+        async def send_message(self, chat_id, text):
+            return f"{chat_id}:{text}"
+
+    @traced("t.sync")
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3 and count("t.sync") == 1
+    bot = Instrumented(Bot(), "t.telegram", ["send_message"])
+    assert await bot.send_message(1, "hi") == "1:hi"
+    assert bot.token == "secret"
+    assert count("t.telegram.send_message") == 1
+
+def test_log_records_carry_the_trace_id():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("[%(trace_id)s] %(message)s"))
+    handler.addFilter(tracing.TraceIdFilter())
+    log = logging.getLogger("test_tracing.logs")
+    log.addHandler(handler)
+    log.propagate = False
+    try:
+        log.warning("outside")
+        with trace("abc123") as tid:
+            log.warning("inside")
+        assert tid == "abc123"
+    finally:
+        log.removeHandler(handler)
+    assert stream.getvalue().splitlines() == ["[-] outside", "[abc123] inside"]
+
+@pytest.mark.asyncio
+async def test_worker_pool_restores_the_submitters_trace():
+    seen = []
+
+    async def handler(chat_id, update):
+        seen.append((update["n"], tracing.trace_id.get()))
+
+    pool = ChatWorkerPool(handler, concurrency=2, max_depth=10)
+    await pool.start()
+    waits = count("queue.wait")
+    with trace("first"):
+        pool.submit(1, {"n": 1})
+    with trace("second"):
+        pool.submit(1, {"n": 2})
+    pool.submit(2, {"n": 3})  # outside any trace: a fresh id is made
+    await pool.stop(timeout=5)
+
+    by_n = dict(seen)
+    assert by_n[1] == "first" and by_n[2] == "second"
+    assert by_n[3] and by_n[3] not in ("first", "second")
+    assert count("queue.wait") == waits + 3
+
+@pytest.mark.asyncio
+async def test_llm_calls_are_labelled_by_agent_and_backend():
+    client = LLMClient(types.SimpleNamespace(
+        LLM_BACKEND="fake", FAKE_LATENCY_MS=0.0, FAKE_TOKENS_PER_S=0.0, FAKE_SEED=1,
+    ))
+    before = count("llm.call", "memo_drafter", "fake")
+    with trace():
+        tracing.set_agent("memo_drafter")
+        await client.agenerate("draft a memo", cache=False)
+        assert [c async for c in client.astream("draft another", cache=False)]
+    assert count("llm.call", "memo_drafter", "fake") == before + 2
@@ -0,0 +1,84 @@
+# app/llm/tests/test_transcription.py
+
+import asyncio
+import stat
+import sys
+
+import pytest
+
+from app.agents.voice.transcription import FfmpegDecoder, OfflineRecognizer, TranscriptionPipeline
+
+async def passthrough(source):
+    # decoder stand-in: the "audio" already is PCM
+    return bytes(source)
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path):
+    # ignores its arguments and copies stdin to stdout, like a no-op transcode
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "sys.stdout.buffer.write(sys.stdin.buffer.read())\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+@pytest.mark.asyncio
+async def test_offline_recognizer_describes_audio_length():
+    pipeline = TranscriptionPipeline(OfflineRecognizer(), decoder=passthrough, sample_rate=16000)
+    text = await pipeline.transcribe(b"\x00\x00" * 16000 * 2)
+    assert text == "[2.0s of audio]"
+    assert pipeline.stats()["completed"] == 1
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_is_respected():
+    active = peak = 0
+
+    class SlowRecognizer:
+        def transcribe(self, pcm, sample_rate):
+            import time
+            time.sleep(0.05)
+            return "ok"
+
+    async def decoder(source):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return bytes(source)
+
+    pipeline = TranscriptionPipeline(SlowRecognizer(), decoder=decoder, max_concurrency=2)
+    results = await asyncio.gather(*(pipeline.transcribe(b"x") for _ in range(6)))
+    assert results == ["ok"] * 6
+    assert peak <= 2
+
+@pytest.mark.asyncio
+async def test_recognizer_errors_are_counted_and_raised():
+    class Broken:
+        def transcribe(self, pcm, sample_rate):
+            raise ValueError("unintelligible")
+
+    pipeline = TranscriptionPipeline(Broken(), decoder=passthrough)
+    with pytest.raises(ValueError):
+        await pipeline.transcribe(b"x")
+    assert pipeline.stats()["failed"] == 1
+
+@pytest.mark.asyncio
+async def test_ffmpeg_decoder_streams_through_pipes(fake_ffmpeg):
+    decoder = FfmpegDecoder(binary=fake_ffmpeg)
+    assert await decoder(b"abc" * 1000) == b"abc" * 1000
+
+    async def chunks():
+        for part in (b"one ", b"two ", b"three"):
+            yield part
+    assert await decoder(chunks()) == b"one two three"
+
+@pytest.mark.asyncio
+async def test_ffmpeg_decoder_reports_failure(tmp_path):
+    script = tmp_path / "ffmpeg"
+    script.write_text(f"#!{sys.executable}\nimport sys\nsys.stderr.write('bad input')\nsys.exit(1)\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    with pytest.raises(RuntimeError, match="bad input"):
+        await FfmpegDecoder(binary=str(script))(b"not audio")
@@ -0,0 +1,180 @@
+# app/llm/tests/test_transport.py
+
+import json
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.llm.transport import (
+    HttpConfig, RetryingTransport, build_async_client, build_client, parse_retry_after,
+)
+
+class MockOpenAI:
+    """
+    Local HTTP server answering chat completions from a script of
+    (status, headers) pairs; once the script runs out it answers 200.
+    """
+
+    def __init__(self, script=()):
+        self.script = list(script)
+        self.requests = []
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                mock.requests.append((self.path, json.loads(body), self.client_address[1]))
+                status, headers = mock.script.pop(0) if mock.script else (200, {})
+                payload = json.dumps({"choices": [{"message": {"content": "hi"}}]}).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def mock_server():
+    servers = []
+
+    def start(script=()):
+        servers.append(MockOpenAI(script))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+class Sleeps(list):
+    async def __call__(self, seconds):
+        self.append(seconds)
+
+def retrying_client(config, sleeps):
+    client = build_async_client(config)
+    client._transport.sleep = sleeps
+    client._transport.rng = lambda: 0.5
+    return client
+
+def test_parse_retry_after_forms():
+    assert parse_retry_after({"retry-after": "3"}) == 3.0
+    assert parse_retry_after({"retry-after-ms": "250", "retry-after": "3"}) == 0.25
+    date = formatdate(1_000_010, usegmt=True)
+    assert parse_retry_after({"retry-after": date}, now=1_000_000) == pytest.approx(10)
+    assert parse_retry_after({"retry-after": "soon"}) is None
+    assert parse_retry_after({}) is None
+
+def test_backoff_is_jittered_and_capped():
+    config = HttpConfig(max_retries=10, retry_base=1.0, retry_max_delay=8.0)
+    transport = RetryingTransport(None, config, rng=lambda: 1.0)
+    assert [transport.backoff(a) for a in range(5)] == [1.0, 2.0, 4.0, 8.0, 8.0]
+    transport.rng = lambda: 0.25
+    assert transport.backoff(2) == 1.0
+    # the server's Retry-After wins, plus at most a second of jitter
+    assert transport.backoff(0, retry_after=3.0) == 3.25
+    assert transport.backoff(0, retry_after=60.0) is None
+    assert transport.backoff(10) is None
+
+@pytest.mark.asyncio
+async def test_retries_honour_retry_after(mock_server):
+    server = mock_server([(429, {"Retry-After": "2"}), (503, {})])
+    sleeps = Sleeps()
+    async with retrying_client(HttpConfig(retry_base=0.5), sleeps) as client:
+        resp = await client.post(f"{server.url}/v1/chat/completions", json={"model": "m"})
+        assert resp.status_code == 200
+        stats = client._transport.stats()
+    assert sleeps == [2.25, 0.5]
+    assert len(server.requests) == 3
+    # the body is re-sent intact on every attempt
+    assert all(body == {"model": "m"} for _, body, _ in server.requests)
+    assert stats == {"requests": 1, "retries": 2, "retry_after_honoured": 1, "gave_up": 0}
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries(mock_server):
+    server = mock_server([(500, {})] * 5)
+    sleeps = Sleeps()
+    async with retrying_client(HttpConfig(max_retries=2), sleeps) as client:
+        resp = await client.post(f"{server.url}/v1/chat/completions", json={})
+        assert resp.status_code == 500
+        assert client._transport.gave_up == 1
+    assert len(server.requests) == 3
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(mock_server):
+    server = mock_server([(400, {})])
+    async with retrying_client(HttpConfig(), Sleeps()) as client:
+        resp = await client.post(f"{server.url}/v1/chat/completions", json={})
+    assert resp.status_code == 400
+    assert len(server.requests) == 1
+
+@pytest.mark.asyncio
+async def test_connection_errors_are_retried():
+    sleeps = Sleeps()
+    # nothing listens on this port
+    async with retrying_client(HttpConfig(max_retries=2), sleeps) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.post("http://127.0.0.1:9/v1/chat/completions", json={})
+    assert len(sleeps) == 2
+
+@pytest.mark.asyncio
+async def test_pool_keeps_connections_alive(mock_server):
+    server = mock_server()
+    async with build_async_client(HttpConfig(max_keepalive=2)) as client:
+        for _ in range(3):
+            await client.post(f"{server.url}/v1/chat/completions", json={})
+    # same client port every time: one connection, reused
+    assert len({port for _, _, port in server.requests}) == 1
+
+def test_sync_client_retries_too(mock_server):
+    server = mock_server([(429, {"retry-after-ms": "10"})])
+    config = HttpConfig(read_timeout=5.0)
+    with build_client(config) as client:
+        assert client.timeout.read == 5.0
+        client._transport.sleep_sync = lambda s: None
+        resp = client.post(f"{server.url}/v1/chat/completions", json={})
+        assert resp.status_code == 200
+        assert client._transport.retries == 1
+
+def test_openai_clients_share_the_process_pool(monkeypatch):
+    import sys
+    import types
+    from app.llm.clients import LLMClient
+    from app.llm.transport import shared_async_client, shared_client
+
+    built = []
+
+    class RecordingOpenAI:
+        def __init__(self, **kwargs):
+            built.append(kwargs)
+
+    mod = types.ModuleType("openai")
+    mod.OpenAI = mod.AsyncOpenAI = RecordingOpenAI
+    monkeypatch.setitem(sys.modules, "openai", mod)
+    settings = types.SimpleNamespace(
+        LLM_BACKEND="openai", OPENAI_API_KEY="k", OPENAI_BASE_URL="http://127.0.0.1:1/v1",
+    )
+    first, second = LLMClient(settings), LLMClient(settings)
+    first.async_client, second.async_client
+
+    sync_kwargs, _, async_kwargs, _ = built
+    assert sync_kwargs["http_client"] is shared_client() is built[1]["http_client"]
+    assert async_kwargs["http_client"] is shared_async_client() is built[3]["http_client"]
+    assert sync_kwargs["max_retries"] == 0
+    assert sync_kwargs["base_url"] == "http://127.0.0.1:1/v1"
+    assert sync_kwargs["timeout"].connect == HttpConfig().connect_timeout
@@ -0,0 +1,98 @@
+# app/llm/tests/test_tts.py
+
+import asyncio
+import io
+import stat
+import sys
+import wave
+
+import pytest
+
+from app.agents.voice.tts import FfmpegOpusEncoder, SpeechSynthesizer, ToneEngine, audio_key
+
+async def passthrough(audio):
+    return audio
+
+class CountingEngine(ToneEngine):
+    def __init__(self):
+        super().__init__(seconds_per_char=0.01)
+        self.calls = 0
+
+    def synthesize(self, text, voice):
+        self.calls += 1
+        return super().synthesize(text, voice)
+
+def test_tone_engine_produces_wav_sized_by_text():
+    audio = ToneEngine(sample_rate=8000, seconds_per_char=0.1).synthesize("hello", "en")
+    with wave.open(io.BytesIO(audio)) as wav:
+        assert wav.getframerate() == 8000
+        assert wav.getnframes() == 4000
+
+def test_audio_key_depends_on_engine_voice_and_text():
+    key = audio_key("gtts", "en", "hi")
+    assert key == audio_key("gtts", "en", "hi")
+    assert len({key, audio_key("gtts", "fr", "hi"), audio_key("tone", "en", "hi"), audio_key("gtts", "en", "ho")}) == 4
+
+@pytest.mark.asyncio
+async def test_repeated_text_is_served_from_cache():
+    engine = CountingEngine()
+    tts = SpeechSynthesizer(engine, encoder=passthrough)
+    first = await tts.synthesize("objection overruled")
+    second = await tts.synthesize("objection overruled")
+    assert first == second
+    assert engine.calls == 1
+    await tts.synthesize("objection overruled", voice="fr")
+    assert engine.calls == 2
+    assert tts.stats()["cache"]["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_is_respected():
+    active = peak = 0
+
+    async def encoder(audio):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return audio
+
+    tts = SpeechSynthesizer(ToneEngine(seconds_per_char=0.001), encoder=encoder, max_concurrency=2)
+    await asyncio.gather(*(tts.synthesize(f"line {i}") for i in range(6)))
+    assert peak <= 2
+    assert tts.stats()["synthesized"] == 6
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached():
+    class Flaky(ToneEngine):
+        fail = True
+        def synthesize(self, text, voice):
+            if self.fail:
+                raise ConnectionError("tts down")
+            return super().synthesize(text, voice)
+
+    engine = Flaky(seconds_per_char=0.001)
+    tts = SpeechSynthesizer(engine, encoder=passthrough)
+    with pytest.raises(ConnectionError):
+        await tts.synthesize("hi")
+    engine.fail = False
+    assert await tts.synthesize("hi")
+    assert tts.stats()["failed"] == 1
+
+@pytest.mark.asyncio
+async def test_opus_encoder_pipes_through_ffmpeg(tmp_path):
+    # stand-in ffmpeg that records its arguments and echoes stdin
+    args_file = tmp_path / "args"
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"open({str(args_file)!r}, 'w').write(' '.join(sys.argv[1:]))\n"
+        "sys.stdout.buffer.write(sys.stdin.buffer.read())\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    out = await FfmpegOpusEncoder(bitrate="24k", binary=str(script))(b"RIFF....")
+    assert out == b"RIFF...."
+    args = args_file.read_text()
+    assert "-c:a libopus" in args and "-b:a 24k" in args and "-f ogg" in args
@@ -0,0 +1,85 @@
+# app/llm/tests/test_update_queue.py
+
+import asyncio
+
+import pytest
+
+from app.orchestration.update_queue import ChatWorkerPool
+
+@pytest.mark.asyncio
+async def test_updates_for_one_chat_run_in_order():
+    seen = []
+
+    async def handler(chat_id, update):
+        # later updates finish faster; ordering must still hold
+        await asyncio.sleep(0.01 * (5 - update["n"]))
+        seen.append((chat_id, update["n"]))
+
+    pool = ChatWorkerPool(handler, concurrency=4, max_depth=100)
+    await pool.start()
+    for n in range(5):
+        assert pool.submit(1, {"n": n})
+    await pool.stop(timeout=5)
+
+    assert seen == [(1, n) for n in range(5)]
+    assert pool.stats()["processed"] == 5
+
+@pytest.mark.asyncio
+async def test_different_chats_run_in_parallel():
+    running = 0
+    peak = 0
+
+    async def handler(chat_id, update):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+
+    pool = ChatWorkerPool(handler, concurrency=3, max_depth=100)
+    await pool.start()
+    for chat in range(6):
+        pool.submit(chat, {})
+    await pool.stop(timeout=5)
+
+    assert peak == 3
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_and_counts():
+    gate = asyncio.Event()
+
+    async def handler(chat_id, update):
+        await gate.wait()
+
+    pool = ChatWorkerPool(handler, concurrency=1, max_depth=2)
+    assert pool.submit(1, {})
+    assert pool.submit(1, {})
+    assert not pool.submit(2, {})
+
+    stats = pool.stats()
+    assert stats["depth"] == 2
+    assert stats["rejected"] == 1
+    assert stats["high_water"] == 2
+
+    await pool.start()
+    gate.set()
+    await pool.stop(timeout=5)
+    assert pool.stats()["processed"] == 2
+
+@pytest.mark.asyncio
+async def test_handler_errors_do_not_stop_the_chat():
+    seen = []
+
+    async def handler(chat_id, update):
+        if update["n"] == 0:
+            raise RuntimeError("boom")
+        seen.append(update["n"])
+
+    pool = ChatWorkerPool(handler, concurrency=1, max_depth=10)
+    await pool.start()
+    pool.submit(7, {"n": 0})
+    pool.submit(7, {"n": 1})
+    await pool.stop(timeout=5)
+
+    assert seen == [1]
+    assert pool.stats()["failed"] == 1
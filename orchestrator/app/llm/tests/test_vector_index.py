@@ -0,0 +1,148 @@
+# app/llm/tests/test_vector_index.py
+
+import numpy as np
+import pytest
+
+from app.agents.case_law_scholar.case_law_agent import CaseLawScholarAgent
+from app.agents.memory.vector_index import LocalVectorIndex
+from app.llm.embeddings import HashingEmbedder
+
+def random_unit(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((n, dim)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+def test_upsert_query_and_overwrite(tmp_path):
+    index = LocalVectorIndex(tmp_path, dimension=3)
+    index.upsert([
+        ("a", [1, 0, 0], {"text": "alpha"}),
+        {"id": "b", "values": [0, 1, 0], "metadata": {"text": "beta"}},
+        ("c", [0, 0, 1]),
+    ])
+    resp = index.query(vector=[0.9, 0.1, 0], top_k=2, include_metadata=True)
+    assert [m.id for m in resp.matches] == ["a", "b"]
+    assert resp["matches"][0].metadata == {"text": "alpha"}
+    assert resp.matches[0].score == pytest.approx(0.9 / np.hypot(0.9, 0.1))
+
+    index.upsert([("a", [0, 0, -1], {"text": "moved"})])
+    assert index.describe_index_stats()["total_vector_count"] == 3
+    top = index.query(vector=[0, 0, -1], top_k=1, include_metadata=True).matches[0]
+    assert (top.id, top.metadata, top.score) == ("a", {"text": "moved"}, pytest.approx(1.0))
+
+def test_index_persists_and_reopens(tmp_path):
+    vecs = random_unit(50, 8)
+    index = LocalVectorIndex(tmp_path, dimension=8)
+    index.upsert([(f"v{i}", v, {"i": i}) for i, v in enumerate(vecs)])
+
+    reopened = LocalVectorIndex(tmp_path, dimension=8)
+    match = reopened.query(vector=vecs[17], top_k=1, include_metadata=True).matches[0]
+    assert (match.id, match.metadata) == ("v17", {"i": 17})
+
+    with pytest.raises(ValueError):
+        LocalVectorIndex(tmp_path, dimension=16)
+
+def test_blocked_exact_search_matches_brute_force(tmp_path):
+    vecs = random_unit(300, 16, seed=1)
+    queries = random_unit(5, 16, seed=2)
+    index = LocalVectorIndex(tmp_path, dimension=16, block_rows=64)
+    index.upsert([(str(i), v) for i, v in enumerate(vecs)])
+
+    results = index.query_batch(queries, top_k=7, mode="exact")
+    for q, resp in zip(queries, results):
+        expected = np.argsort(-(vecs @ q))[:7]
+        assert [int(m.id) for m in resp.matches] == expected.tolist()
+
+def test_ivf_mode_finds_clustered_neighbours(tmp_path):
+    rng = np.random.default_rng(3)
+    centers = random_unit(10, 32, seed=4)
+    vecs = centers[rng.integers(0, 10, 2000)] + 0.05 * rng.standard_normal((2000, 32))
+    index = LocalVectorIndex(tmp_path, dimension=32, ivf_threshold=1000, nprobe=3)
+    index.upsert([(str(i), v) for i, v in enumerate(vecs)])
+    index.build_ivf(nlist=10)
+
+    queries = vecs[:20]
+    exact = index.query_batch(queries, top_k=10, mode="exact")
+    approx = index.query_batch(queries, top_k=10)  # auto -> IVF above the threshold
+    recall = np.mean([
+        len({m.id for m in a.matches} & {m.id for m in e.matches}) / 10
+        for a, e in zip(approx, exact)
+    ])
+    assert recall >= 0.9
+
+    # vectors added after the build are assigned to a cell and found
+    index.upsert([("new", vecs[0])])
+    ids = [m.id for m in index.query(vector=vecs[0], top_k=2, mode="ivf").matches]
+    assert "new" in ids
+
+@pytest.mark.asyncio
+async def test_case_law_agent_grounds_prompt_in_retrieved_passages(tmp_path):
+    embed = HashingEmbedder(dim=64)
+    index = LocalVectorIndex(tmp_path, dimension=64)
+
+    class RecordingLLM:
+        async def agenerate(self, prompt, **kwargs):
+            self.prompt = prompt
+            return "answer"
+
+    agent = CaseLawScholarAgent(RecordingLLM(), index=index, embed=embed, top_k=1)
+    assert agent.ingest([
+        {"id": "worcester", "text": "tribal sovereignty state law Cherokee: States have no authority over the Cherokee Nation.",
+         "citation": "Worcester v. Georgia"},
+        {"id": "memo", "text": "quarterly earnings report: Revenue rose."},
+    ]) == 2
+    assert await agent.run("tribal sovereignty and state law") == "answer"
+    assert "[1] Worcester v. Georgia: tribal sovereignty state law Cherokee: States have no authority" in agent.llm.prompt
+    assert "Revenue rose" not in agent.llm.prompt
+    assert agent.llm.prompt.endswith("Research and summarize tribal sovereignty law: tribal sovereignty and state law")
+
+@pytest.mark.asyncio
+async def test_case_law_agent_ignores_vectors_from_another_embedder(tmp_path):
+    embed = HashingEmbedder(dim=64)
+    index = LocalVectorIndex(tmp_path, dimension=64)
+    # same dimension, but written by some other pipeline: not comparable
+    index.upsert([("foreign", embed("tribal sovereignty").tolist(), {"text": "Unrelated passage."})])
+
+    class RecordingLLM:
+        async def agenerate(self, prompt, **kwargs):
+            self.prompt = prompt
+            return "answer"
+
+    agent = CaseLawScholarAgent(RecordingLLM(), index=index, embed=embed)
+    await agent.run("tribal sovereignty")
+    assert "Unrelated passage" not in agent.llm.prompt
+    assert agent.llm.prompt == "Research and summarize tribal sovereignty law: tribal sovereignty"
+
+def test_local_index_records_its_embedder_and_ingest_builds_ivf(tmp_path, monkeypatch):
+    embed = HashingEmbedder(dim=32)
+    index = LocalVectorIndex(tmp_path, dimension=32, ivf_threshold=40, embedding=embed.name)
+    agent = CaseLawScholarAgent(None, index=index, embed=embed, top_k=2)
+    agent.ingest({"id": f"p{i}", "text": f"treaty {i} fishing rights case {i % 7}"} for i in range(50))
+
+    # past the threshold the corpus is partitioned, and queries use the cells
+    # instead of filtering every row's metadata
+    assert index.describe_index_stats()["ivf_cells"] > 0
+    assert agent.query_filter is None and "embedding" not in index.query(
+        vector=embed("treaty"), top_k=1, include_metadata=True).matches[0].metadata
+    monkeypatch.setattr(index, "_filter_rows", lambda f: pytest.fail("per-query filter"))
+    assert len(agent.retrieve("treaty 3 fishing rights")) == 2
+
+    assert LocalVectorIndex(tmp_path, dimension=32).embedding == embed.name
+    with pytest.raises(ValueError, match="holds"):
+        LocalVectorIndex(tmp_path, dimension=32, embedding="other-model")
+
+def test_metadata_filter_and_unknown_query_options(tmp_path):
+    index = LocalVectorIndex(tmp_path, dimension=3)
+    index.upsert([
+        ("a", [1, 0, 0], {"kind": "case"}),
+        ("b", [0.9, 0.1, 0], {"kind": "memo"}),
+        ("c", [0, 1, 0], {"kind": "case"}),
+    ])
+    resp = index.query(vector=[1, 0, 0], top_k=2, filter={"kind": {"$eq": "case"}})
+    assert [m.id for m in resp.matches] == ["a", "c"]
+    assert [m.id for m in index.query(vector=[1, 0, 0], top_k=5, filter={"kind": "memo"}).matches] == ["b"]
+    assert [m.id for m in index.query(vector=[1, 0, 0], filter={"kind": {"$in": ["memo"]}}).matches] == ["b"]
+    assert index.query(vector=[1, 0, 0], filter={"kind": "brief"}).matches == []
+    with pytest.raises(ValueError, match="operator"):
+        index.query(vector=[1, 0, 0], filter={"kind": {"$ne": "memo"}})
+    with pytest.raises(TypeError):
+        index.query(vector=[1, 0, 0], sparse_vector={"indices": [0], "values": [1.0]})
@@ -0,0 +1,56 @@
+# orchestrator/app/llm/tokens.py
+
+import logging
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional exact counts for OpenAI models via tiktoken
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Context windows (prompt + completion) of the models we route to
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+DEFAULT_CONTEXT_WINDOW = 4096
+
+# ~4 characters per token for English prose
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=16)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Token count of `text` for `model`: exact with tiktoken when available,
+    otherwise a character-based estimate that errs on the high side.
+    """
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE and model:
+        return len(_encoding(model).encode(text))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def context_window(model: Optional[str]) -> int:
+    if not model:
+        return DEFAULT_CONTEXT_WINDOW
+    for name in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_CONTEXT_WINDOWS[name]
+    return DEFAULT_CONTEXT_WINDOW
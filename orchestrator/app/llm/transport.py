@@ -0,0 +1,244 @@
+# orchestrator/app/llm/transport.py
+
+import asyncio
+import email.utils
+import importlib.util
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# worth another try: throttling, timeouts and transient server errors
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+@dataclass
+class HttpConfig:
+    max_connections: int = 20
+    max_keepalive: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    write_timeout: float = 10.0
+    pool_timeout: float = 5.0
+    max_retries: int = 3
+    retry_base: float = 0.5
+    retry_max_delay: float = 20.0
+
+    @classmethod
+    def from_settings(cls, settings=None) -> "HttpConfig":
+        defaults = cls()
+        return cls(**{
+            name: getattr(settings, f"OPENAI_{name.upper()}", value)
+            for name, value in vars(defaults).items()
+        })
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+
+def parse_retry_after(headers: Mapping[str, str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds the server asked us to wait, from `retry-after-ms` (OpenAI) or
+    `Retry-After` (seconds or an HTTP date); None if absent or unparsable.
+    """
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return max(0.0, float(ms) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when - (time.time() if now is None else now))
+
+
+class RetryingTransport(httpx.AsyncBaseTransport, httpx.BaseTransport):
+    """
+    Wraps an httpx transport with retries: connection failures and
+    RETRY_STATUSES are retried up to `max_retries` times, with full-jitter
+    exponential backoff, or exactly as long as the server's Retry-After
+    asks. A Retry-After longer than `retry_max_delay` is not waited out;
+    that response is returned as is.
+
+    Read timeouts are not retried: the request may already be running (and
+    billed) on the server.
+    """
+
+    def __init__(
+        self,
+        transport: Any,
+        config: Optional[HttpConfig] = None,
+        *,
+        rng: Callable[[], float] = random.random,
+        sleep: Callable[[float], Any] = asyncio.sleep,
+        sleep_sync: Callable[[float], None] = time.sleep,
+    ):
+        self.transport = transport
+        self.config = config or HttpConfig()
+        self.rng = rng
+        self.sleep = sleep
+        self.sleep_sync = sleep_sync
+
+        self.requests = 0
+        self.retries = 0
+        self.retry_after_honoured = 0
+        self.gave_up = 0
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Delay before retry number `attempt + 1`, or None to stop retrying.
+        """
+        if attempt >= self.config.max_retries:
+            return None
+        if retry_after is not None:
+            if retry_after > self.config.retry_max_delay:
+                return None
+            self.retry_after_honoured += 1
+            # a little jitter so clients told the same moment don't all return at once
+            return retry_after + self.rng() * min(1.0, self.config.retry_base)
+        ceiling = min(self.config.retry_max_delay, self.config.retry_base * 2 ** attempt)
+        return self.rng() * ceiling
+
+    def _next_delay(self, attempt: int, response: Optional[httpx.Response]) -> Optional[float]:
+        if response is None:
+            delay = self.backoff(attempt)
+        elif response.status_code not in RETRY_STATUSES:
+            return None
+        else:
+            delay = self.backoff(attempt, parse_retry_after(response.headers))
+        if delay is None:
+            self.gave_up += 1
+        else:
+            self.retries += 1
+            logger.warning(
+                "OpenAI request %s; retry %d in %.2fs",
+                response.status_code if response is not None else "connection failed",
+                attempt + 1, delay,
+            )
+        return delay
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        attempt = 0
+        while True:
+            try:
+                response = await self.transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if (delay := self._next_delay(attempt, None)) is None:
+                    raise
+            else:
+                if (delay := self._next_delay(attempt, response)) is None:
+                    return response
+                await response.aclose()
+            await self.sleep(delay)
+            attempt += 1
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        attempt = 0
+        while True:
+            try:
+                response = self.transport.handle_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if (delay := self._next_delay(attempt, None)) is None:
+                    raise
+            else:
+                if (delay := self._next_delay(attempt, response)) is None:
+                    return response
+                response.close()
+            self.sleep_sync(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    def close(self) -> None:
+        self.transport.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "retry_after_honoured": self.retry_after_honoured,
+            "gave_up": self.gave_up,
+        }
+
+
+def build_async_client(config: HttpConfig) -> httpx.AsyncClient:
+    http2 = config.http2 and H2_AVAILABLE
+    inner = httpx.AsyncHTTPTransport(limits=config.limits(), http2=http2)
+    return httpx.AsyncClient(
+        transport=RetryingTransport(inner, config), timeout=config.timeout(), http2=http2
+    )
+
+
+def build_client(config: HttpConfig) -> httpx.Client:
+    http2 = config.http2 and H2_AVAILABLE
+    inner = httpx.HTTPTransport(limits=config.limits(), http2=http2)
+    return httpx.Client(
+        transport=RetryingTransport(inner, config), timeout=config.timeout(), http2=http2
+    )
+
+
+# — One pool per process, shared by every OpenAI client —
+_shared: Dict[str, Any] = {}
+
+
+def shared_async_client(settings=None) -> httpx.AsyncClient:
+    """
+    The process-wide pooled `httpx.AsyncClient`, built on first use from
+    `settings` (later calls reuse it, whatever they pass).
+    """
+    if "async" not in _shared:
+        _shared["async"] = build_async_client(HttpConfig.from_settings(settings))
+    return _shared["async"]
+
+
+def shared_client(settings=None) -> httpx.Client:
+    """Blocking counterpart of `shared_async_client()`."""
+    if "sync" not in _shared:
+        _shared["sync"] = build_client(HttpConfig.from_settings(settings))
+    return _shared["sync"]
+
+
+def transport_stats() -> Dict[str, Any]:
+    return {kind: client._transport.stats() for kind, client in _shared.items()}
+
+
+async def aclose_shared() -> None:
+    """Close the shared pools; the next call builds fresh ones."""
+    if "async" in _shared:
+        await _shared.pop("async").aclose()
+    if "sync" in _shared:
+        _shared.pop("sync").close()
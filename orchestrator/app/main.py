@@ -1,73 +1,126 @@
 # orchestrator/app/main.py
 
+import asyncio
 import logging
-import os
-import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
 
 from fastapi import FastAPI, Request, Header, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
 from telegram import Bot
 from telegram.error import TelegramError
-from gtts import gTTS
 
+from app.core import tracing
 from app.core.config import settings
+from app.core.logs import LogPipeline
+from app.core.metrics import REGISTRY, gauges
+from app.orchestration.idempotency import UpdateDeduplicator
+from app.orchestration.lazy import Lazy, warmup
 from app.orchestration.master_agent import MasterAgent
+from app.orchestration.postprocess import FollowUp, PostProcessor
+from app.orchestration.streaming import TelegramStreamer
+from app.orchestration.update_queue import ChatWorkerPool
+from app.llm.admission import Priority, chat_scope
 from app.llm.clients import LLMClient
-from app.agents.file_conversion_agent.file_conversion_agent import FileConversionAgent
-from app.agents.memory.buffer_memory import BufferMemory
+from app.llm.transport import aclose_shared, transport_stats
+from app.agents.memory.tiered_memory import TieredMemory
+from app.agents.voice.transcription import TranscriptionPipeline
+from app.agents.voice.tts import SpeechSynthesizer
 
-logging.basicConfig(level=logging.INFO)
+# log records are written by a background thread; every line carries the
+# trace id of the update it belongs to
+log_pipeline = LogPipeline.from_settings(settings).start()
+tracing.configure(enabled=settings.METRICS_ENABLED)
 logger = logging.getLogger(__name__)
 
+# Bot calls show up as telegram.<method> spans
+TELEGRAM_METHODS = (
+    "send_message", "edit_message_text", "delete_message", "send_voice", "send_document", "get_file",
+)
+
 # — Initialize Telegram, LLM, Agents, and in-memory buffer —
-bot = Bot(token=settings.TELEGRAM_TOKEN)
-llm_client = LLMClient(settings)
-master = MasterAgent(llm_client=llm_client)
-audio_agent = FileConversionAgent(llm_client=None)  # only uses audio_to_text()
-memory = BufferMemory()
+#   The LLM client and the agents are lazy: they are built by the warmup
+#   phase at startup (or on first use), never at import time.
+bot = tracing.Instrumented(Bot(token=settings.TELEGRAM_TOKEN), "telegram", TELEGRAM_METHODS)
+llm_client = Lazy("llm_client", lambda: LLMClient(settings))
+# one memory service for the whole process; this module records every
+# exchange, so MasterAgent only reads from it
+memory = TieredMemory.from_settings(settings)
+master = MasterAgent(llm_client=llm_client, memory=memory, record_turns=False)
+audio_agent = master.registry["file_conversion"]  # for its conversion job pool
+transcriber = TranscriptionPipeline.from_settings(settings)
+tts = SpeechSynthesizer.from_settings(settings)
+followups = PostProcessor()
 
-app = FastAPI()
+# every distinct lazy component, for warmup and /ready
+components = [llm_client, *{id(a): a for a in master.registry.values()}.values()]
 
-@app.get("/")
-async def root():
-    return {"message": "✅ Inter-Tribal Chambers bot is live!"}
 
-@app.get("/health")
-async def health():
-    return {"status": "ok"}
+async def witty_voice_note(user_input: str) -> bytes | None:
+    """
+    Witty one-liner about the user's message as an OGG/Opus voice note.
+    """
+    llm = await llm_client.aget()
+    witty = (await llm.agenerate(
+        prompt=f"Give me a short, witty one-liner about: {user_input}",
+        max_tokens=50,
+        temperature=0.8,
+        cache=False,
+        priority=Priority.EXTRA,
+    )).strip()
+    if not witty:
+        return None
+    return await tts.synthesize(witty)
 
-@app.post("/webhook")
-async def telegram_webhook(
-    request: Request,
-    secret: str = Header(None, alias="X-Telegram-Bot-Api-Secret-Token"),
-):
-    # 1) Secret check
-    if settings.WEBHOOK_SECRET and secret != settings.WEBHOOK_SECRET:
-        raise HTTPException(status_code=403, detail="Forbidden")
 
-    # 2) Parse update JSON
-    try:
-        update = await request.json()
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid JSON")
+def build_followups(chat_id: int, agent_key: str, user_input: str, reply_text: str):
+    """
+    Optional extras delivered after the main reply, each with its own timeout.
+    """
+    async def send_text(text: str) -> None:
+        await bot.send_message(chat_id=chat_id, text=text)
+
+    async def send_voice(audio: bytes) -> None:
+        await bot.send_voice(chat_id=chat_id, voice=audio)
+
+    jobs = []
+    if agent_key == "case_law_scholar" and reply_text:
+        async def summary():
+            text = await master.summarize(reply_text)
+            return f"🕵️ {text}" if text else None
+        jobs.append(FollowUp(
+            "case_law_summary", summary, send_text,
+            timeout=settings.POSTPROCESS_SUMMARY_TIMEOUT,
+        ))
+    jobs.append(FollowUp(
+        "tts_one_liner", lambda: witty_voice_note(user_input), send_voice,
+        timeout=settings.POSTPROCESS_TTS_TIMEOUT,
+    ))
+    return jobs
+
 
-    msg = update.get("message") or update.get("edited_message")
-    if not msg:
-        return {"status": "ignored"}
+async def process_update(chat_id: int, msg: dict) -> None:
+    """
+    Full handling of one Telegram message; runs on the worker pool, never
+    on the webhook request itself.
+    """
+    # every LLM call made for this update (follow-ups included) counts
+    # against this chat's rate limit
+    with chat_scope(chat_id):
+        await _process_update(chat_id, msg)
 
-    chat_id = msg["chat"]["id"]
 
-    # 3) Voice vs text
+async def _process_update(chat_id: int, msg: dict) -> None:
+    # 1) Voice vs text
     if msg.get("voice") or msg.get("audio"):
         file_id = (msg.get("voice") or msg.get("audio"))["file_id"]
-        tg_file = await bot.get_file(file_id)
-        tmp = tempfile.NamedTemporaryFile(suffix=".oga", delete=False)
-        await tg_file.download(custom_path=tmp.name)
-        tmp.close()
-
         try:
-            user_input = audio_agent.audio_to_text(tmp.name)
+            # voice notes are small: download and decode entirely in memory
+            tg_file = await bot.get_file(file_id)
+            audio = await tg_file.download_as_bytearray()
+            user_input = await transcriber.transcribe(bytes(audio))
         except Exception as e:
-            logger.error("Audio agent error: %s", e)
+            logger.error("Audio transcription error: %s", e)
             user_input = f"⚠️ Audio processing failed: {e}"
 
         # immediately reply with transcript
@@ -75,55 +128,213 @@ async def telegram_webhook(
             await bot.send_message(chat_id=chat_id, text=user_input)
         except TelegramError as e:
             logger.error("Telegram send_message failed: %s", e)
-        finally:
-            os.unlink(tmp.name)
-
-        return {"status": "ok", "voice_transcript": user_input}
+        return
 
-    # 4) It’s text
+    # 2) It’s text
     user_input = msg.get("text", "").strip()
     if not user_input:
-        return {"status": "ok", "reply": "🤖 Please send some text."}
+        try:
+            await bot.send_message(chat_id=chat_id, text="🤖 Please send some text.")
+        except TelegramError as e:
+            logger.error("Telegram send_message failed: %s", e)
+        return
 
-    # 5) Save to in-memory buffer
-    memory.add(chat_id, "user", user_input)
+    # 3) Any extras still pending from this chat's previous message are stale now
+    if settings.POSTPROCESS_CANCEL_STALE:
+        followups.cancel(chat_id)
 
-    # 6) Route through MasterAgent
+    # 4) Route through MasterAgent
     #    MasterAgent.run will pick up buffer via Redis or in-memory as configured
     fake_update = {
         "message": {"chat": {"id": chat_id}, "text": user_input}
     }
-    reply_text = await master.run(fake_update)
+    #    With streaming on, the answer appears in a placeholder message that
+    #    is progressively edited while the LLM is still generating.
+    #    Backends that can't stream would only ever produce one edit, so
+    #    their answer is sent as a plain message instead.
+    #    (the client is built off the event loop if warmup hasn't finished)
+    streamer = None
+    if settings.STREAM_REPLIES and (await llm_client.aget()).capabilities.streaming:
+        streamer = TelegramStreamer(
+            bot, chat_id, edit_interval=settings.STREAM_EDIT_INTERVAL
+        )
+    async def notify(text: str) -> None:
+        # late results, e.g. a finished file-conversion job
+        try:
+            await bot.send_message(chat_id=chat_id, text=text)
+        except TelegramError as e:
+            logger.error("Telegram send_message failed: %s", e)
+
+    async def send_file(path: str) -> None:
+        # rendered documents, e.g. "/brief ... to docx"; the caller deletes the file
+        with open(path, "rb") as f:
+            await bot.send_document(chat_id=chat_id, document=f, filename=Path(path).name)
 
-    # 7) Save bot reply in buffer
-    memory.add(chat_id, "bot", reply_text)
+    agent_key, reply_text = await master.handle(
+        fake_update, stream=streamer.consume if streamer else None, notify=notify,
+        send_file=send_file,
+    )
 
-    # 8) Send the full-text reply
-    if reply_text:
+    # 5) Save the exchange in the buffer (one pipelined write)
+    await memory.add_turn(chat_id, user_input, reply_text)
+
+    # 6) Send the full-text reply as soon as it is ready, unless it was
+    #    already streamed (errors and non-streaming agents still go here)
+    if reply_text and not (streamer and streamer.text == reply_text):
         try:
             await bot.send_message(chat_id=chat_id, text=reply_text)
         except TelegramError as e:
             logger.error("Failed to send text reply: %s", e)
 
-    # 9) (Optional) Send a witty TTS voice-note
-    try:
-        witty = llm_client.generate(
-            prompt=f"Give me a short, witty one-liner about: {user_input}",
-            max_tokens=50,
-            temperature=0.8
-        ).strip()
-        tts = gTTS(witty)
-        mp3 = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
-        tts.write_to_fp(mp3)
-        mp3.flush()
-        mp3.close()
-        with open(mp3.name, "rb") as f:
-            await bot.send_voice(chat_id=chat_id, voice=f)
-    except Exception:
-        # swallow any errors here
-        pass
-    finally:
-        if 'mp3' in locals() and os.path.exists(mp3.name):
-            os.unlink(mp3.name)
-
-    return {"status": "ok", "reply": reply_text}
+    # 7) Witty case-law summary and TTS voice-note run concurrently in the
+    #    background and arrive as follow-up messages
+    followups.schedule(chat_id, build_followups(chat_id, agent_key, user_input, reply_text))
+
+
+# — Background workers: the webhook only validates and enqueues —
+workers = ChatWorkerPool(
+    process_update,
+    concurrency=settings.WEBHOOK_WORKERS,
+    max_depth=settings.WEBHOOK_QUEUE_MAX_DEPTH,
+)
+# redelivered updates are acknowledged without being processed twice;
+# claims go through the memory service's Redis client
+dedup = UpdateDeduplicator.from_settings(settings, redis=memory.remote.redis)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await workers.start()
+    # prime every component in parallel without delaying startup; /ready
+    # reports 503 until they are all up
+    warming = None
+    if settings.WARMUP_ON_STARTUP:
+        warming = asyncio.create_task(warmup(components, timeout=settings.WARMUP_TIMEOUT))
+    yield
+    if warming is not None and not warming.done():
+        warming.cancel()
+    await workers.stop(timeout=settings.WEBHOOK_DRAIN_TIMEOUT)
+    await followups.aclose(timeout=settings.WEBHOOK_DRAIN_TIMEOUT)
+    # after the drain: conversions its updates submitted still finish and notify
+    if audio_agent.ready and audio_agent.jobs is not None:
+        await audio_agent.jobs.aclose(timeout=settings.WEBHOOK_DRAIN_TIMEOUT)
+    await master.context.aclose()
+    await dedup.aclose()
+    await memory.aclose()
+    await aclose_shared()
+    if llm_client.ready:
+        await asyncio.to_thread(llm_client.close)
+
+app = FastAPI(lifespan=lifespan)
+
+@app.get("/")
+async def root():
+    return {"message": "✅ Inter-Tribal Chambers bot is live!"}
+
+@app.get("/health")
+async def health():
+    # liveness only: never builds anything
+    return {
+        "status": "ok",
+        "logging": log_pipeline.stats(),
+        "queue": workers.stats(),
+        "dedup": dedup.stats(),
+        "followups": followups.stats(),
+        "llm_cache": llm_client.cache.stats() if llm_client.ready and llm_client.cache else None,
+        "llm_flight": llm_client.flight.stats() if llm_client.ready and llm_client.flight else None,
+        "llm_transport": transport_stats(),
+        "llm_backend": llm_client.impl.stats() if llm_client.ready else None,
+        "llm_admission": llm_client.admission.stats() if llm_client.ready and llm_client.admission else None,
+        "memory": memory.stats(),
+        "context": master.context.stats(),
+        "plans": master.plans.stats(),
+        "transcription": transcriber.stats(),
+        "tts": tts.stats(),
+        "conversion_jobs": audio_agent.jobs.stats() if audio_agent.ready and audio_agent.jobs else None,
+    }
+
+@app.get("/ready")
+async def ready():
+    # readiness: every lazy component is built, with its startup time
+    status = {c.name: c.status() for c in components}
+    is_ready = all(s["ready"] for s in status.values())
+    return JSONResponse(
+        {"ready": is_ready, "components": status},
+        status_code=200 if is_ready else 503,
+    )
+
+@app.get("/metrics")
+async def metrics():
+    # Prometheus scrape: stage histograms plus the components' own counters
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+def component_metrics():
+    """
+    The numeric fields of the components' `stats()` as gauges, read at
+    scrape time only.
+    """
+    yield from gauges("orchestrator_queue", workers.stats(), "Webhook worker pool")
+    yield from gauges("orchestrator_logging", log_pipeline.stats(), "Log pipeline")
+    yield from gauges("orchestrator_dedup", dedup.stats(), "Webhook update de-duplication")
+    yield from gauges("orchestrator_followups", followups.stats(), "Follow-up extras")
+    yield from gauges("orchestrator_memory", memory.stats(), "Conversation memory")
+    yield from gauges("orchestrator_transcription", transcriber.stats(), "Voice transcription")
+    yield from gauges("orchestrator_tts", tts.stats(), "Voice-note synthesis")
+    if llm_client.ready:
+        backend = llm_client.backend
+        yield from gauges("orchestrator_llm_backend", llm_client.impl.stats(), "LLM backend", backend=backend)
+        if llm_client.admission:
+            yield from gauges("orchestrator_llm_admission", llm_client.admission.stats(), "LLM admission", backend=backend)
+        if llm_client.flight:
+            yield from gauges("orchestrator_llm_flight", llm_client.flight.stats(), "LLM single-flight", backend=backend)
+        if llm_client.cache:
+            yield from gauges("orchestrator_llm_cache", llm_client.cache.stats()["local"], "LLM response cache", backend=backend)
+
+REGISTRY.add_collector(component_metrics)
+
+@app.post("/webhook")
+async def telegram_webhook(
+    request: Request,
+    secret: str = Header(None, alias="X-Telegram-Bot-Api-Secret-Token"),
+):
+    # the trace id follows the update onto the worker pool (see ChatWorkerPool)
+    with tracing.trace():
+        return await _telegram_webhook(request, secret)
+
+async def _telegram_webhook(request: Request, secret: str):
+    with tracing.span("webhook.parse"):
+        # 1) Secret check
+        if settings.WEBHOOK_SECRET and secret != settings.WEBHOOK_SECRET:
+            raise HTTPException(status_code=403, detail="Forbidden")
+
+        # 2) Parse update JSON
+        try:
+            update = await request.json()
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid JSON")
+
+        msg = update.get("message") or update.get("edited_message")
+        if not msg:
+            return {"status": "ignored"}
+
+        try:
+            chat_id = msg["chat"]["id"]
+        except (KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Malformed update")
+
+    # 3) Drop redeliveries: the first copy is already queued or answered,
+    #    and a 200 stops Telegram from sending it again
+    update_id = update.get("update_id")
+    if update_id is not None and not await dedup.claim(update_id):
+        return {"status": "duplicate"}
+
+    # 4) Hand off to the worker pool and acknowledge immediately.
+    #    A full queue answers 429 so Telegram backs off and redelivers later;
+    #    the claim is released so that redelivery is accepted.
+    if not workers.submit(chat_id, msg):
+        if update_id is not None:
+            await dedup.release(update_id)
+        raise HTTPException(status_code=429, detail="Busy, retry later")
+
+    return {"status": "queued"}
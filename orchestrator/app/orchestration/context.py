@@ -0,0 +1,218 @@
+# orchestrator/app/orchestration/context.py
+
+import asyncio
+import bisect
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.llm.admission import LoadShed, Priority
+from app.llm.tokens import context_window, count_tokens
+from app.orchestration.lazy import resolve
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKETS = (128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+class TokenHistogram:
+    """
+    Cumulative histogram of token counts (Prometheus-style `le` buckets).
+    """
+
+    def __init__(self, buckets: Sequence[int] = TOKEN_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value: int) -> None:
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, running = {}, 0
+        for bound, n in zip((*self.buckets, "+Inf"), self._counts):
+            running += n
+            cumulative[str(bound)] = running
+        return {"count": self.count, "sum": self.sum, "buckets": cumulative}
+
+
+def _fingerprint(line: str) -> str:
+    return hashlib.sha1(line.encode("utf-8")).hexdigest()[:16]
+
+
+class ContextBuilder:
+    """
+    Assembles the generic-chat prompt context within a token budget.
+
+    The system prompt and the query always go in; then the newest history
+    turns are added while they fit. Turns that no longer fit are represented
+    by a rolling summary stored next to the history (see
+    `BufferMemory.get_summary`), which is extended in the background with
+    whatever has fallen out of the window since its last update.
+    """
+
+    def __init__(
+        self,
+        memory,
+        llm,
+        *,
+        budget: int = 3000,
+        reply_tokens: int = 1000,
+        summary_tokens: int = 200,
+        token_model: Optional[str] = None,
+    ):
+        self.memory = memory
+        self.llm = llm
+        self.budget = budget
+        self.reply_tokens = reply_tokens
+        self.summary_tokens = summary_tokens
+        self.token_model = token_model
+        self._count_static = lru_cache(maxsize=8)(self._count)
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+        self.prompt_tokens = TokenHistogram()
+        self.saved_tokens = TokenHistogram()
+        self.summaries = 0
+        self.summary_failures = 0
+
+    @classmethod
+    def from_settings(cls, memory, llm, settings) -> "ContextBuilder":
+        return cls(
+            memory,
+            llm,
+            budget=settings.CONTEXT_TOKEN_BUDGET,
+            reply_tokens=settings.CONTEXT_REPLY_TOKENS,
+            summary_tokens=settings.CONTEXT_SUMMARY_TOKENS,
+            token_model=settings.CONTEXT_TOKENIZER_MODEL,
+        )
+
+    def _count(self, text: str) -> int:
+        return count_tokens(text, self.token_model)
+
+    def budget_for(self, model: Optional[str]) -> int:
+        """
+        Prompt tokens available for `model`: the configured budget, capped so
+        prompt plus reply still fit the model's context window.
+        """
+        return min(self.budget, context_window(model) - self.reply_tokens)
+
+    async def build(
+        self, chat_id: str, system_prompt: str, query: str, model: Optional[str] = None
+    ) -> List[str]:
+        """
+        Context lines for `query`: system prompt, optional summary of older
+        turns, then as many recent turns as the budget allows.
+        """
+        # 1) Fixed costs; the system prompt rarely changes, so its count is memoised
+        fixed = self._count_static(system_prompt) if system_prompt else 0
+        fixed += self._count(query)
+        remaining = self.budget_for(model) - fixed
+
+        # 2) History with token counts stored at write time
+        entries: List[Tuple[int, str]] = await self.memory.get_entries(chat_id)
+        history_tokens = sum(t for t, _ in entries)
+
+        # 3) Over budget: reserve room for the rolling summary first
+        summary = None
+        if history_tokens > remaining:
+            summary = await self.memory.get_summary(chat_id)
+            if summary and summary.get("tokens", 0) <= remaining:
+                remaining -= summary["tokens"]
+            else:
+                summary = None
+
+        # 4) Newest turns first, while they fit
+        kept, used = 0, 0
+        for tokens, _ in reversed(entries):
+            if used + tokens > remaining:
+                break
+            kept += 1
+            used += tokens
+        dropped = entries[: len(entries) - kept]
+
+        context = [system_prompt] if system_prompt else []
+        if summary:
+            context.append(f"Summary of the earlier conversation: {summary['text']}")
+        context.extend(line for _, line in entries[len(entries) - kept:])
+
+        prompt = fixed + used + (summary["tokens"] if summary else 0)
+        self.prompt_tokens.observe(prompt)
+        self.saved_tokens.observe(max(0, fixed + history_tokens - prompt))
+        if dropped:
+            logger.info(
+                "Context for chat %s: %d tokens, %d older turns summarised",
+                chat_id, prompt, len(dropped),
+            )
+            self._schedule_refresh(chat_id, [line for _, line in dropped], summary)
+        return context
+
+    def _schedule_refresh(self, chat_id: str, dropped: List[str], summary: Optional[dict]) -> None:
+        if chat_id in self._refreshing:
+            return
+        # only fold in what came after the last line the summary already covers
+        # (matched by fingerprint; if it has been trimmed away, take everything)
+        last = summary.get("last") if summary else None
+        start = 0
+        if last:
+            for i in range(len(dropped) - 1, -1, -1):
+                if _fingerprint(dropped[i]) == last:
+                    start = i + 1
+                    break
+        pending = dropped[start:]
+        if not pending:
+            return
+        task = asyncio.create_task(
+            self._refresh(chat_id, summary, pending), name=f"summary-{chat_id}"
+        )
+        self._refreshing[chat_id] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(chat_id, None))
+
+    async def _refresh(self, chat_id: str, summary: Optional[dict], pending: List[str]) -> None:
+        previous = summary["text"] if summary else "(none yet)"
+        prompt = (
+            "Update the running summary of this conversation with the new lines. "
+            "Keep names, facts, decisions and open questions; be brief.\n\n"
+            f"Current summary:\n{previous}\n\nNew lines:\n" + "\n".join(pending)
+        )
+        try:
+            llm = await resolve(self.llm)
+            text = (await llm.agenerate(
+                prompt=prompt, max_tokens=self.summary_tokens, cache=False,
+                priority=Priority.BACKGROUND,
+            )).strip()
+        except LoadShed:
+            # busy: the same turns are summarised on a later message
+            return
+        except Exception:
+            self.summary_failures += 1
+            logger.exception("Rolling summary update failed for chat %s", chat_id)
+            return
+        if not text:
+            return
+        await self.memory.set_summary(chat_id, {
+            "text": text,
+            "tokens": self._count(text),
+            "last": _fingerprint(pending[-1]),
+            "turns": (summary.get("turns", 0) if summary else 0) + len(pending),
+        })
+        self.summaries += 1
+
+    async def aclose(self) -> None:
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "summaries": self.summaries,
+            "summary_failures": self.summary_failures,
+            "refreshing": len(self._refreshing),
+            "prompt_tokens": self.prompt_tokens.snapshot(),
+            "saved_tokens": self.saved_tokens.snapshot(),
+        }
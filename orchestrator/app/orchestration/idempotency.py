@@ -0,0 +1,134 @@
+# orchestrator/app/orchestration/idempotency.py
+
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateDeduplicator:
+    """
+    Remembers which Telegram `update_id`s have already been accepted, so an
+    update Telegram redelivers (because we answered too slowly, or the
+    connection dropped) is acknowledged without being processed again.
+
+    Two tiers: a bounded in-process set (the most recent `capacity` ids)
+    catches concurrent and quick redeliveries without a round trip, and
+    Redis `SET NX EX ttl` catches the rest, across restarts and workers.
+    If Redis is unreachable the update is let through: answering twice is
+    better than not answering at all.
+    """
+
+    def __init__(
+        self,
+        redis: Optional[Any] = None,
+        *,
+        capacity: int = 10_000,
+        ttl: float = 86400.0,
+        key_prefix: str = "tg:update:",
+        owns_redis: bool = False,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.redis = redis
+        # only a client opened for this instance is closed by aclose()
+        self.owns_redis = owns_redis
+        self.capacity = capacity
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self._seen: "OrderedDict[Hashable, None]" = OrderedDict()
+
+        self.accepted = 0
+        self.duplicates = 0
+        self.redis_duplicates = 0
+        self.released = 0
+        self.redis_errors = 0
+
+    @classmethod
+    def from_settings(cls, settings, redis: Optional[Any] = None) -> "UpdateDeduplicator":
+        """
+        Pass the process's shared `redis` client (e.g. the memory service's)
+        to avoid opening another connection pool; without one a client of
+        its own is opened.
+        """
+        owns = False
+        if not settings.WEBHOOK_DEDUP_REDIS:
+            redis = None
+        elif redis is None:
+            from redis.asyncio import Redis
+            redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+            owns = True
+        return cls(
+            redis,
+            capacity=settings.WEBHOOK_DEDUP_CAPACITY,
+            ttl=settings.WEBHOOK_DEDUP_TTL,
+            key_prefix=settings.WEBHOOK_DEDUP_KEY_PREFIX,
+            owns_redis=owns,
+        )
+
+    def _remember(self, update_id: Hashable) -> None:
+        self._seen[update_id] = None
+        while len(self._seen) > self.capacity:
+            self._seen.popitem(last=False)
+
+    async def claim(self, update_id: Hashable) -> bool:
+        """
+        True the first time `update_id` is seen, False for a duplicate.
+        """
+        # 1) Seen by this process: no round trip. Remembered before the first
+        #    await, so a concurrent redelivery is caught here too.
+        if update_id in self._seen:
+            self.duplicates += 1
+            logger.info("Duplicate update %s suppressed", update_id)
+            return False
+        self._remember(update_id)
+
+        # 2) Seen by another worker, or before a restart
+        if self.redis is not None:
+            try:
+                fresh = await self.redis.set(
+                    f"{self.key_prefix}{update_id}", 1, nx=True, ex=int(self.ttl)
+                )
+            except Exception as e:
+                self.redis_errors += 1
+                logger.error("UpdateDeduplicator: Redis claim failed, accepting %s: %s", update_id, e)
+            else:
+                if not fresh:
+                    self.duplicates += 1
+                    self.redis_duplicates += 1
+                    logger.info("Duplicate update %s suppressed (already claimed in Redis)", update_id)
+                    return False
+
+        self.accepted += 1
+        return True
+
+    async def release(self, update_id: Hashable) -> None:
+        """
+        Forget a claim whose update was not processed (e.g. rejected with
+        429), so Telegram's redelivery is accepted.
+        """
+        self._seen.pop(update_id, None)
+        self.released += 1
+        if self.redis is not None:
+            try:
+                await self.redis.delete(f"{self.key_prefix}{update_id}")
+            except Exception as e:
+                self.redis_errors += 1
+                logger.error("UpdateDeduplicator: Redis release failed for %s: %s", update_id, e)
+
+    async def aclose(self) -> None:
+        if self.redis is not None and self.owns_redis:
+            await self.redis.aclose()
+        self.redis = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._seen),
+            "capacity": self.capacity,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "redis_duplicates": self.redis_duplicates,
+            "released": self.released,
+            "redis_errors": self.redis_errors,
+        }
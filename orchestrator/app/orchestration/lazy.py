@@ -0,0 +1,135 @@
+# orchestrator/app/orchestration/lazy.py
+
+import asyncio
+import logging
+import threading
+from time import perf_counter
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Lazy:
+    """
+    Proxy that builds its component on first use instead of at import time.
+
+    `aget()` / `warmup()` build it on a worker thread so slow setup (Pandoc
+    checks, Pinecone calls, model loading) never blocks the event loop; async
+    code resolves the component with `await aget()` (or `resolve()`) before
+    using it. Attribute access is forwarded only once the object is built,
+    e.g. for stats behind a `ready` check; it never builds. Build time,
+    readiness and the last error are kept for the /ready endpoint.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self._factory = factory
+        self._instance: Any = None
+        self._lock = threading.Lock()
+        self.init_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> Any:
+        """
+        The real component, constructed (once) on the calling thread if needed.
+        A failed construction is retried on the next call.
+        """
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    start = perf_counter()
+                    try:
+                        instance = self._factory()
+                    except Exception as e:
+                        self.error = f"{type(e).__name__}: {e}"
+                        logger.exception("Failed to initialise %s", self.name)
+                        raise
+                    self.init_seconds = perf_counter() - start
+                    self.error = None
+                    self._instance = instance
+                    logger.info("Initialised %s in %.3fs", self.name, self.init_seconds)
+        return self._instance
+
+    async def aget(self) -> Any:
+        if self._instance is not None:
+            return self._instance
+        return await asyncio.to_thread(self.get)
+
+    def __getattr__(self, item: str) -> Any:
+        # only called for attributes not found on the proxy itself
+        if item.startswith("__"):
+            raise AttributeError(item)
+        instance = self.__dict__.get("_instance")
+        if instance is None:
+            # building here would run the factory (or wait for warmup) on
+            # the caller's thread, i.e. block the event loop
+            name = self.__dict__.get("name")
+            raise RuntimeError(f"{name} is not built yet; use `await {name}.aget()`")
+        return getattr(instance, item)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "init_seconds": None if self.init_seconds is None else round(self.init_seconds, 3),
+            "error": self.error,
+        }
+
+
+async def resolve(component: Any) -> Any:
+    """
+    `component` itself, or the real object behind a `Lazy` proxy, built
+    off the event loop if needed.
+    """
+    if isinstance(component, Lazy):
+        return await component.aget()
+    return component
+
+
+class LazyAgent(Lazy):
+    """
+    Lazy proxy for registry agents; `run()` and `astream()` are async and
+    build the agent off the event loop on first use.
+    """
+
+    async def run(self, query: str) -> Any:
+        agent = await self.aget()
+        result = agent.run(query)
+        if hasattr(result, "__await__"):
+            result = await result
+        return result
+
+    async def astream(self, query: str) -> AsyncIterator[str]:
+        agent = await self.aget()
+        if hasattr(agent, "astream"):
+            async for chunk in agent.astream(query):
+                yield chunk
+        else:
+            # non-streaming agents deliver their whole answer as one chunk
+            yield await self.run(query)
+
+
+async def warmup(components: Iterable[Lazy], timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Build all `components` in parallel and return their status by name.
+    Failures and timeouts are reported, not raised: unready components are
+    simply built on first use instead.
+    """
+    components = list(components)
+    start = perf_counter()
+    tasks = [asyncio.create_task(c.aget(), name=f"warmup-{c.name}") for c in components]
+    for task in tasks:
+        # failures are already logged and recorded by Lazy.get()
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    if not tasks:
+        return {}
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for component, task in zip(components, tasks):
+        if task in pending:
+            component.error = component.error or f"warmup timed out after {timeout}s"
+            logger.warning("Warmup of %s still running after %ss", component.name, timeout)
+    logger.info("Warmup finished in %.3fs", perf_counter() - start)
+    return {c.name: c.status() for c in components}
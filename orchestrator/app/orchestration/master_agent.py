@@ -1,36 +1,49 @@
 # orchestrator/app/orchestration/master_agent.py
 
 import logging
-from typing import List, Tuple
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple
 
-from app.agents.memory.buffer_memory import BufferMemory
+from app.agents.memory.tiered_memory import TieredMemory
 from app.core.config import settings
+from app.core.tracing import set_agent, span
+from app.llm.admission import Priority
+from app.orchestration.context import ContextBuilder
+from app.orchestration.lazy import resolve
+from app.orchestration.plan import FileSender, PlanExecutor, PlanResult, research_memo_plan
 from app.orchestration.registry import build_registry
+from app.orchestration.router import ROUTER
 
 logger = logging.getLogger(__name__)
 
+# Consumes a stream of text chunks (e.g. into Telegram) and returns the full text
+StreamSink = Callable[[AsyncIterator[str]], Awaitable[str]]
+# Sends a later, out-of-band message to the same chat (e.g. a finished job)
+Notifier = Callable[[str], Awaitable[None]]
+
 class MasterAgent:
     MEM_SIZE = 21  # keep last 21 turns
 
-    def __init__(self, llm_client):
+    def __init__(self, llm_client, memory=None, record_turns: bool = True):
         self.llm      = llm_client
         self.registry = build_registry(llm_client)
-        # our in-process async buffer memory backed by Redis
-        self.memory   = BufferMemory()
+        # conversation memory: in-process hot tier in front of Redis, shared
+        # with the caller when one is passed in
+        self.memory   = memory or TieredMemory.from_settings(settings)
+        # False when the caller records every exchange itself (see main.py)
+        self.record_turns = record_turns
+        # token-budgeted history + rolling summary for generic chats
+        self.context  = ContextBuilder.from_settings(self.memory, llm_client, settings)
         # load our new system prompt
         self.system_prompt = settings.MASTER_PROMPT
+        # keyword + slash-command routing, compiled once from ROUTING_TABLE
+        self.router   = ROUTER
+        # multi-agent plans, e.g. /brief (research → draft → convert)
+        self.plans    = PlanExecutor.from_settings(settings)
 
     def classify_intent(self, text: str) -> str:
-        lower = text.lower()
-        if any(k in lower for k in ["sovereignty", "case", "statute", "law", "precedent"]):
-            return "case_law_scholar"
-        if any(k in lower for k in ["memo", "draft"]):
-            return "memo_drafter"
-        if "remind" in lower or "schedule" in lower:
-            return "n8n_scheduler"
-        if any(k in lower for k in ["weather", "help", "how do i", "what is"]):
-            return "help"
-        return "generic"
+        # intents without a registered agent (e.g. "help") are answered by
+        # the generic LLM fallback in `handle`
+        return self.router.classify(text)
 
     def parse(self, text: str) -> Tuple[str, str]:
         text = text.strip()
@@ -39,78 +52,155 @@ class MasterAgent:
             cmd   = parts[0]
             query = parts[1] if len(parts) > 1 else ""
             logger.info("MasterAgent: detected slash-command '%s' → %r", cmd, query)
-            return cmd, query
+            return self.router.resolve_command(cmd) or cmd, query
         return self.classify_intent(text), text
 
     async def run(self, update: dict) -> str:
+        _, result = await self.handle(update)
+        return result
+
+    async def handle(
+        self,
+        update: dict,
+        stream: Optional[StreamSink] = None,
+        notify: Optional[Notifier] = None,
+        send_file: Optional[FileSender] = None,
+    ) -> Tuple[str, str]:
+        """
+        Route and answer one update, returning `(agent_key, reply)` so callers
+        can schedule agent-specific follow-ups (see `summarize`).
+
+        If `stream` is given, agents that support `astream()` (and the generic
+        fallback) feed their output to it chunk by chunk as it is generated.
+        If `notify` is given, agents that support `submit()` run the request as
+        a background job: the reply acknowledges it and `notify` delivers the
+        result later. `send_file` delivers documents a plan renders (e.g.
+        "/brief ... to docx"); without it plans skip rendering.
+        """
         msg     = update.get("message", {})
         text    = msg.get("text", "").strip()
         chat_id = str(msg.get("chat", {}).get("id"))
 
         if not text:
-            return "🤖 Please send me some text to work with."
+            return "none", "🤖 Please send me some text to work with."
 
-        agent_key, query = self.parse(text)
+        with span("route"):
+            agent_key, query = self.parse(text)
+        set_agent(self.agent_label(agent_key))
         logger.info("MasterAgent: routing to '%s' for %r", agent_key, query)
 
-        # 1) For generic fallbacks, pull last MEM_SIZE turns
-        history: List[str] = []
-        if agent_key == "generic":
-            history = await self.memory.get_history(chat_id)
-            if history:
-                logger.debug("Loaded memory for chat %s: %s", chat_id, history)
- 
-        # 2) Dispatch to a specialized agent
+        with span("agent.run"):
+            return await self._dispatch(agent_key, query, chat_id, stream, notify, send_file)
+
+    def agent_label(self, agent_key: str) -> str:
+        """
+        The metrics label for `agent_key`: aliases map to their agent, and
+        anything answered by the generic fallback (including unknown slash
+        commands) is "generic", so the label set stays small.
+        """
+        if agent_key in self.registry:
+            return getattr(self.registry[agent_key], "name", agent_key)
+        return agent_key if agent_key == "research_memo" else "generic"
+
+    async def _dispatch(
+        self,
+        agent_key: str,
+        query: str,
+        chat_id: str,
+        stream: Optional[StreamSink],
+        notify: Optional[Notifier],
+        send_file: Optional[FileSender] = None,
+    ) -> Tuple[str, str]:
+        # 1) Dispatch to a multi-agent plan or a specialized agent
+        if agent_key == "research_memo":
+            try:
+                plan = await self.plans.run(
+                    research_memo_plan(self.registry, query, settings.PLAN_OUTPUT_DIR, send_file)
+                )
+            except ValueError as e:
+                return agent_key, f"⚠️ {e}"
+            return agent_key, self._format_brief(plan)
         if agent_key in self.registry:
             agent = self.registry[agent_key]
             try:
-                result = agent.run(query)
-                if hasattr(result, "__await__"):
-                    result = await result
+                # build off the event loop, then inspect the real agent
+                agent = await resolve(agent)
+                if notify is not None and hasattr(agent, "submit"):
+                    result = await agent.submit(query, notify)
+                elif stream is not None and hasattr(agent, "astream"):
+                    result = await stream(agent.astream(query))
+                else:
+                    result = agent.run(query)
+                    if hasattr(result, "__await__"):
+                        result = await result
             except Exception:
                 logger.exception("Error in agent %s", agent_key)
-                return "⚠️ Oops, something went wrong in that agent."
+                return agent_key, "⚠️ Oops, something went wrong in that agent."
         else:
-            # 3) Generic LLM fallback, passing buffer-memory as context
-            # Generic LLM fallback: include our master-level system prompt +
-            # any recent history as context before the user query.
-            full_context = []
-            if self.system_prompt:
-                full_context.append(self.system_prompt)
-            if history:
-                full_context.extend(history)
+            # 2) Generic LLM fallback: master-level system prompt, then as much
+            #    recent history (and a summary of the rest) as the token budget allows
+            #    (the client is built off the event loop if warmup hasn't finished)
+            llm = await resolve(self.llm)
+            full_context = await self.context.build(
+                chat_id, self.system_prompt, query,
+                model=getattr(llm, "default_model", None),
+            )
 
             try:
-                result = self.llm.generate(
-                  prompt=query,
-                    context=full_context or None,
-                    max_tokens=5000
-                )
+                if stream is not None:
+                    result = await stream(llm.astream(
+                        prompt=query,
+                        context=full_context or None,
+                        max_tokens=settings.CONTEXT_REPLY_TOKENS
+                    ))
+                else:
+                    result = await llm.agenerate(
+                        prompt=query,
+                        context=full_context or None,
+                        max_tokens=settings.CONTEXT_REPLY_TOKENS
+                    )
             except Exception:
                 logger.exception("LLM fallback failed")
-                return "⚠️ Sorry, I wasn’t able to fetch an answer."
-
-        # 4) Post-process legal answers with a witty one-liner
-        if agent_key == "case_law_scholar" and result:
-            try:
-                summary = self.llm.generate(
-                    prompt=(
-                        "In a single witty sentence, summarize this legal explanation for Telegram:\n\n"
-                        f"{result}\n"
-                    ),
-                    max_tokens=60,
-                ).strip()
-                if summary:
-                    result = f"🕵️ {summary}\n\n{result}"
-            except Exception:
-                logger.exception("Failed to create case-law summary")
+                return agent_key, "⚠️ Sorry, I wasn’t able to fetch an answer."
 
-        # 5) Save user+assistant into buffer only for generic chats
-        if agent_key == "generic":
+        # 3) Save user+assistant into buffer only for generic chats
+        if agent_key not in self.registry and self.record_turns:
             try:
-                await self.memory.add(chat_id, "user", query)
-                await self.memory.add(chat_id, "bot", result)
+                await self.memory.add_turn(chat_id, query, result)
             except Exception:
                 logger.warning("Failed to write memory for chat %s", chat_id)
 
-        return result
+        return agent_key, result
+
+    def _format_brief(self, plan: PlanResult) -> str:
+        """
+        The drafted memo, followed by the conversion outcome and any
+        research questions that could not be answered.
+        """
+        draft = plan["draft"]
+        if not draft.ok:
+            return f"⚠️ I couldn't prepare that brief: {draft.error}"
+        parts = [draft.value]
+        if "convert" in plan.steps:
+            convert = plan["convert"]
+            parts.append(convert.value if convert.ok else f"⚠️ Conversion {convert.status}: {convert.error}")
+        missed = [r.name for r in plan.failed() if r.name.startswith("research_")]
+        if missed:
+            parts.append(f"ℹ️ Some research steps did not complete: {', '.join(missed)}")
+        return "\n\n".join(parts)
+
+    async def summarize(self, result: str) -> str:
+        """
+        A witty one-line summary of a legal answer, sent as a follow-up message
+        after the answer itself (see app.orchestration.postprocess).
+        """
+        llm = await resolve(self.llm)
+        return (await llm.agenerate(
+            prompt=(
+                "In a single witty sentence, summarize this legal explanation for Telegram:\n\n"
+                f"{result}\n"
+            ),
+            max_tokens=60,
+            cache=False,
+            priority=Priority.EXTRA,
+        )).strip()
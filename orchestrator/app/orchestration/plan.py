@@ -0,0 +1,262 @@
+# orchestrator/app/orchestration/plan.py
+
+import asyncio
+import logging
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.orchestration.lazy import resolve
+
+logger = logging.getLogger(__name__)
+
+# A step receives the results of the steps it depends on, by step name
+StepFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+# Sends a local file (by path) to the chat that asked for it
+FileSender = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class Step:
+    name: str
+    run: StepFn
+    after: Tuple[str, ...] = ()
+    timeout: Optional[float] = None   # falls back to the executor's step_timeout
+    required: bool = True             # optional steps may fail without stopping dependents
+
+
+@dataclass
+class StepResult:
+    name: str
+    status: str                       # ok / failed / timeout / skipped
+    value: Any = None
+    error: Optional[str] = None
+    started: float = 0.0              # seconds after the plan started
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+@dataclass
+class PlanResult:
+    steps: Dict[str, StepResult] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def __getitem__(self, name: str) -> StepResult:
+        return self.steps[name]
+
+    def failed(self) -> List[StepResult]:
+        return [r for r in self.steps.values() if not r.ok]
+
+    def timings(self) -> Dict[str, float]:
+        return {name: round(r.seconds, 3) for name, r in self.steps.items()}
+
+
+def validate(steps: List[Step]) -> None:
+    """
+    Raise ValueError unless `steps` form a DAG with unique names and known
+    dependencies.
+    """
+    names = [s.name for s in steps]
+    if len(set(names)) != len(names):
+        raise ValueError("Duplicate step names in plan")
+    deps = {s.name: set(s.after) for s in steps}
+    for step in steps:
+        missing = deps[step.name] - deps.keys()
+        if missing:
+            raise ValueError(f"Step {step.name!r} depends on unknown steps {sorted(missing)}")
+    # Kahn's algorithm: anything left over sits on a cycle
+    ready = [n for n, d in deps.items() if not d]
+    seen = 0
+    while ready:
+        node = ready.pop()
+        seen += 1
+        for other, d in deps.items():
+            if node in d:
+                d.discard(node)
+                if not d:
+                    ready.append(other)
+    if seen != len(steps):
+        raise ValueError("Plan has a dependency cycle")
+
+
+class PlanExecutor:
+    """
+    Runs a small DAG of agent steps.
+
+    Every step starts as soon as the steps it depends on have finished, so
+    independent steps (e.g. several research questions) run concurrently,
+    at most `concurrency` at a time. Results are handed to dependents as
+    Python objects, keyed by step name. Each step has its own timeout; a
+    failed or timed-out required step skips everything downstream of it,
+    while an optional one just leaves its result out.
+    """
+
+    def __init__(self, concurrency: int = 3, step_timeout: float = 90.0):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.concurrency = concurrency
+        self.step_timeout = step_timeout
+
+        self.plans = 0
+        self.counts = dict.fromkeys(("ok", "failed", "timeout", "skipped"), 0)
+        self.last_timings: Dict[str, float] = {}
+
+    @classmethod
+    def from_settings(cls, settings) -> "PlanExecutor":
+        return cls(concurrency=settings.PLAN_CONCURRENCY, step_timeout=settings.PLAN_STEP_TIMEOUT)
+
+    async def run(self, steps: List[Step]) -> PlanResult:
+        validate(steps)
+        by_name = {s.name: s for s in steps}
+        finished = {s.name: asyncio.Event() for s in steps}
+        slots = asyncio.Semaphore(self.concurrency)
+        result = PlanResult()
+        origin = perf_counter()
+
+        async def run_step(step: Step) -> None:
+            # 1) Wait for upstream steps
+            for dep in step.after:
+                await finished[dep].wait()
+            blocked = [d for d in step.after if not result[d].ok and by_name[d].required]
+            if blocked:
+                result.steps[step.name] = StepResult(
+                    step.name, "skipped", error=f"upstream failed: {', '.join(blocked)}",
+                    started=perf_counter() - origin,
+                )
+                finished[step.name].set()
+                return
+            upstream = {d: result[d].value for d in step.after if result[d].ok}
+
+            # 2) Run under the concurrency cap and the step's own timeout
+            async with slots:
+                start = perf_counter()
+                timeout = step.timeout or self.step_timeout
+                try:
+                    async with asyncio.timeout(timeout):
+                        value = await step.run(upstream)
+                    res = StepResult(step.name, "ok", value=value)
+                except TimeoutError:
+                    res = StepResult(step.name, "timeout", error=f"timed out after {timeout:.0f}s")
+                except Exception as e:
+                    logger.exception("Plan step %s failed", step.name)
+                    res = StepResult(step.name, "failed", error=f"{type(e).__name__}: {e}")
+                res.started = start - origin
+                res.seconds = perf_counter() - start
+            result.steps[step.name] = res
+            finished[step.name].set()
+
+        await asyncio.gather(*(run_step(s) for s in steps))
+        result.seconds = perf_counter() - origin
+
+        self.plans += 1
+        for r in result.steps.values():
+            self.counts[r.status] += 1
+        self.last_timings = result.timings()
+        logger.info(
+            "Plan of %d steps finished in %.3fs: %s",
+            len(steps), result.seconds,
+            ", ".join(f"{r.name}={r.status}/{r.seconds:.2f}s" for r in result.steps.values()),
+        )
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "plans": self.plans,
+            "steps": dict(self.counts),
+            "last_timings": self.last_timings,
+        }
+
+
+# — research → draft → convert —
+
+BRIEF_FORMATS = ("docx", "pdf", "odt", "rtf", "html", "md", "txt", "epub")
+
+
+async def _ask(agent: Any, query: str) -> Any:
+    result = agent.run(query)
+    if hasattr(result, "__await__"):
+        result = await result
+    return result
+
+
+def parse_brief(request: str) -> Tuple[str, List[str], Optional[str]]:
+    """
+    "Gaming compacts: IGRA remedies; state taxation to docx"
+      → ("Gaming compacts", ["IGRA remedies", "state taxation"], "docx")
+    Without a ":" the whole request is both topic and single question.
+    """
+    fmt = None
+    m = re.search(rf"\s+(?:to|as)\s+({'|'.join(BRIEF_FORMATS)})\s*$", request, re.IGNORECASE)
+    if m:
+        fmt, request = m.group(1).lower(), request[: m.start()]
+    topic, sep, rest = request.partition(":")
+    questions = [q.strip() for q in rest.split(";") if q.strip()] if sep else []
+    topic = topic.strip()
+    return topic, questions or [topic], fmt
+
+
+def research_memo_plan(
+    registry: Dict[str, Any],
+    request: str,
+    output_dir: str = "data/plans",
+    send_file: Optional[FileSender] = None,
+) -> List[Step]:
+    """
+    case_law_scholar researches each sub-question (in parallel), memo_drafter
+    turns the findings into a memo, and file_conversion optionally renders it
+    for `send_file` to deliver. Rendering works in a scratch directory under
+    `output_dir` that is removed afterwards; without `send_file` there is
+    nowhere to deliver a document, so no convert step is planned.
+    """
+    topic, questions, fmt = parse_brief(request)
+    if not topic:
+        raise ValueError("Usage: /brief <topic>[: question; question ...] [to docx]")
+    research = registry["case_law_scholar"]
+    steps: List[Step] = []
+
+    for i, question in enumerate(questions, 1):
+        async def ask(_, q=question):
+            return q, await _ask(research, q)
+        # research on one sub-question may fail; the memo uses what came back
+        steps.append(Step(f"research_{i}", ask, required=len(questions) == 1))
+
+    async def draft(findings: Dict[str, Tuple[str, str]]) -> str:
+        if not findings:
+            raise RuntimeError("no research results to draft from")
+        notes = "\n\n".join(f"Q: {q}\nA: {a}" for q, a in findings.values())
+        return await _ask(
+            registry["memo_drafter"],
+            f"Draft a memo on {topic}. Base it on this research:\n\n{notes}",
+        )
+    steps.append(Step("draft", draft, after=tuple(s.name for s in steps)))
+
+    if fmt and send_file is not None:
+        async def render(upstream: Dict[str, str]) -> str:
+            slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")[:40] or "memo"
+            await asyncio.to_thread(Path(output_dir).mkdir, parents=True, exist_ok=True)
+            workdir = Path(await asyncio.to_thread(tempfile.mkdtemp, prefix="brief-", dir=output_dir))
+            try:
+                # 1) Draft → file → converted document next to it
+                source = workdir / f"{slug}.md"
+                await asyncio.to_thread(source.write_text, upstream["draft"], encoding="utf-8")
+                agent = await resolve(registry["file_conversion"])
+                outcome = await agent.aconvert(str(source), fmt)
+                document = source.with_suffix(f".{fmt}")
+                if not await asyncio.to_thread(document.exists):
+                    raise RuntimeError(outcome)
+                # 2) The document goes to the chat, not just its server-side path
+                await send_file(str(document))
+                return f"📎 Sent {document.name}"
+            finally:
+                await asyncio.to_thread(shutil.rmtree, workdir, True)
+        steps.append(Step("convert", render, after=("draft",), required=False))
+
+    return steps
@@ -0,0 +1,142 @@
+# orchestrator/app/orchestration/postprocess.py
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Set
+
+from app.llm.admission import LoadShed
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FollowUp:
+    """
+    One optional extra sent after the main reply, e.g. a witty summary or a
+    TTS voice-note. `produce()` builds the payload (returning None skips
+    delivery) and `deliver(payload)` sends it; both share one `timeout`.
+    """
+    name: str
+    produce: Callable[[], Awaitable[Any]]
+    deliver: Callable[[Any], Awaitable[None]]
+    timeout: float = 30.0
+
+
+class PostProcessor:
+    """
+    Runs follow-ups concurrently as background tasks so the main answer is
+    never held back by them. Tasks are tracked per chat and can be cancelled;
+    outcome counts and latencies are kept per follow-up name.
+    """
+
+    OUTCOMES = ("delivered", "skipped", "shed", "timeout", "failed", "cancelled")
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, Set[asyncio.Task]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._latency: Dict[str, List[float]] = {}  # name -> [total, max]
+
+    def schedule(self, chat_id: Hashable, followups: Sequence[FollowUp]) -> List[asyncio.Task]:
+        """
+        Start every follow-up for `chat_id` and return immediately.
+        """
+        tasks = []
+        for followup in followups:
+            task = asyncio.create_task(
+                self._run(chat_id, followup), name=f"followup-{followup.name}-{chat_id}"
+            )
+            self._tasks.setdefault(chat_id, set()).add(task)
+            task.add_done_callback(lambda t, c=chat_id: self._forget(c, t))
+            tasks.append(task)
+        return tasks
+
+    def cancel(self, chat_id: Hashable) -> int:
+        """
+        Cancel all outstanding follow-ups of one chat; returns how many were cancelled.
+        """
+        tasks = [t for t in self._tasks.get(chat_id, ()) if not t.done()]
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
+
+    def pending(self, chat_id: Optional[Hashable] = None) -> int:
+        if chat_id is not None:
+            return len(self._tasks.get(chat_id, ()))
+        return sum(len(ts) for ts in self._tasks.values())
+
+    async def aclose(self, timeout: Optional[float] = None) -> None:
+        """
+        Let in-flight follow-ups finish for up to `timeout` seconds, then cancel the rest.
+        """
+        tasks = [t for ts in self._tasks.values() for t in ts]
+        if not tasks:
+            return
+        _, still_running = await asyncio.wait(tasks, timeout=timeout)
+        for task in still_running:
+            task.cancel()
+        await asyncio.gather(*still_running, return_exceptions=True)
+
+    async def _run(self, chat_id: Hashable, followup: FollowUp) -> None:
+        start = perf_counter()
+        outcome = "delivered"
+        try:
+            async with asyncio.timeout(followup.timeout):
+                payload = await followup.produce()
+                if payload is None:
+                    outcome = "skipped"
+                else:
+                    await followup.deliver(payload)
+        except TimeoutError:
+            outcome = "timeout"
+            logger.warning(
+                "Follow-up %r for chat %s timed out after %.1fs",
+                followup.name, chat_id, followup.timeout,
+            )
+        except LoadShed:
+            # dropped by admission control under load; nothing to deliver
+            outcome = "shed"
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception:
+            outcome = "failed"
+            logger.exception("Follow-up %r for chat %s failed", followup.name, chat_id)
+        finally:
+            duration = perf_counter() - start
+            self._record(followup.name, outcome, duration)
+            logger.info(
+                "Follow-up %r for chat %s %s in %.3fs",
+                followup.name, chat_id, outcome, duration,
+            )
+
+    def _forget(self, chat_id: Hashable, task: asyncio.Task) -> None:
+        tasks = self._tasks.get(chat_id)
+        if tasks is None:
+            return
+        tasks.discard(task)
+        if not tasks:
+            del self._tasks[chat_id]
+
+    def _record(self, name: str, outcome: str, duration: float) -> None:
+        counts = self._counts.setdefault(name, dict.fromkeys(self.OUTCOMES, 0))
+        counts[outcome] += 1
+        total_max = self._latency.setdefault(name, [0.0, 0.0])
+        total_max[0] += duration
+        total_max[1] = max(total_max[1], duration)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per follow-up outcome counts and latency (seconds), plus tasks in flight.
+        """
+        out: Dict[str, Any] = {"pending": self.pending()}
+        for name, counts in self._counts.items():
+            runs = sum(counts.values())
+            total, peak = self._latency[name]
+            out[name] = {
+                **counts,
+                "avg_latency_s": round(total / runs, 6) if runs else 0.0,
+                "max_latency_s": round(peak, 6),
+            }
+        return out
@@ -1,44 +1,54 @@
 # orchestrator/app/orchestration/registry.py
 
 from app.agents.case_law_scholar.case_law_agent import CaseLawScholarAgent
+from app.agents.memory.semantic_cache import SemanticCache
 from app.agents.memo_drafter.memo_agent import MemoDrafterAgent
 from app.agents.file_conversion_agent.file_conversion_agent import FileConversionAgent
+from app.agents.file_conversion_agent.jobs import ConversionJobManager
+from app.core.config import settings
+from app.orchestration.lazy import Lazy, LazyAgent
+from app.orchestration.router import ROUTER
 
 def build_registry(llm_client):
     """
     Constructs the agent registry, injecting the shared LLM client.
 
+    Agents are wrapped in `LazyAgent` proxies: nothing is set up (Pandoc,
+    Pinecone, vector index) until an agent is first used or warmed up.
+
     Returns:
-        dict: Mapping of command/agent_key -> agent_instance
+        dict: Mapping of command/agent_key -> agent proxy
     """
-    # instantiate each agent once
-    case_agent = CaseLawScholarAgent(llm_client)
-    memo_agent = MemoDrafterAgent(llm_client)
-    file_conv  = FileConversionAgent(llm_client)
+    def client():
+        # agent factories run on a worker thread (see LazyAgent), so the
+        # shared client can be resolved, and if need be built, right here
+        return llm_client.get() if isinstance(llm_client, Lazy) else llm_client
+
+    def make_case_agent():
+        # each answering agent gets its own semantic cache so answers never cross over
+        return CaseLawScholarAgent.from_settings(client(), settings, SemanticCache.from_settings(settings))
+
+    # one proxy per agent, shared by all of its aliases
+    case_agent = LazyAgent("case_law_scholar", make_case_agent)
+    memo_agent = LazyAgent(
+        "memo_drafter",
+        lambda: MemoDrafterAgent(client(), SemanticCache.from_settings(settings)),
+    )
+    file_conv  = LazyAgent(
+        "file_conversion",
+        lambda: FileConversionAgent(client(), ConversionJobManager.from_settings(settings)),
+    )
 
-    return {
-        # canonical keys
+    agents = {
         "case_law_scholar": case_agent,
         "memo_drafter":     memo_agent,
         "file_conversion":  file_conv,
-
-        # explicit slash-command aliases for case-law scholar
-        "case":         case_agent,
-        "law":          case_agent,
-        "sovereignty":  case_agent,
-        "case_law":     case_agent,
-        "precedent":    case_agent,
-
-        # explicit slash-command aliases for memo drafter
-        "memo":         memo_agent,
-        "draft":        memo_agent,
-        "memo_draft":   memo_agent,
-
-        # explicit slash-command aliases for file conversion
-        "convert":      file_conv,
-        "convert_file": file_conv,
-        "file":         file_conv,
-        "csv_to_xlsx":  file_conv,
-        "xlsx_to_csv":  file_conv,
-        "pdf_to_docx":  file_conv,
     }
+
+    # slash-command aliases come from the routing table (see router.py),
+    # each pointing at the same proxy as its canonical key
+    registry = dict(agents)
+    for alias, intent in ROUTER.aliases.items():
+        if intent in agents:
+            registry.setdefault(alias, agents[intent])
+    return registry
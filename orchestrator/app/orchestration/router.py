@@ -0,0 +1,142 @@
+# orchestrator/app/orchestration/router.py
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_INTENT = "generic"
+
+# — Routing table —
+#   One entry per intent: keyword weights for free-text messages, slash-command
+#   aliases, and a priority that breaks ties between equal scores (higher wins).
+#   Keywords match whole words only, with common inflections ("laws",
+#   "drafted", "reminding"); multi-word keywords match across any whitespace.
+ROUTING_TABLE: List[dict] = [
+    {
+        "intent": "case_law_scholar",
+        "priority": 30,
+        "aliases": ["case_law_scholar", "case", "law", "sovereignty", "case_law", "precedent"],
+        "keywords": {
+            "case law": 3.0, "sovereignty": 2.0, "precedent": 2.0, "statute": 2.0,
+            "treaty": 1.5, "treaties": 1.5, "jurisdiction": 1.5, "tribal court": 2.0,
+            "supreme court": 2.0, "lawsuit": 1.5, "ruling": 1.0, "holding": 1.0,
+            "court": 1.0, "case": 1.0, "law": 1.0, "legal": 1.0, "tribal": 1.0,
+            "doctrine": 1.0, "usc": 2.0, "cfr": 2.0,
+        },
+    },
+    {
+        "intent": "memo_drafter",
+        "priority": 20,
+        "aliases": ["memo_drafter", "memo", "draft", "memo_draft"],
+        "keywords": {"memo": 3.0, "memorandum": 3.0, "draft": 2.0, "write up": 1.0},
+    },
+    {
+        "intent": "file_conversion",
+        "priority": 25,
+        "aliases": ["file_conversion", "convert", "convert_file", "file",
+                    "csv_to_xlsx", "xlsx_to_csv", "pdf_to_docx"],
+        "keywords": {"convert": 2.0, "pdf": 0.5, "docx": 0.5, "csv": 0.5, "xlsx": 0.5, "markdown": 0.5},
+    },
+    {
+        # multi-agent plan: research → draft → convert (see plan.py); slash-only
+        "intent": "research_memo",
+        "priority": 40,
+        "aliases": ["brief", "research_memo"],
+        "keywords": {},
+    },
+    {
+        # no agent yet: answered by the generic LLM path
+        "intent": "n8n_scheduler",
+        "priority": 10,
+        "aliases": ["remind", "schedule"],
+        "keywords": {"remind": 3.0, "reminder": 3.0, "schedule": 2.0, "calendar": 1.5},
+    },
+    {
+        # no agent yet: answered by the generic LLM path
+        "intent": "help",
+        "priority": 0,
+        "aliases": ["help"],
+        "keywords": {"help": 1.5, "how do i": 1.5, "what is": 1.5, "weather": 1.5},
+    },
+]
+
+INFLECTIONS = r"(?:s|es|ed|d|ing)?"
+
+
+@dataclass
+class Route:
+    intent: str
+    priority: int = 0
+    aliases: List[str] = field(default_factory=list)
+    keywords: Dict[str, float] = field(default_factory=dict)
+
+
+class IntentRouter:
+    """
+    Keyword routing compiled into one word-boundary regex.
+
+    Every keyword of every route is a branch of a single alternation
+    (longest first, so "case law" wins over "case"); one `finditer` pass
+    over the message scores all intents at once. The highest total weight
+    wins, ties go to the higher priority, and scores below `min_score` fall
+    back to "generic", so one weak word ("case") is not enough on its own.
+    Slash-command aliases come from the same table.
+    """
+
+    def __init__(self, routes: List[Route], min_score: float = 1.5):
+        self.routes = {r.intent: r for r in routes}
+        self.min_score = min_score
+
+        self._keywords: Dict[str, List[Tuple[str, float]]] = {}
+        self.aliases: Dict[str, str] = {}
+        for route in routes:
+            for kw, weight in route.keywords.items():
+                self._keywords.setdefault(self._normalize(kw), []).append((route.intent, weight))
+            for alias in route.aliases:
+                if self.aliases.setdefault(alias.lower(), route.intent) != route.intent:
+                    raise ValueError(f"Alias {alias!r} is claimed by two intents")
+
+        branches = sorted(self._keywords, key=len, reverse=True)
+        self._pattern = re.compile(
+            r"\b(" + "|".join(r"\s+".join(map(re.escape, kw.split())) for kw in branches)
+            + r")" + INFLECTIONS + r"\b",
+            re.IGNORECASE,
+        )
+
+    @classmethod
+    def from_table(cls, table: List[dict], min_score: float = 1.5) -> "IntentRouter":
+        return cls([Route(**entry) for entry in table], min_score=min_score)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def scores(self, text: str) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for match in self._pattern.finditer(text):
+            for intent, weight in self._keywords[self._normalize(match.group(1))]:
+                totals[intent] = totals.get(intent, 0.0) + weight
+        return totals
+
+    def classify(self, text: str) -> str:
+        totals = self.scores(text)
+        if not totals:
+            return FALLBACK_INTENT
+        intent, score = max(
+            totals.items(), key=lambda kv: (kv[1], self.routes[kv[0]].priority)
+        )
+        return intent if score >= self.min_score else FALLBACK_INTENT
+
+    def resolve_command(self, command: str) -> Optional[str]:
+        """
+        Intent for a slash command (without the "/"), or None if unknown.
+        A "@botname" suffix, as Telegram adds in groups, is ignored.
+        """
+        return self.aliases.get(command.split("@", 1)[0].lower())
+
+
+# compiled once, at import
+ROUTER = IntentRouter.from_table(ROUTING_TABLE)
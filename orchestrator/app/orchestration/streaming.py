@@ -0,0 +1,133 @@
+# orchestrator/app/orchestration/streaming.py
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Optional
+
+from telegram.error import RetryAfter, TelegramError
+
+logger = logging.getLogger(__name__)
+
+# Telegram rejects messages longer than this many characters
+TELEGRAM_MAX_MESSAGE_LEN = 4096
+
+
+def _retry_delay(err: RetryAfter) -> float:
+    # PTB reports retry_after as int seconds or as a timedelta depending on version
+    delay = err.retry_after
+    return delay.total_seconds() if hasattr(delay, "total_seconds") else float(delay)
+
+
+class TelegramStreamer:
+    """
+    Shows a streamed LLM answer in Telegram as it is generated.
+
+    A placeholder message is sent first and then edited with the text so far,
+    at most once per `edit_interval` seconds (Telegram throttles edits hard).
+    When the text outgrows one message it is split, preferably on a line or
+    word boundary, and continues in a fresh message.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        chat_id: int,
+        *,
+        edit_interval: float = 1.0,
+        placeholder: str = "…",
+        max_len: int = TELEGRAM_MAX_MESSAGE_LEN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.edit_interval = edit_interval
+        self.placeholder = placeholder
+        self.max_len = max_len
+        self.clock = clock
+
+        self.message_ids: list = []   # every message this reply occupies
+        self.text = ""                # full streamed text
+        self.edits = 0
+        self._current = ""            # text belonging to the newest message
+        self._shown = ""              # what Telegram currently displays for it
+        self._next_edit = 0.0
+
+    @property
+    def started(self) -> bool:
+        """True once the placeholder was sent, i.e. the reply is visible in the chat."""
+        return bool(self.message_ids)
+
+    async def consume(self, chunks: AsyncIterator[str]) -> str:
+        """
+        Drain `chunks` into Telegram and return the full text.
+        """
+        await self._send(self.placeholder)
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                self.text += chunk
+                self._current += chunk
+                while len(self._current) > self.max_len:
+                    await self._rollover()
+                if self.clock() >= self._next_edit:
+                    await self._edit()
+        finally:
+            if self._current:
+                await self._edit(final=True)
+            elif not self.text and self.message_ids:
+                # nothing arrived (e.g. the LLM call failed): drop the placeholder
+                await self._delete_placeholder()
+        return self.text
+
+    def _split_point(self) -> int:
+        window = self._current[: self.max_len]
+        for sep in ("\n", " "):
+            cut = window.rfind(sep)
+            if cut >= self.max_len * 3 // 4:
+                return cut + 1
+        return self.max_len
+
+    async def _rollover(self) -> None:
+        cut = self._split_point()
+        head, self._current = self._current[:cut], self._current[cut:]
+        await self._edit(text=head, final=True)
+        # the remainder opens the next message directly
+        await self._send(self._current[: self.max_len] or self.placeholder)
+
+    async def _send(self, text: str) -> None:
+        msg = await self.bot.send_message(chat_id=self.chat_id, text=text)
+        self.message_ids.append(msg.message_id)
+        self._shown = text
+        self._next_edit = self.clock() + self.edit_interval
+
+    async def _edit(self, text: Optional[str] = None, final: bool = False) -> None:
+        text = self._current if text is None else text
+        if not text or text == self._shown:
+            return
+        attempts = 3 if final else 1
+        for _ in range(attempts):
+            try:
+                await self.bot.edit_message_text(
+                    text=text, chat_id=self.chat_id, message_id=self.message_ids[-1]
+                )
+                self.edits += 1
+                self._shown = text
+                self._next_edit = self.clock() + self.edit_interval
+                return
+            except RetryAfter as e:
+                delay = _retry_delay(e)
+                self._next_edit = self.clock() + delay
+                logger.warning("Telegram edit throttled; retry after %.1fs", delay)
+                if final:
+                    await asyncio.sleep(delay)
+            except TelegramError as e:
+                logger.error("Telegram edit_message_text failed: %s", e)
+                return
+
+    async def _delete_placeholder(self) -> None:
+        try:
+            await self.bot.delete_message(chat_id=self.chat_id, message_id=self.message_ids.pop())
+        except TelegramError as e:
+            logger.error("Telegram delete_message failed: %s", e)
@@ -0,0 +1,178 @@
+# orchestrator/app/orchestration/update_queue.py
+
+import asyncio
+import logging
+from collections import deque
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+from app.core import tracing
+
+logger = logging.getLogger(__name__)
+
+UpdateHandler = Callable[[Any, dict], Awaitable[Any]]
+
+
+class ChatWorkerPool:
+    """
+    In-process, bounded work queue for Telegram updates.
+
+    `submit()` never blocks: the webhook can acknowledge Telegram straight away
+    while `concurrency` workers drain the queue in the background. Different
+    chats are processed in parallel, but updates sharing a `chat_id` are handled
+    strictly one at a time and in arrival order, so per-chat memory stays
+    consistent. The trace id current at `submit()` (see app.core.tracing)
+    is restored while the update is handled.
+    """
+
+    def __init__(
+        self,
+        handler: UpdateHandler,
+        concurrency: int = 8,
+        max_depth: int = 1000,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        if max_depth < 1:
+            raise ValueError("max_depth must be >= 1")
+        self.handler = handler
+        self.concurrency = concurrency
+        self.max_depth = max_depth
+
+        # chat_id -> pending (enqueued_at, trace id, update) in arrival order
+        self._pending: Dict[Hashable, Deque[Tuple[float, Optional[str], dict]]] = {}
+        # chats that are either waiting in `_ready` or being processed
+        self._scheduled: Set[Hashable] = set()
+        self._ready: "asyncio.Queue[Hashable]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._depth = 0
+        self._in_flight = 0
+
+        # backpressure counters
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.high_water = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Updates accepted but not yet picked up by a worker."""
+        return self._depth
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def submit(self, chat_id: Hashable, update: dict) -> bool:
+        """
+        Enqueue one update. Returns False (and counts a rejection) if the
+        queue is already at `max_depth`.
+        """
+        if self._depth >= self.max_depth:
+            self.rejected += 1
+            logger.warning(
+                "ChatWorkerPool full (%d queued); rejecting update for chat %s",
+                self._depth, chat_id,
+            )
+            return False
+
+        self._pending.setdefault(chat_id, deque()).append(
+            (perf_counter(), tracing.trace_id.get(), update)
+        )
+        self._depth += 1
+        self.enqueued += 1
+        self.high_water = max(self.high_water, self._depth)
+
+        # a chat sits in the ready queue at most once; its worker re-schedules
+        # it after each update so ordering is preserved
+        if chat_id not in self._scheduled:
+            self._scheduled.add(chat_id)
+            self._ready.put_nowait(chat_id)
+        return True
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"chat-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(
+            "ChatWorkerPool started: concurrency=%d max_depth=%d",
+            self.concurrency, self.max_depth,
+        )
+
+    async def join(self) -> None:
+        """Wait until every accepted update has been processed."""
+        while self._depth or self._in_flight:
+            await asyncio.sleep(0.01)
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Drain outstanding updates (up to `timeout` seconds), then cancel the workers.
+        """
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "ChatWorkerPool stop timed out with %d updates still queued", self._depth
+            )
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("ChatWorkerPool stopped")
+
+    async def _worker(self, idx: int) -> None:
+        while True:
+            chat_id = await self._ready.get()
+            queue = self._pending[chat_id]
+            enqueued_at, trace_id, update = queue.popleft()
+            self._depth -= 1
+            self._in_flight += 1
+
+            wait = perf_counter() - enqueued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            with tracing.trace(trace_id):
+                tracing.record("queue.wait", wait)
+                try:
+                    await self.handler(chat_id, update)
+                    self.processed += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    self.failed += 1
+                    logger.exception("ChatWorkerPool: handler failed for chat %s", chat_id)
+                finally:
+                    self._in_flight -= 1
+                    if queue:
+                        self._ready.put_nowait(chat_id)
+                    else:
+                        del self._pending[chat_id]
+                        self._scheduled.discard(chat_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of queue depth and backpressure counters.
+        """
+        done = self.processed + self.failed
+        return {
+            "concurrency": self.concurrency,
+            "max_depth": self.max_depth,
+            "depth": self._depth,
+            "in_flight": self._in_flight,
+            "active_chats": len(self._scheduled),
+            "high_water": self.high_water,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_s": round(self.total_wait / done, 6) if done else 0.0,
+            "max_wait_s": round(self.max_wait, 6),
+        }
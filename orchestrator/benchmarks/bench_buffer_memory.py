@@ -0,0 +1,77 @@
+# orchestrator/benchmarks/bench_buffer_memory.py
+"""
+Redis round trips and latency per message for BufferMemory writes.
+
+    cd orchestrator
+    python -m benchmarks.bench_buffer_memory --messages 2000 --chats 50
+    python -m benchmarks.bench_buffer_memory --redis-url redis://localhost:6379/15
+
+Compares the old two-`add`-calls-per-turn path (rpush and ltrim as separate
+commands), `add_turn` (one MULTI/EXEC) and write-behind batching. Without
+--redis-url it runs against fakeredis, which shows round-trip counts but
+not network latency.
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from app.agents.memory.buffer_memory import BufferMemory
+
+
+async def legacy_turn(memory: BufferMemory, chat_id: int, user: str, bot: str) -> None:
+    # what BufferMemory.add did before: rpush, then ltrim, per entry
+    for entry in (f"USER: {user}", f"BOT: {bot}"):
+        key = memory._key(chat_id)
+        await memory.redis.rpush(key, memory._encode(entry))
+        await memory.redis.ltrim(key, -memory.maxlen, -1)
+        memory.round_trips += 2
+
+
+async def run(mode: str, redis, messages: int, chats: int) -> dict:
+    await redis.flushdb()
+    memory = BufferMemory(redis, write_behind=(mode == "write_behind"), flush_interval=0.005)
+    latencies = []
+    start = perf_counter()
+    for i in range(messages):
+        t0 = perf_counter()
+        if mode == "legacy":
+            await legacy_turn(memory, i % chats, f"question {i}", f"answer {i}")
+        else:
+            await memory.add_turn(i % chats, f"question {i}", f"answer {i}")
+        latencies.append(perf_counter() - t0)
+    await memory.aclose()
+    total = perf_counter() - start
+    latencies.sort()
+    return {
+        "mode": mode,
+        "round_trips_per_msg": memory.round_trips / messages,
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+        "msgs_per_s": messages / total,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--redis-url", default=None, help="real Redis (its DB is flushed!)")
+    args = parser.parse_args()
+
+    if args.redis_url:
+        from redis.asyncio import Redis
+        redis = Redis.from_url(args.redis_url, decode_responses=True)
+    else:
+        import fakeredis
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    print(f"{'mode':<14}{'RT/msg':>8}{'p50 µs':>10}{'p99 µs':>10}{'msg/s':>10}")
+    for mode in ("legacy", "add_turn", "write_behind"):
+        r = await run(mode, redis, args.messages, args.chats)
+        print(f"{r['mode']:<14}{r['round_trips_per_msg']:>8.3f}{r['p50_us']:>10.0f}"
+              f"{r['p99_us']:>10.0f}{r['msgs_per_s']:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+# orchestrator/benchmarks/bench_intent_router.py
+"""
+Accuracy and speed of the compiled intent router vs the old keyword scans.
+
+    cd orchestrator
+    python -m benchmarks.bench_intent_router --repeat 2000
+
+Accuracy is measured on benchmarks/intent_corpus.jsonl (one labelled
+message per line); speed is classifications per second over the same
+messages.
+"""
+
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+from time import perf_counter
+
+from app.orchestration.router import ROUTER
+
+CORPUS = Path(__file__).with_name("intent_corpus.jsonl")
+
+
+def legacy_classify(text: str) -> str:
+    # MasterAgent.classify_intent before the routing table
+    lower = text.lower()
+    if any(k in lower for k in ["sovereignty", "case", "statute", "law", "precedent"]):
+        return "case_law_scholar"
+    if any(k in lower for k in ["memo", "draft"]):
+        return "memo_drafter"
+    if "remind" in lower or "schedule" in lower:
+        return "n8n_scheduler"
+    if any(k in lower for k in ["weather", "help", "how do i", "what is"]):
+        return "help"
+    return "generic"
+
+
+def load_corpus(path: Path = CORPUS):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(classify, corpus):
+    errors = [(s["text"], s["intent"], classify(s["text"])) for s in corpus]
+    errors = [e for e in errors if e[1] != e[2]]
+    return 1 - len(errors) / len(corpus), errors
+
+
+def throughput(classify, texts, repeat: int) -> float:
+    start = perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            classify(text)
+    return repeat * len(texts) / (perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--show-errors", action="store_true")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    texts = [s["text"] for s in corpus]
+    print(f"{len(corpus)} labelled messages: {dict(Counter(s['intent'] for s in corpus))}")
+    print(f"{'classifier':<12}{'accuracy':>10}{'msgs/s':>12}")
+    for name, classify in (("legacy", legacy_classify), ("router", ROUTER.classify)):
+        accuracy, errors = evaluate(classify, corpus)
+        print(f"{name:<12}{accuracy:>10.1%}{throughput(classify, texts, args.repeat):>12,.0f}")
+        if args.show_errors:
+            for text, want, got in errors:
+                print(f"    {text!r}: expected {want}, got {got}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# orchestrator/benchmarks/bench_llama_batching.py
+"""
+Throughput and latency of the local llama backend, one request at a time vs batched.
+
+    cd orchestrator
+    python -m benchmarks.bench_llama_batching --requests 64 --clients 16
+    python -m benchmarks.bench_llama_batching --model sshleifer/tiny-gpt2 --max-new-tokens 16
+
+"sequential" is what LLMClient does without LLAMA_BATCHING: the pipeline
+runs in-process on a one-thread executor, one prompt per call.
+"batched" sends the same prompts to a BatchingWorker process. Without
+--model both use a simulated pipeline whose cost is a fixed per-call
+overhead plus a smaller per-prompt cost, roughly the shape of a CPU
+forward pass; pass a small local model to measure the real thing.
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
+
+from app.llm.batching import BatchingWorker, load_pipeline
+
+
+class SimulatedPipeline:
+    def __init__(self, overhead_ms: float = 40.0, per_prompt_ms: float = 8.0):
+        self.overhead = overhead_ms / 1000
+        self.per_prompt = per_prompt_ms / 1000
+
+    def __call__(self, prompts, batch_size=1, **kwargs):
+        batch = [prompts] if isinstance(prompts, str) else list(prompts)
+        time.sleep(self.overhead + self.per_prompt * len(batch))
+        outputs = [[{"generated_text": f"{p} ..."}] for p in batch]
+        return outputs[0] if isinstance(prompts, str) else outputs
+
+
+def simulated_pipeline(overhead_ms: float = 40.0, per_prompt_ms: float = 8.0) -> SimulatedPipeline:
+    return SimulatedPipeline(overhead_ms, per_prompt_ms)
+
+
+async def drive(generate, requests: int, clients: int) -> dict:
+    prompts = asyncio.Queue()
+    for i in range(requests):
+        prompts.put_nowait(f"Question {i}: what is tribal sovereignty?")
+    latencies = []
+
+    async def client():
+        while not prompts.empty():
+            prompt = prompts.get_nowait()
+            t0 = perf_counter()
+            await generate(prompt)
+            latencies.append(perf_counter() - t0)
+
+    start = perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    total = perf_counter() - start
+    latencies.sort()
+    return {
+        "req_per_s": requests / total,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=16, help="concurrent callers")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, default=0, help="torch threads in the worker")
+    parser.add_argument("--model", default=None, help="local model path; default: simulated")
+    parser.add_argument("--max-new-tokens", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.model:
+        factory, factory_args = "app.llm.batching:load_pipeline", (args.model,)
+        gen_kwargs = {"max_new_tokens": args.max_new_tokens}
+    else:
+        factory, factory_args = "benchmarks.bench_llama_batching:simulated_pipeline", ()
+        gen_kwargs = {}
+
+    print(f"{'mode':<12}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'avg batch':>11}")
+
+    # 1) One prompt per call on a one-thread pool, as LLMClient does today
+    pipe = load_pipeline(args.model) if args.model else simulated_pipeline()
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        async def sequential(prompt):
+            return await loop.run_in_executor(pool, partial(pipe, prompt, **gen_kwargs))
+        await sequential("warm up")
+        r = await drive(sequential, args.requests, args.clients)
+    print(f"{'sequential':<12}{r['req_per_s']:>8.1f}{r['p50_ms']:>9.0f}{r['p95_ms']:>9.0f}{1:>11.2f}")
+
+    # 2) Dynamic batches in the worker process
+    worker = BatchingWorker(
+        factory, factory_args,
+        max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, threads=args.threads,
+    )
+    worker.start()
+    try:
+        await worker.agenerate("warm up", **gen_kwargs)
+        r = await drive(lambda p: worker.agenerate(p, **gen_kwargs), args.requests, args.clients)
+        stats = worker.stats()
+    finally:
+        await asyncio.to_thread(worker.close)
+    print(f"{'batched':<12}{r['req_per_s']:>8.1f}{r['p50_ms']:>9.0f}{r['p95_ms']:>9.0f}"
+          f"{stats['avg_batch']:>11.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+# orchestrator/benchmarks/bench_llm_logging.py
+"""
+Per-call cost of logging an LLM call, full prompts written inline vs the queued, size-capped pipeline.
+
+    cd orchestrator
+    python -m benchmarks.bench_llm_logging --calls 2000 --history 20
+
+Each call logs what LLMClient logs around one generic-chat completion: a
+"start" line with the prompt (the multi-KB MASTER_PROMPT, the chat history
+and the query) and a "completed" line with the response. "caller µs" is
+the time spent on the calling thread, i.e. on the event loop in the app;
+"bytes/call" is what reaches the log file.
+
+  legacy          the previous code: full prompt via %r, written inline
+  inline+policy   PromptLogPolicy (fingerprinted system prompt, truncated,
+                  redacted text), still written inline
+  queued+full     full prompts, but written by the LogPipeline thread
+  queued+policy   the new default: policy + LogPipeline
+  queued+sampled  as above, with the text of only 10% of calls logged
+
+--write-us adds a sleep to every write, standing in for a stdout that is
+piped to a slow collector; that wait is what the queue keeps off the loop.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import types
+from time import perf_counter, sleep
+
+from benchmarks.load_webhook import PLACEHOLDER_ENV
+
+for _key, _value in PLACEHOLDER_ENV.items():
+    os.environ.setdefault(_key, _value)
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from app.core.config import settings  # noqa: E402  (needs the environment above)
+from app.core.logs import LogPipeline  # noqa: E402
+from app.core.tracing import LOG_FORMAT, TraceIdFilter, trace  # noqa: E402
+from app.llm.clients import LLMClient  # noqa: E402
+
+logger = logging.getLogger("app.llm.clients")
+
+
+def make_prompt(history: int) -> str:
+    turns = []
+    for i in range(history):
+        turns.append(f"USER: Question {i} about treaty fishing rights; reach me at user{i}@example.org")
+        turns.append(f"BOT: Answer {i}: " + "Under the treaty the tribes reserved the right to fish. " * 3)
+    return "\n\n".join([settings.MASTER_PROMPT.strip(), *turns, "What changed after Boldt?"])
+
+
+def legacy_log(backend: str, prompt: str, kwargs: dict, result: str, start: float) -> None:
+    logger.info("LLMClient.agenerate start: backend=%r prompt=%r kwargs=%s", backend, prompt, kwargs)
+    display = result if len(result) < 200 else result[:200] + "...(truncated)"
+    logger.info("LLMClient.agenerate completed in %.3fs, response=%r", perf_counter() - start, display)
+
+
+def policy_log(client: LLMClient, prompt: str, kwargs: dict, result: str, start: float) -> None:
+    sampled = client._log_start("agenerate", prompt, kwargs)
+    client._log_completed(start, result, "agenerate", sampled)
+
+
+class SlowFile:
+    def __init__(self, path: str, write_us: float):
+        self.file = open(path, "w", encoding="utf-8")
+        self.delay = write_us / 1e6
+
+    def write(self, text: str) -> int:
+        if self.delay:
+            sleep(self.delay)
+        return self.file.write(text)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def run(mode: str, calls: int, prompt: str, result: str, write_us: float = 0.0) -> dict:
+    fd, path = tempfile.mkstemp(prefix="bench-llm-log-", suffix=".log")
+    os.close(fd)
+    out = SlowFile(path, write_us)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    # 1) Where the records go
+    pipeline = None
+    if mode.startswith("queued"):
+        pipeline = LogPipeline(stream=out).start()
+    else:
+        inline = logging.StreamHandler(out)
+        inline.setFormatter(logging.Formatter(LOG_FORMAT))
+        inline.addFilter(TraceIdFilter())
+        root.addHandler(inline)
+        root.setLevel(logging.INFO)
+
+    # 2) What they contain
+    client = LLMClient(types.SimpleNamespace(
+        LLM_BACKEND="fake", MASTER_PROMPT=settings.MASTER_PROMPT,
+        LLM_LOG_SAMPLE_RATE=0.1 if mode == "queued+sampled" else 1.0,
+    ))
+    kwargs = {"max_tokens": 1000}
+    if mode in ("legacy", "queued+full"):
+        log = lambda start: legacy_log("openai", prompt, kwargs, result, start)
+    else:
+        log = lambda start: policy_log(client, prompt, kwargs, result, start)
+
+    # 3) Time the caller's side only
+    elapsed = 0.0
+    with trace():
+        for _ in range(calls):
+            start = perf_counter()
+            log(start)
+            elapsed += perf_counter() - start
+
+    if pipeline is not None:
+        pipeline.stop()
+    out.close()
+    size = os.path.getsize(path)
+    os.unlink(path)
+    return {"mode": mode, "caller_us": elapsed / calls * 1e6, "bytes_per_call": size / calls,
+            "dropped": pipeline.stats()["dropped"] if pipeline else 0}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--history", type=int, default=20, help="chat turns in each prompt")
+    parser.add_argument("--write-us", type=float, default=0.0, help="extra latency of each write to the log sink")
+    args = parser.parse_args()
+
+    prompt = make_prompt(args.history)
+    result = "Tribal sovereignty is the inherent authority of Indigenous tribes to govern themselves. " * 8
+    results = [run(mode, args.calls, prompt, result, args.write_us)
+               for mode in ("legacy", "inline+policy", "queued+full", "queued+policy", "queued+sampled")]
+
+    # the table goes to stdout; logging was redirected to the temp files
+    print(f"prompt: {len(prompt)} chars, response: {len(result)} chars, {args.calls} calls, "
+          f"+{args.write_us:g}µs per write")
+    print(f"{'mode':<16}{'caller µs':>11}{'bytes/call':>12}{'dropped':>9}")
+    for r in results:
+        print(f"{r['mode']:<16}{r['caller_us']:>11.1f}{r['bytes_per_call']:>12.0f}{r['dropped']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# orchestrator/benchmarks/bench_vector_index.py
+"""
+Recall and latency of LocalVectorIndex: exact block scan vs IVF.
+
+    cd orchestrator
+    python -m benchmarks.bench_vector_index --n 200000 --dim 256 --queries 200
+"""
+
+import argparse
+import tempfile
+from time import perf_counter
+
+import numpy as np
+
+from app.agents.memory.vector_index import LocalVectorIndex
+
+
+def clustered_vectors(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    return centers[labels] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def timed_queries(index, queries, top_k, **kwargs):
+    start = perf_counter()
+    results = [index.query(vector=q, top_k=top_k, **kwargs) for q in queries]
+    per_query_ms = (perf_counter() - start) * 1000 / len(queries)
+    return results, per_query_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=100_000, help="vectors in the index")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=200, help="clusters in the synthetic data")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=None, help="IVF cells (default 4*sqrt(n))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = clustered_vectors(args.n + args.queries, args.dim, args.clusters, args.seed)
+    vectors, queries = data[:args.n], data[args.n:]
+
+    with tempfile.TemporaryDirectory() as path:
+        index = LocalVectorIndex(path, dimension=args.dim, autoflush=False)
+        start = perf_counter()
+        for lo in range(0, args.n, 10_000):
+            index.upsert((str(i), vectors[i]) for i in range(lo, min(args.n, lo + 10_000)))
+        index.flush()
+        print(f"upsert {args.n} x {args.dim}: {perf_counter() - start:.2f}s")
+
+        start = perf_counter()
+        index.build_ivf(nlist=args.nlist, seed=args.seed)
+        cells = index.describe_index_stats()["ivf_cells"]
+        print(f"build_ivf ({cells} cells): {perf_counter() - start:.2f}s")
+
+        exact, exact_ms = timed_queries(index, queries, args.top_k, mode="exact")
+        truth = [{m.id for m in r.matches} for r in exact]
+        print(f"\n{'mode':<14}{'recall@' + str(args.top_k):>12}{'ms/query':>12}{'speedup':>10}")
+        print(f"{'exact':<14}{1.0:>12.3f}{exact_ms:>12.2f}{1.0:>10.1f}")
+
+        for nprobe in args.nprobe:
+            approx, ivf_ms = timed_queries(index, queries, args.top_k, mode="ivf", nprobe=nprobe)
+            recall = np.mean([
+                len({m.id for m in r.matches} & t) / args.top_k for r, t in zip(approx, truth)
+            ])
+            print(f"{'ivf/' + str(nprobe):<14}{recall:>12.3f}{ivf_ms:>12.2f}{exact_ms / ivf_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
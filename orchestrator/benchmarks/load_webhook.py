@@ -0,0 +1,627 @@
+# orchestrator/benchmarks/load_webhook.py
+"""
+End-to-end load test of the /webhook pipeline, with local stand-ins for every external service.
+
+    cd orchestrator
+    python -m benchmarks.load_webhook --updates 500 --chats 50 --concurrency 32
+    python -m benchmarks.load_webhook --rate 100 --llm-latency-ms 800 --json results/base.json
+    python -m benchmarks.load_webhook --mode uvicorn --compare results/base.json
+
+Synthetic Telegram updates (text from the intent corpus, voice notes and
+edited messages) are POSTed to the real FastAPI `app`, either in-process
+through an ASGI transport or over TCP to a uvicorn server running in a
+thread of its own. Nothing leaves the machine:
+
+  * the LLM is the fake backend (LLM_BACKEND=fake, FAKE_* settings);
+  * `telegram.Bot` is replaced by StubBot, Pinecone by StubPinecone and
+    Redis by fakeredis, each with a configurable per-call latency;
+  * without an ffmpeg binary, audio decode/encode are stand-ins too, and
+    without pandoc the file-conversion agent starts against a stand-in
+    instead of downloading one.
+
+An update counts as done when its worker-pool handler returns (the main
+reply has been sent; follow-ups may still be running). Event-loop lag is
+sampled on the loop serving the app: in-process that loop also runs the
+load generator, with uvicorn it does not.
+
+Results are printed and, with --json, saved together with the git commit
+and the run's settings; --compare prints the deltas against an earlier
+result file.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import subprocess
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+import fakeredis
+import httpx
+
+CORPUS = Path(__file__).with_name("intent_corpus.jsonl")
+
+# Settings the app requires but never reaches with the stand-ins in place
+PLACEHOLDER_ENV = {
+    "TELEGRAM_TOKEN": "123456:load-test",
+    "WEBHOOK_SECRET": "load-test",
+    "RABBITMQ_URL": "amqp://localhost",
+    "N8N_WEBHOOK_URL": "http://localhost",
+    "N8N_USER": "load",
+    "N8N_PASSWORD": "load",
+    "CASELAW_PINECONE_API_KEY": "stub",
+    "CASELAW_PINECONE_ENVIRONMENT": "stub",
+    "CASELAW_PINECONE_INDEX": "case-law",
+    "MEMO_PINECONE_API_KEY": "stub",
+    "MEMO_PINECONE_ENVIRONMENT": "stub",
+    "MEMO_PINECONE_INDEX": "memo-drafter",
+    "PINECONE_API_KEY": "stub",
+    "PINECONE_ENV": "stub",
+    "REDIS_URL": "redis://stub:6379/0",
+}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def summarize(seconds: List[float]) -> Dict[str, float]:
+    values = sorted(seconds)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+class CallStats:
+    """Calls and time spent per stand-in method."""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            self.calls[name] += 1
+            self.seconds[name] += elapsed
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {"calls": n, "total_s": round(self.seconds[name], 6)}
+            for name, n in sorted(self.calls.items())
+        }
+
+
+STUBS = CallStats()
+
+
+# — Stand-ins —
+
+class StubMessage:
+    def __init__(self, chat_id: int, message_id: int, text: Optional[str] = None):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.text = text
+
+
+class StubFile:
+    def __init__(self, bot: "StubBot", size: int = 8000):
+        self.bot, self.size = bot, size
+
+    async def download_as_bytearray(self) -> bytearray:
+        await self.bot._call("download_file")
+        return bytearray(b"OggS" + bytes(self.size))
+
+
+class StubBot:
+    """The subset of `telegram.Bot` the app uses; every call costs `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self._ids = iter(range(1, 1 << 62))
+
+    async def _call(self, name: str) -> None:
+        start = perf_counter()
+        await asyncio.sleep(self.latency)
+        STUBS.record(f"telegram.{name}", perf_counter() - start)
+
+    async def send_message(self, chat_id, text, **kwargs) -> StubMessage:
+        await self._call("send_message")
+        return StubMessage(chat_id, next(self._ids), text)
+
+    async def edit_message_text(self, text, chat_id=None, message_id=None, **kwargs) -> StubMessage:
+        await self._call("edit_message_text")
+        return StubMessage(chat_id, message_id, text)
+
+    async def delete_message(self, chat_id, message_id, **kwargs) -> bool:
+        await self._call("delete_message")
+        return True
+
+    async def send_voice(self, chat_id, voice, **kwargs) -> StubMessage:
+        await self._call("send_voice")
+        return StubMessage(chat_id, next(self._ids))
+
+    async def send_document(self, chat_id, document, **kwargs) -> StubMessage:
+        await self._call("send_document")
+        return StubMessage(chat_id, next(self._ids))
+
+    async def get_file(self, file_id, **kwargs) -> StubFile:
+        await self._call("get_file")
+        return StubFile(self)
+
+
+class LatentRedis(fakeredis.FakeAsyncRedis):
+    """fakeredis with a fixed round-trip time per command or pipeline."""
+
+    latency = 0.0
+
+    async def execute_command(self, *args, **options):
+        start = perf_counter()
+        await asyncio.sleep(self.latency)
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            STUBS.record(f"redis.{str(args[0]).lower()}", perf_counter() - start)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute, latency = pipe.execute, self.latency
+
+        async def delayed(raise_on_error=True):
+            start = perf_counter()
+            await asyncio.sleep(latency)
+            try:
+                return await execute(raise_on_error)
+            finally:
+                STUBS.record("redis.pipeline", perf_counter() - start)
+
+        pipe.execute = delayed
+        return pipe
+
+
+class StubIndex:
+    def __init__(self, name: str, latency: float):
+        self.name, self.latency = name, latency
+
+    def query(self, vector=None, top_k=4, include_metadata=True, **kwargs):
+        # the real client blocks too; the agents call it from a thread
+        start = perf_counter()
+        time.sleep(self.latency)
+        STUBS.record("pinecone.query", perf_counter() - start)
+        return {"matches": [
+            {"id": f"{self.name}-{i}", "score": 0.9 - i / 100, "metadata": {
+                "citation": f"Stub v. Case {i} (2001)",
+                "text": "Tribes retain inherent sovereign authority over their members and territory.",
+            }}
+            for i in range(top_k)
+        ]}
+
+
+class StubPinecone:
+    latency = 0.0
+
+    def __init__(self, api_key=None, environment=None, **kwargs):
+        pass
+
+    def list_indexes(self):
+        return ["case-law", "memo-drafter"]
+
+    def create_index(self, **kwargs):
+        pass
+
+    def Index(self, name: str) -> StubIndex:
+        return StubIndex(name, self.latency)
+
+
+def stub_audio(latency: float):
+    """Decoder/encoder stand-in for machines without ffmpeg."""
+    async def convert(source) -> bytes:
+        start = perf_counter()
+        await asyncio.sleep(latency)
+        STUBS.record("ffmpeg.pipe", perf_counter() - start)
+        return bytes(32000)  # one second of 16 kHz 16-bit silence
+    return convert
+
+
+class StubPandoc:
+    """
+    pypandoc for machines without pandoc: the agent's startup check passes
+    and nothing is downloaded. Conversions themselves run in the job pool's
+    worker processes, which import the real module.
+    """
+
+    def __init__(self, real):
+        self.real = real
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.real, name)
+
+    def get_pandoc_version(self) -> str:
+        return "stand-in"
+
+    def get_pandoc_path(self) -> str:
+        return "pandoc (stand-in)"
+
+    def download_pandoc(self, *args, **kwargs) -> None:
+        raise RuntimeError("the load test never downloads pandoc")
+
+
+def install_standins(args) -> Any:
+    """
+    Configure the environment, swap in the stand-ins and import the app.
+    Must run before anything imports app.core.config.
+    """
+    # 1) Settings: placeholders for credentials, the fake LLM, offline voice
+    for key, value in PLACEHOLDER_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LATENCY_MS": str(args.llm_latency_ms),
+        "FAKE_TOKENS_PER_S": str(args.llm_tokens_per_s),
+        "FAKE_FAILURE_RATE": str(args.llm_failure_rate),
+        "FAKE_SEED": str(args.seed),
+        "VOICE_RECOGNIZER": "offline",
+        "TTS_ENGINE": "tone",
+        "CASELAW_INDEX_BACKEND": "pinecone",
+    })
+
+    # 2) Every Redis client the app opens shares one in-memory server
+    from redis.asyncio import Redis
+    server = fakeredis.FakeServer()
+    LatentRedis.latency = args.redis_latency_ms / 1000
+    Redis.from_url = classmethod(
+        lambda cls, url, **kwargs: LatentRedis(server=server, decode_responses=kwargs.get("decode_responses", False))
+    )
+
+    # 3) Import the app and replace Telegram and Pinecone
+    from app import main
+    from app.agents.case_law_scholar import case_law_agent
+    from app.agents.file_conversion_agent import file_conversion_agent
+    from app.agents.memo_drafter import memo_agent
+    from app.core.tracing import Instrumented
+
+    StubPinecone.latency = args.pinecone_latency_ms / 1000
+    case_law_agent.Pinecone = memo_agent.Pinecone = StubPinecone
+    main.bot = Instrumented(StubBot(args.telegram_latency_ms / 1000), "telegram", main.TELEGRAM_METHODS)
+    if not shutil.which(main.settings.FFMPEG_BINARY):
+        main.transcriber.decoder = stub_audio(args.ffmpeg_latency_ms / 1000)
+        main.tts.encoder = stub_audio(args.ffmpeg_latency_ms / 1000)
+    if not shutil.which("pandoc"):
+        file_conversion_agent.pypandoc = StubPandoc(file_conversion_agent.pypandoc)
+
+    logging.getLogger().setLevel(args.log_level.upper())
+    return main
+
+
+# — Load —
+
+class Tracker:
+    """When each update was sent, acknowledged, picked up and finished."""
+
+    def __init__(self):
+        self.sent: Dict[int, float] = {}
+        self.acked: Dict[int, str] = {}
+        self.started: Dict[int, float] = {}
+        self.finished: Dict[int, float] = {}
+        self.ack_latency: List[float] = []
+        self.statuses: Counter = Counter()
+
+    def wrap(self, handler):
+        async def timed(chat_id, msg):
+            key = msg.get("message_id")
+            self.started[key] = perf_counter()
+            try:
+                await handler(chat_id, msg)
+            finally:
+                self.finished[key] = perf_counter()
+        return timed
+
+    def accepted(self) -> List[int]:
+        return [key for key, status in self.acked.items() if status == "queued"]
+
+
+class LoopLag:
+    """Samples how late the event loop wakes up from a short sleep."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            start = perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, perf_counter() - start - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    def stats(self) -> Dict[str, float]:
+        s = summarize(self.samples)
+        s["mean_ms"] = round(sum(self.samples) / len(self.samples) * 1000, 3) if self.samples else 0.0
+        return s
+
+
+def make_updates(args) -> List[dict]:
+    """A reproducible mix of text, voice and edited-message updates."""
+    rng = random.Random(args.seed)
+    texts = [json.loads(line)["text"] for line in CORPUS.read_text().splitlines() if line.strip()]
+    weights = [args.text_weight, args.voice_weight, args.edit_weight]
+    updates = []
+    for i in range(args.updates):
+        chat_id = 10_000 + rng.randrange(args.chats)
+        msg = {"message_id": i + 1, "date": 1_700_000_000 + i, "chat": {"id": chat_id, "type": "private"},
+               "from": {"id": chat_id, "is_bot": False, "first_name": "Load"}}
+        kind = rng.choices(("message", "voice", "edited_message"), weights)[0]
+        if kind == "voice":
+            msg["voice"] = {"file_id": f"voice-{i}", "file_unique_id": f"v{i}", "duration": 3}
+            kind = "message"
+        else:
+            text = rng.choice(texts)
+            # mostly unique texts, so caches only help where real traffic repeats
+            msg["text"] = text if rng.random() < args.repeat_rate else f"{text} (#{i})"
+            if kind == "edited_message":
+                msg["edit_date"] = msg["date"] + 5
+        updates.append({"update_id": 500_000 + i, kind: msg})
+    return updates
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float) -> None:
+    """Wait until every lazy component is built or has failed."""
+    deadline = perf_counter() + timeout
+    while perf_counter() < deadline:
+        try:
+            components = (await client.get("/ready")).json()["components"]
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)  # uvicorn still starting
+            continue
+        if all(c["ready"] or c["error"] for c in components.values()):
+            failed = {name: c["error"] for name, c in components.items() if not c["ready"]}
+            if failed:
+                logging.warning("Running without components that failed to start: %s", failed)
+            return
+        await asyncio.sleep(0.1)
+    logging.warning("Components still starting after %.0fs; running anyway", timeout)
+
+
+async def drive(client: httpx.AsyncClient, updates: List[dict], tracker: Tracker, args, secret: str) -> None:
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret}
+
+    async def post(update: dict) -> None:
+        msg = update.get("message") or update.get("edited_message")
+        key = msg["message_id"]
+        tracker.sent[key] = perf_counter()
+        try:
+            resp = await client.post("/webhook", json=update, headers=headers)
+            status = resp.json().get("status", str(resp.status_code)) if resp.status_code == 200 else str(resp.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        tracker.ack_latency.append(perf_counter() - tracker.sent[key])
+        tracker.acked[key] = status
+        tracker.statuses[status] += 1
+
+    if args.rate > 0:
+        # open loop: updates arrive on schedule whether or not earlier ones are done
+        start = perf_counter()
+        tasks = []
+        for i, update in enumerate(updates):
+            delay = start + i / args.rate - perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(post(update)))
+        await asyncio.gather(*tasks)
+    else:
+        # closed loop: `concurrency` senders, each posting as soon as it got its ack
+        pending = iter(updates)
+
+        async def sender():
+            for update in pending:
+                await post(update)
+
+        await asyncio.gather(*(sender() for _ in range(args.concurrency)))
+
+
+async def wait_done(tracker: Tracker, timeout: float) -> bool:
+    deadline = perf_counter() + timeout
+    while perf_counter() < deadline:
+        if all(key in tracker.finished for key in tracker.accepted()):
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+def collect(tracker: Tracker, lag: LoopLag, health: dict, start: float, completed_in_time: bool) -> dict:
+    accepted = [k for k in tracker.accepted() if k in tracker.finished]
+    finished_at = max((tracker.finished[k] for k in accepted), default=start)
+    elapsed = max(finished_at - start, 1e-9)
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(accepted) / elapsed, 3),
+        "completed": len(accepted),
+        "timed_out": not completed_in_time,
+        "statuses": dict(tracker.statuses),
+        "ack": summarize(tracker.ack_latency),
+        "queue_wait": summarize([tracker.started[k] - tracker.sent[k] for k in accepted]),
+        "handle": summarize([tracker.finished[k] - tracker.started[k] for k in accepted]),
+        "end_to_end": summarize([tracker.finished[k] - tracker.sent[k] for k in accepted]),
+        "loop_lag": lag.stats(),
+        "standins": STUBS.snapshot(),
+        "health": health,
+    }
+
+
+async def run_inprocess(main, updates, args) -> dict:
+    tracker, lag = Tracker(), LoopLag()
+    main.workers.handler = tracker.wrap(main.workers.handler)
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            await wait_ready(client, args.warmup_timeout)
+            lag.start()
+            start = perf_counter()
+            await drive(client, updates, tracker, args, main.settings.WEBHOOK_SECRET)
+            done = await wait_done(tracker, args.drain_timeout)
+            lag.stop()
+            health = (await client.get("/health")).json()
+    return collect(tracker, lag, health, start, done)
+
+
+async def run_uvicorn(main, updates, args) -> dict:
+    import uvicorn
+
+    tracker, lag = Tracker(), LoopLag()
+    main.workers.handler = tracker.wrap(main.workers.handler)
+    server = uvicorn.Server(uvicorn.Config(
+        main.app, host="127.0.0.1", port=args.port, log_level="warning", lifespan="on",
+    ))
+
+    async def serve():
+        lag.start()  # on the server's loop
+        await server.serve()
+
+    thread = threading.Thread(target=asyncio.run, args=(serve(),), name="uvicorn", daemon=True)
+    thread.start()
+    try:
+        limits = httpx.Limits(max_connections=max(args.concurrency, 1) * 2)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60, limits=limits) as client:
+            await wait_ready(client, args.warmup_timeout)
+            lag.samples.clear()
+            start = perf_counter()
+            await drive(client, updates, tracker, args, main.settings.WEBHOOK_SECRET)
+            done = await wait_done(tracker, args.drain_timeout)
+            health = (await client.get("/health")).json()
+    finally:
+        server.should_exit = True
+        await asyncio.to_thread(thread.join, args.drain_timeout + 10)
+    return collect(tracker, lag, health, start, done)
+
+
+# — Reporting —
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+            cwd=Path(__file__).parent, timeout=10,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+HEADLINE = [
+    ("throughput/s", ("throughput_per_s",)),
+    ("ack p99 ms", ("ack", "p99_ms")),
+    ("wait p50 ms", ("queue_wait", "p50_ms")),
+    ("e2e p50 ms", ("end_to_end", "p50_ms")),
+    ("e2e p95 ms", ("end_to_end", "p95_ms")),
+    ("e2e p99 ms", ("end_to_end", "p99_ms")),
+    ("lag p99 ms", ("loop_lag", "p99_ms")),
+    ("lag max ms", ("loop_lag", "max_ms")),
+]
+
+
+def lookup(results: dict, path) -> Optional[float]:
+    for part in path:
+        if not isinstance(results, dict) or part not in results:
+            return None
+        results = results[part]
+    return results
+
+
+def report(run: dict, baseline: Optional[dict]) -> None:
+    r = run["results"]
+    print(f"{run['config']['mode']} run at {run['commit'] or 'unknown commit'}: "
+          f"{r['completed']} updates in {r['elapsed_s']:.2f}s, statuses {r['statuses']}"
+          + (" (TIMED OUT)" if r["timed_out"] else ""))
+    if baseline:
+        print(f"{'metric':<16}{'value':>12}{'baseline':>12}{'change':>9}")
+    else:
+        print(f"{'metric':<16}{'value':>12}")
+    for label, path in HEADLINE:
+        value = lookup(r, path)
+        line = f"{label:<16}{value:>12.1f}"
+        if baseline:
+            base = lookup(baseline["results"], path)
+            if base is None:
+                line += f"{'-':>12}{'-':>9}"
+            else:
+                change = f"{(value - base) / base * 100:+.0f}%" if base else "-"
+                line += f"{base:>12.1f}{change:>9}"
+        print(line)
+
+    print(f"\n{'stand-in':<28}{'calls':>8}{'avg ms':>9}")
+    for name, s in r["standins"].items():
+        print(f"{name:<28}{s['calls']:>8}{s['total_s'] / s['calls'] * 1000:>9.1f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--port", type=int, default=8765, help="uvicorn mode only")
+    parser.add_argument("--updates", type=int, default=500)
+    parser.add_argument("--chats", type=int, default=50, help="distinct chat ids")
+    parser.add_argument("--concurrency", type=int, default=32, help="closed loop: senders in parallel")
+    parser.add_argument("--rate", type=float, default=0.0, help="open loop: updates per second (0 = closed loop)")
+    parser.add_argument("--text-weight", type=float, default=0.8)
+    parser.add_argument("--voice-weight", type=float, default=0.1)
+    parser.add_argument("--edit-weight", type=float, default=0.1)
+    parser.add_argument("--repeat-rate", type=float, default=0.0, help="fraction of texts sent verbatim again")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--llm-tokens-per-s", type=float, default=200.0)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--telegram-latency-ms", type=float, default=30.0)
+    parser.add_argument("--redis-latency-ms", type=float, default=0.5)
+    parser.add_argument("--pinecone-latency-ms", type=float, default=40.0)
+    parser.add_argument("--ffmpeg-latency-ms", type=float, default=20.0, help="stand-in only, when ffmpeg is missing")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--warmup-timeout", type=float, default=30.0)
+    parser.add_argument("--drain-timeout", type=float, default=120.0)
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--label", default=None, help="free-form name stored with the results")
+    parser.add_argument("--json", type=Path, default=None, help="write results to this file")
+    parser.add_argument("--compare", type=Path, default=None, help="earlier --json output to diff against")
+    args = parser.parse_args()
+
+    main_module = install_standins(args)
+    updates = make_updates(args)
+    runner = run_uvicorn if args.mode == "uvicorn" else run_inprocess
+    results = await runner(main_module, updates, args)
+
+    run = {
+        "label": args.label,
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "results": results,
+    }
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    report(run, baseline)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(run, indent=2, default=str))
+        print(f"\nresults written to {args.json}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())